@@ -12,10 +12,17 @@ from backend.app.routes.coins import coins_bp
 from backend.app.routes.predictions import predictions_bp
 from backend.app.routes.dashboard_routes import dashboard_bp
 from backend.app.utils.socket_tasks import start_coin_stream, register_socket_handlers, register_emit_route
+from backend.app.utils.refresh_ahead import start_refresh_ahead
+from backend.app.utils.coin_payload import PayloadJSON
 from backend.app.routes.chart_routes import chart_bp
+from backend.app.routes.health_routes import health_bp
 
 
-socketio = SocketIO(cors_allowed_origins="*", async_mode="gevent")
+# gevent without monkey patching: greenlets only switch at gevent calls, so a
+# blocking DB, HTTP or LLM call inside one stalls every socket and request.
+# Blocking work runs in OS threads instead (cache refreshes, prediction jobs,
+# startup refresh, the Groq stream reader) and greenlets poll for the result.
+socketio = SocketIO(cors_allowed_origins="*", async_mode="gevent", json=PayloadJSON)
 jwt = JWTManager()
 migrate = Migrate()
 
@@ -36,7 +43,10 @@ def create_app(config_name='development'):
         instance_relative_config=True
     )
     app.config.from_object(config[config_name])
-    CORS(app, supports_credentials=True, resources={r"/*": {"origins": "*"}})
+    # The frontend is on another origin: Location lets it follow a 202 /predict
+    # response to its job, X-Chart-Fields/X-Chart-Rows describe binary chart data
+    CORS(app, supports_credentials=True, resources={r"/*": {"origins": "*"}},
+         expose_headers=["Location", "X-Chart-Fields", "X-Chart-Rows"])
 
     db.init_app(app)
     migrate.init_app(app, db)
@@ -44,6 +54,7 @@ def create_app(config_name='development'):
     socketio.init_app(app)
     register_socket_handlers(socketio, app)
     start_coin_stream(socketio, app)
+    start_refresh_ahead(socketio)
     register_emit_route(app)
     limiter.init_app(app)
 
@@ -53,5 +64,6 @@ def create_app(config_name='development'):
     app.register_blueprint(predictions_bp)
     app.register_blueprint(dashboard_bp)
     app.register_blueprint(chart_bp)
+    app.register_blueprint(health_bp)
 
     return app
@@ -66,6 +66,7 @@ class Coin(db.Model):
         technical_indicators: One-to-many relationship with TechnicalIndicators
         snapshots: One-to-many relationship with CoinSnapshot
         top_volume24: One-to-many relationship with TopVolume24h
+        indicator_state: One-to-one relationship with IndicatorEngineState
     """
     __tablename__ = 'coins'
 
@@ -81,6 +82,8 @@ class Coin(db.Model):
                                            lazy=True, cascade="all, delete-orphan")
     snapshots = db.relationship('CoinSnapshot', backref='coin', lazy=True, cascade="all, delete-orphan")
     top_volume24 = db.relationship('TopVolume24h', backref='coin', lazy=True, cascade="all, delete-orphan")
+    indicator_state = db.relationship('IndicatorEngineState', backref='coin', lazy=True, uselist=False,
+                                      cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"Coin {self.coin_name} ({self.coin_symbol})"
@@ -97,9 +100,12 @@ class HistoricalData(db.Model):
         high: Highest price in the period
         low: Lowest price in the period
         volume: Trading volume
-        timestamp: Data timestamp
+        timestamp: Data timestamp (unique per coin)
     """
     __tablename__ = 'historical_data'
+    __table_args__ = (
+        db.Index('ix_historical_data_coin_id_timestamp', 'coin_id', 'timestamp', unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     coin_id = db.Column(db.Integer, db.ForeignKey('coins.id', ondelete="CASCADE"), nullable=False)
@@ -136,6 +142,9 @@ class TechnicalIndicators(db.Model):
         timestamp: Indicator calculation timestamp
     """
     __tablename__ = 'technical_indicators'
+    __table_args__ = (
+        db.Index('ix_technical_indicators_coin_id_timestamp', 'coin_id', 'timestamp'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     coin_id = db.Column(db.Integer, db.ForeignKey('coins.id', ondelete="CASCADE"), nullable=False)
@@ -158,6 +167,29 @@ class TechnicalIndicators(db.Model):
         return f"TechnicalIndicators CoinID={self.coin_id} Timestamp={self.timestamp}"
 
 
+class IndicatorEngineState(db.Model):
+    """
+    Persisted rolling state of the incremental technical-indicator engine.
+
+    Attributes:
+        id: Primary key
+        coin_id: Foreign key to Coin model (one state row per coin)
+        last_timestamp: Timestamp of the last candle folded into the state
+        state: JSON-serialized engine state
+        updated_at: Last time the state was saved
+    """
+    __tablename__ = 'indicator_engine_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    coin_id = db.Column(db.Integer, db.ForeignKey('coins.id', ondelete="CASCADE"), unique=True, nullable=False)
+    last_timestamp = db.Column(db.DateTime, nullable=False)
+    state = db.Column(db.Text, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"IndicatorEngineState CoinID={self.coin_id} LastTimestamp={self.last_timestamp}"
+
+
 class FearGreedIndex(db.Model):
     """
     Crypto Fear & Greed Index data.
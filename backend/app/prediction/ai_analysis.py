@@ -4,17 +4,36 @@ AI-powered cryptocurrency market analysis using LLM.
 Provides functions to fetch historical data, calculate technical indicators,
 and generate market analysis using Groq's LLM API. Supports both concise and
 detailed analysis reports.
+
+Analyses are cached in the shared ``market_cache``, keyed by coin,
+timeframe, report type, latest candle, model and prompt template, so
+repeated requests within a candle skip the LLM. Tokens spent and saved are
+counted and exposed via GET /metrics. ``stream_analysis_with_llm`` yields
+tokens as Groq generates them, for the /predict/stream SSE endpoint.
+
+Hourly prompt data is read from the indicators the cron stores in
+``technical_indicators``; daily data is recomputed from candles only when a
+new candle has been stored since the last request.
 """
-from backend.app.models import HistoricalData, Coin
+import hashlib
+import queue
+import threading
+import time
+import gevent
+from sqlalchemy import and_, func
+from backend.app.models import db, HistoricalData, TechnicalIndicators, Coin
 from datetime import datetime, timezone, timedelta
 from backend.app.prediction.prompt_formatter import generate_prompt, FULL_PROMPT_TEMPLATE, CONCISE_PROMPT_TEMPLATE
 from groq import Groq
 from dotenv import load_dotenv
 import os
 import logging
-from backend.app.utils.llm_helpers import resample_and_compute_indicators
+from backend.app.utils.llm_helpers import (
+    resample_and_compute_indicators, stored_indicator_frame, OHLCV_COLUMNS, STORED_INDICATOR_COLUMNS
+)
 from backend.app.prediction.market_data import fetch_market_data
 from backend.app.utils.symbols import SYMBOL_MAP
+from backend.app.utils.cache import market_cache
 
 
 logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -23,10 +42,115 @@ load_dotenv()
 API_KEY = os.getenv('GROQ_API_KEY')
 GROQ_MODEL = os.getenv("GROQ_MODEL", "openai/gpt-oss-120b")
 
+# How long a generated analysis is reused for the same candle
+ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv("LLM_ANALYSIS_CACHE_TTL_SECONDS", "1800"))
+ANALYSIS_CACHE_KEY_PREFIX = "llm_analysis"
+
+# Prompt data per (coin, timeframe, latest stored candle); a new candle means a new key
+MARKET_DATA_CACHE_KEY_PREFIX = "llm_market_data"
+MARKET_DATA_CACHE_RETAIN_SECONDS = 2 * 60 * 60
+
+# How often a streaming request checks for new tokens from the reader thread
+STREAM_POLL_SECONDS = 0.02
+
+# Longest a stream may go without a new chunk before it is treated as stalled
+STREAM_TIMEOUT_SECONDS = float(os.getenv("LLM_STREAM_TIMEOUT_SECONDS", "60"))
+
+# Cumulative LLM usage and cache savings, exposed via GET /metrics
+_analysis_stats = {
+    "hits": 0,
+    "misses": 0,
+    "llm_calls": 0,
+    "prompt_tokens_spent": 0,
+    "completion_tokens_spent": 0,
+    "prompt_tokens_saved": 0,
+    "completion_tokens_saved": 0,
+    "streams": 0,
+    "streams_cancelled": 0,
+    "data_cache_hits": 0,
+    "stored_indicator_reads": 0,
+    "indicator_recomputes": 0,
+}
+_analysis_stats_lock = threading.Lock()
+
+
+def _count_data(field):
+    with _analysis_stats_lock:
+        _analysis_stats[field] += 1
+
+
+def _count_usage(prefix, usage):
+    with _analysis_stats_lock:
+        _analysis_stats[f"prompt_tokens_{prefix}"] += usage.get("prompt_tokens", 0)
+        _analysis_stats[f"completion_tokens_{prefix}"] += usage.get("completion_tokens", 0)
+
+
+def get_analysis_cache_stats():
+    """Hits, misses, LLM calls and tokens spent/saved by the analysis cache."""
+    with _analysis_stats_lock:
+        return dict(_analysis_stats)
+
+
+def analysis_cache_key(data, report_type):
+    """
+    Build the cache key for an analysis of ``data``.
+
+    Args:
+        data (dict): Output of ``fetch_historical_data``
+        report_type (str): 'concise' or 'full'
+
+    Returns:
+        str: Key of (coin, timeframe, report type, latest candle, model, template hash)
+    """
+    template = FULL_PROMPT_TEMPLATE if report_type == "full" else CONCISE_PROMPT_TEMPLATE
+    template_hash = hashlib.sha256(template.encode()).hexdigest()[:16]
+    return ":".join([
+        ANALYSIS_CACHE_KEY_PREFIX, data["coin"], data["timeframe"], report_type,
+        data["latest_data"]["timestamp"], GROQ_MODEL, template_hash,
+    ])
+
+
+def _load_hourly_frame(coin_id, cutoff_time):
+    """
+    Hourly candles with the indicators the cron already stored for them.
+
+    One indexed query joins HistoricalData with TechnicalIndicators. If the
+    newest candle has no stored indicators yet (e.g. the cron has not run
+    since it arrived), the indicators are recomputed with pandas instead.
+
+    Returns:
+        tuple: (df, stored) where stored is False if indicators were recomputed
+    """
+    rows = db.session.query(
+        HistoricalData.timestamp, HistoricalData.price, HistoricalData.high, HistoricalData.low,
+        HistoricalData.volume, *[getattr(TechnicalIndicators, c) for c in STORED_INDICATOR_COLUMNS]
+    ).outerjoin(
+        TechnicalIndicators,
+        and_(TechnicalIndicators.coin_id == HistoricalData.coin_id,
+             TechnicalIndicators.timestamp == HistoricalData.timestamp)
+    ).filter(
+        HistoricalData.coin_id == coin_id,
+        HistoricalData.timestamp >= cutoff_time
+    ).order_by(HistoricalData.timestamp.asc()).all()
+
+    df = stored_indicator_frame(rows)
+    if df.empty:
+        return df, False
+    if not df.iloc[-1][STORED_INDICATOR_COLUMNS].isna().any():
+        _count_data("stored_indicator_reads")
+        return df, True
+
+    _count_data("indicator_recomputes")
+    return resample_and_compute_indicators(df[OHLCV_COLUMNS].reset_index(), "1h"), False
+
 
 def fetch_historical_data(coin_symbol, timeframe):
     """Fetches and processes historical market data with technical indicators.
 
+    Hourly data uses the indicators stored by the cron. Results for the
+    database-backed timeframes are cached per latest stored candle, so
+    indicators are only recomputed when a new candle arrives.
+
     Args:
         coin_symbol: Cryptocurrency symbol (e.g., 'BTC', 'ETH').
         timeframe: Time interval ('1h', '1d', '1w').
@@ -54,29 +178,53 @@ def fetch_historical_data(coin_symbol, timeframe):
             "Volume": "volume"
         }, inplace=True)
         df = resample_and_compute_indicators(binance_df, timeframe)
+        return _summarize_market_data(df, coin_symbol, timeframe)
 
-    else:
-        with current_app.app_context():
-            coin = Coin.query.filter_by(coin_symbol=raw_symbol).first()
+    with current_app.app_context():
+        coin = Coin.query.filter_by(coin_symbol=raw_symbol).first()
+
+        if not coin:
+            return None
+
+        if timeframe == "1h":
+            cutoff_time = datetime.now(timezone.utc) - timedelta(hours=6)
+        else:
+            cutoff_time = datetime.now(timezone.utc) - timedelta(days=60)
+
+        latest = db.session.query(func.max(HistoricalData.timestamp)).filter(
+            HistoricalData.coin_id == coin.id,
+            HistoricalData.timestamp >= cutoff_time
+        ).scalar()
 
-            if not coin:
-                return None
+        if latest is None:
+            return None
 
-            if timeframe == "1h":
-                cutoff_time = datetime.now(timezone.utc) - timedelta(hours=6)
-            else:
-                cutoff_time = datetime.now(timezone.utc) - timedelta(days=60)
+        key = f"{MARKET_DATA_CACHE_KEY_PREFIX}:{raw_symbol}:{timeframe}:{latest.isoformat()}"
+        cached = market_cache.peek(key)
+        if cached is not None:
+            _count_data("data_cache_hits")
+            return cached
 
+        if timeframe == "1h":
+            df, cacheable = _load_hourly_frame(coin.id, cutoff_time)
+        else:
             historical_data = HistoricalData.query.filter(
                 HistoricalData.coin_id == coin.id,
                 HistoricalData.timestamp >= cutoff_time
             ).order_by(HistoricalData.timestamp.asc()).all()
+            _count_data("indicator_recomputes")
+            df = resample_and_compute_indicators(historical_data, timeframe)
+            cacheable = True
 
-            if not historical_data:
-                return None
+    data = _summarize_market_data(df, coin_symbol, timeframe)
+    # A recomputed hourly frame is not cached: the cron's stored values replace it once written
+    if data is not None and cacheable:
+        market_cache.set(key, data, retain_seconds=MARKET_DATA_CACHE_RETAIN_SECONDS)
+    return data
 
-            df = resample_and_compute_indicators(historical_data, timeframe)
 
+def _summarize_market_data(df, coin_symbol, timeframe):
+    """Build the prompt data (latest candle, indicators, S&R, recommendation) from an indicator frame."""
     if df is None or df.empty:
         return None
 
@@ -120,7 +268,7 @@ def fetch_historical_data(coin_symbol, timeframe):
 
     # Volatility flags
     if df["close"].std() < 0.0001:
-        print(f"{coin.coin_symbol} has very low price volatility. MACD & BB may be unreliable.")
+        print(f"{coin_symbol.upper()} has very low price volatility. MACD & BB may be unreliable.")
         momentum_indicators["MACD"], momentum_indicators["MACD_signal"] = None, None
         volatility["BB_upper"], volatility["BB_middle"], volatility["BB_lower"] = None, None, None
 
@@ -169,37 +317,219 @@ def fetch_historical_data(coin_symbol, timeframe):
     }
 
 
-def analyze_with_llm(coin_symbol, timeframe, report_type="concise"):
-    """Generates AI-powered market analysis using LLM based on historical data.
+def _cached_analysis(key):
+    """Return the cached analysis for ``key`` if still fresh (counting a hit), else None."""
+    cached = market_cache.peek(key)
+    if cached and time.time() - cached["created_at"] < cached.get("ttl", ANALYSIS_CACHE_TTL_SECONDS):
+        with _analysis_stats_lock:
+            _analysis_stats["hits"] += 1
+        _count_usage("saved", cached["usage"])
+        return cached
+    with _analysis_stats_lock:
+        _analysis_stats["misses"] += 1
+    return None
+
+
+def _usage_dict(usage):
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+    }
+
+
+def _store_analysis(key, result, usage, ttl=None):
+    """Count a completed LLM call and cache its result for ``ttl`` seconds (default ANALYSIS_CACHE_TTL_SECONDS)."""
+    if ttl is None:
+        ttl = ANALYSIS_CACHE_TTL_SECONDS
+    with _analysis_stats_lock:
+        _analysis_stats["llm_calls"] += 1
+    _count_usage("spent", usage)
+    market_cache.set(key, dict(result, usage=usage, created_at=time.time(), ttl=ttl),
+                     retain_seconds=ttl)
+
+
+def _llm_messages(data, report_type):
+    return [
+        {"role": "system", "content": FULL_PROMPT_TEMPLATE if report_type == "full" else CONCISE_PROMPT_TEMPLATE},
+        {"role": "user", "content": generate_prompt(data, report_type)}
+    ]
+
+
+def _max_tokens(report_type):
+    return 2500 if report_type == "full" else 500
+
+
+def generate_analysis(coin_symbol, timeframe, report_type="concise", ttl=None, refresh=False):
+    """Generates an analysis like ``analyze_with_llm`` and reports the tokens it spent.
 
     Args:
         coin_symbol: Cryptocurrency symbol to analyze.
         timeframe: Time interval for analysis ('1h', '1d', '1w').
         report_type: Type of report ('concise' or 'full').
+        ttl: Seconds a newly generated analysis is served from the cache
+            (default ANALYSIS_CACHE_TTL_SECONDS).
+        refresh: If True, call the LLM even when a cached analysis is fresh.
 
     Returns:
-        Dictionary with coin symbol and analysis text, or error message.
+        Tuple of (result, usage) where result is the ``analyze_with_llm``
+        dictionary and usage holds the prompt/completion tokens spent
+        (zero for cache hits and failures).
     """
+    no_usage = {"prompt_tokens": 0, "completion_tokens": 0}
     data = fetch_historical_data(coin_symbol, timeframe)
     if not data:
-        return {"error": "No sufficient data available."}
+        return {"error": "No sufficient data available."}, no_usage
+
+    key = analysis_cache_key(data, report_type)
+    cached = None if refresh else _cached_analysis(key)
+    if cached:
+        return {"coin": cached["coin"], "analysis": cached["analysis"], "cached": True}, no_usage
 
-    prompt = generate_prompt(data, report_type)
+    messages = _llm_messages(data, report_type)
 
     try:
         client = Groq(api_key=API_KEY)
         response = client.chat.completions.create(
             model=GROQ_MODEL,
-            messages=[
-                {"role": "system", "content": FULL_PROMPT_TEMPLATE if report_type == "full" else CONCISE_PROMPT_TEMPLATE},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=2500 if report_type == "full" else 500,
+            messages=messages,
+            max_tokens=_max_tokens(report_type),
             temperature=0.2
         )
-        return {
+        result = {
             "coin": coin_symbol.upper(),
             "analysis": response.choices[0].message.content
         }
+        usage = _usage_dict(getattr(response, "usage", None))
+        _store_analysis(key, result, usage, ttl)
+        return dict(result, cached=False), usage
     except Exception as e:
-        return {"error": f"LLM call failed: {str(e)}"}
+        return {"error": f"LLM call failed: {str(e)}"}, no_usage
+
+
+def analyze_with_llm(coin_symbol, timeframe, report_type="concise"):
+    """Generates AI-powered market analysis using LLM based on historical data.
+
+    Args:
+        coin_symbol: Cryptocurrency symbol to analyze.
+        timeframe: Time interval for analysis ('1h', '1d', '1w').
+        report_type: Type of report ('concise' or 'full').
+
+    Returns:
+        Dictionary with coin symbol and analysis text, or error message.
+        ``cached`` is True when the analysis came from the cache.
+    """
+    result, _ = generate_analysis(coin_symbol, timeframe, report_type)
+    return result
+
+
+def _read_completion_stream(messages, max_tokens, chunks, holder):
+    """
+    Run a streaming Groq completion in a worker thread, queueing its chunks.
+
+    Once ``holder["cancelled"]`` is set the upstream stream is closed here,
+    its only owner. Ends with ("end", None) on the queue.
+    """
+    stream = None
+    try:
+        client = Groq(api_key=API_KEY)
+        stream = client.chat.completions.create(
+            model=GROQ_MODEL,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=0.2,
+            stream=True,
+            timeout=STREAM_TIMEOUT_SECONDS
+        )
+        for chunk in stream:
+            if holder.get("cancelled"):
+                break
+            chunks.put(("chunk", chunk))
+    except Exception as e:
+        if not holder.get("cancelled"):
+            chunks.put(("error", e))
+    finally:
+        if stream is not None:
+            stream.close()
+        chunks.put(("end", None))
+
+
+def stream_analysis_with_llm(coin_symbol, timeframe, report_type="concise"):
+    """Generates market analysis like ``analyze_with_llm``, yielding tokens as they arrive.
+
+    Closing the generator (e.g. when the client disconnects) closes the
+    upstream Groq stream, so generation stops instead of running to the end.
+    A stream that sends nothing for STREAM_TIMEOUT_SECONDS ends with an error.
+
+    Args:
+        coin_symbol: Cryptocurrency symbol to analyze.
+        timeframe: Time interval for analysis ('1h', '1d', '1w').
+        report_type: Type of report ('concise' or 'full').
+
+    Yields:
+        tuple: (event, payload) where event is 'token' ({"text"}), 'done'
+        ({"coin", "cached"}) or 'error' ({"error"}).
+    """
+    data = fetch_historical_data(coin_symbol, timeframe)
+    if not data:
+        yield "error", {"error": "No sufficient data available."}
+        return
+
+    key = analysis_cache_key(data, report_type)
+    cached = _cached_analysis(key)
+    if cached:
+        yield "token", {"text": cached["analysis"]}
+        yield "done", {"coin": cached["coin"], "cached": True}
+        return
+
+    chunks = queue.Queue()
+    holder = {}
+    threading.Thread(
+        target=_read_completion_stream,
+        args=(_llm_messages(data, report_type), _max_tokens(report_type), chunks, holder),
+        daemon=True
+    ).start()
+    with _analysis_stats_lock:
+        _analysis_stats["streams"] += 1
+
+    parts = []
+    usage = None
+    finished = False
+    deadline = time.monotonic() + STREAM_TIMEOUT_SECONDS
+    try:
+        while True:
+            try:
+                kind, item = chunks.get_nowait()
+            except queue.Empty:
+                if time.monotonic() >= deadline:
+                    finished = True
+                    holder["cancelled"] = True
+                    yield "error", {"error": f"LLM stream stalled for {STREAM_TIMEOUT_SECONDS:g}s"}
+                    return
+                gevent.sleep(STREAM_POLL_SECONDS)
+                continue
+            deadline = time.monotonic() + STREAM_TIMEOUT_SECONDS
+            if kind == "end":
+                break
+            if kind == "error":
+                finished = True
+                yield "error", {"error": f"LLM call failed: {str(item)}"}
+                return
+
+            text = item.choices[0].delta.content if item.choices else None
+            if text:
+                parts.append(text)
+                yield "token", {"text": text}
+            chunk_usage = getattr(item, "usage", None) or getattr(getattr(item, "x_groq", None), "usage", None)
+            if chunk_usage:
+                usage = chunk_usage
+
+        finished = True
+        result = {"coin": coin_symbol.upper(), "analysis": "".join(parts)}
+        _store_analysis(key, result, _usage_dict(usage))
+        yield "done", {"coin": result["coin"], "cached": False}
+    finally:
+        if not finished:
+            # Client went away mid-stream: the reader thread closes the upstream connection
+            holder["cancelled"] = True
+            with _analysis_stats_lock:
+                _analysis_stats["streams_cancelled"] += 1
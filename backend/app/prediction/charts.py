@@ -9,13 +9,78 @@ Creates matplotlib-based visualizations for AI prediction reports, including:
 
 All charts use black background with color-coded candles and indicators
 optimized for AI analysis interpretation.
+
+Figures are built with the object-oriented Figure + Agg canvas API rather
+than pyplot, so they are never registered in pyplot's global figure list
+and concurrent renders never share a "current figure". A figure is freed
+as soon as the caller drops its last reference.
 """
 from backend.app.utils.chart_helpers import aggregate_candles
-import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
 import numpy as np
 
 
+def create_figure(height_ratios):
+    """
+    Create a standalone two-panel figure with a shared x-axis on an Agg canvas.
+
+    Args:
+        height_ratios (list): Relative heights of the top and bottom panels
+
+    Returns:
+        tuple: (fig, ax1, ax2) figure and its top and bottom axes
+    """
+    fig = Figure(figsize=(12, 8))
+    FigureCanvasAgg(fig)
+    ax1, ax2 = fig.subplots(2, 1, sharex=True, gridspec_kw={'height_ratios': height_ratios})
+    fig.patch.set_facecolor('black')
+    return fig, ax1, ax2
+
+
+def format_date_axis(ax, fontsize=None):
+    """Format the bottom axis with rotated white date labels."""
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y/%m/%d'))
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+        label.set_color("white")
+    ax.set_xlabel("Date", color="white", fontsize=fontsize)
+
+
+def draw_candles(ax, df, candle_width):
+    """
+    Draw candlesticks as two batched artists: one wick collection, one body collection.
+
+    Green (lime) candles close above their open, red ones at or below it.
+
+    Args:
+        ax (matplotlib.axes.Axes): Price axes to draw on
+        df (pd.DataFrame): Price data with Open/High/Low/Close columns
+        candle_width (float): Body width in days
+    """
+    open_price = df["Open"].to_numpy()
+    close_price = df["Close"].to_numpy()
+    colors = np.where(close_price > open_price, "lime", "red")
+
+    # Wicks (high to low); projecting caps match single-line plots
+    ax.vlines(df.index, df["Low"], df["High"], colors=colors, linewidth=0.5, capstyle="projecting")
+
+    # Bodies (open to close) as one polygon collection instead of a bar per candle
+    x = mdates.date2num(df.index.to_pydatetime())
+    left, right = x - candle_width / 2, x + candle_width / 2
+    bottom = np.minimum(open_price, close_price)
+    top = np.maximum(open_price, close_price)
+    verts = np.stack([
+        np.column_stack([left, bottom]), np.column_stack([left, top]),
+        np.column_stack([right, top]), np.column_stack([right, bottom]),
+    ], axis=1)
+    bodies = PolyCollection(verts, facecolors=colors, edgecolors="none", linewidths=0)
+    ax.add_collection(bodies)
+    ax.autoscale_view()
+
+
 def plot_base_candlestick_chart(df, coin_symbol, timeframe):
     """
     Create base candlestick chart with volume and support/resistance levels.
@@ -43,33 +108,14 @@ def plot_base_candlestick_chart(df, coin_symbol, timeframe):
     support_levels = [df["Close"].min() * 0.99, df["Close"].min() * 0.98]
 
     # Create chart
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), sharex=True,
-                                   gridspec_kw={'height_ratios': [3, 1]})
-    fig.patch.set_facecolor('black')
+    fig, ax1, ax2 = create_figure([3, 1])
 
     # Candle width
     candle_width = {
         "1h": 0.03, "1d": 0.8, "1w": 6
     }.get(timeframe, 0.6)
 
-    # Candlesticks
-    for i in range(len(df)):
-        date = df.index[i]
-        open_price = df["Open"].iloc[i]
-        close_price = df["Close"].iloc[i]
-        high_price = df["High"].iloc[i]
-        low_price = df["Low"].iloc[i]
-
-        # Determine candle color (green for bullish, red for bearish)
-        color = "lime" if close_price > open_price else "red"
-
-        # Plot the candle wick (high to low)
-        ax1.plot([date, date], [low_price, high_price], color=color, linewidth=0.5)
-
-        # Plot the candle body (open to close) using ax1.bar
-        body_height = abs(close_price - open_price)
-        body_bottom = min(open_price, close_price)
-        ax1.bar(date, body_height, bottom=body_bottom, color=color, width=candle_width, linewidth=0)
+    draw_candles(ax1, df, candle_width)
 
     # Draw Support & Resistance Lines
     for r in resistance_levels:
@@ -98,9 +144,7 @@ def plot_base_candlestick_chart(df, coin_symbol, timeframe):
     ax2.legend(loc="upper left", facecolor="black", edgecolor="white", fontsize=10, labelcolor="white")
 
     # Format x-axis dates
-    ax2.xaxis.set_major_formatter(mdates.DateFormatter('%Y/%m/%d'))
-    plt.xticks(rotation=45, color="white")
-    plt.xlabel("Date", color="white", fontsize=12)
+    format_date_axis(ax2, fontsize=12)
 
     return fig, ax1, ax2  # for SMA or Bollinger overlays
 
@@ -134,7 +178,7 @@ def plot_price_chart(df, coin_symbol, timeframe=None):
     for text in legend.get_texts():
         text.set_color("white")
 
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 
@@ -177,7 +221,7 @@ def plot_bollinger_bands(df, coin_symbol, timeframe=None, window=20, num_std=2):
     for text in legend.get_texts():
         text.set_color("white")
 
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 
@@ -219,9 +263,7 @@ def plot_macd_rsi(df, timeframe):
     df["Stoch_K_Smooth"] = df["Stoch_K"].rolling(window=5, min_periods=1).mean().rolling(window=3, min_periods=1).mean()
     df["Stoch_D_Smooth"] = df["Stoch_D"].rolling(window=5, min_periods=1).mean().rolling(window=3, min_periods=1).mean()
 
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), sharex=True,
-                                   gridspec_kw={'height_ratios': [1, 1]})
-    fig.patch.set_facecolor('black')
+    fig, ax1, ax2 = create_figure([1, 1])
 
     bar_width = {
         "1h": 0.03,
@@ -255,9 +297,7 @@ def plot_macd_rsi(df, timeframe):
     ax2.tick_params(axis="both", colors="white")
     ax2.legend(loc="upper left", facecolor="black", edgecolor="white", labelcolor="white")
 
-    ax2.xaxis.set_major_formatter(mdates.DateFormatter('%Y/%m/%d'))
-    plt.xticks(rotation=45, color="white")
-    plt.xlabel("Date", color="white")
+    format_date_axis(ax2)
 
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
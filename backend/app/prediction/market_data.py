@@ -1,16 +1,16 @@
 import requests
 import pandas as pd
-import os
 from backend.app.prediction.charts import plot_price_chart, plot_macd_rsi, plot_bollinger_bands, aggregate_candles
+from backend.app.utils.kline_store import kline_store
 from backend.app.utils.symbols import normalize_symbol
 
-BINANCE_BASE_URL = os.environ.get('BINANCE_BASE_URL', 'https://api.binance.com')
-BINANCE_KLINES_URL = f"{BINANCE_BASE_URL}/api/v3/klines"
-
 
 def fetch_market_data(symbol, interval, limit=1000):
     """Fetches OHLCV data from Binance API.
 
+    Klines are served from the shared kline store, which only downloads
+    candles newer than the last closed one after the first fill.
+
     Args:
         symbol: Cryptocurrency symbol.
         interval: Kline interval (e.g., '1h', '1d', '1w').
@@ -22,15 +22,8 @@ def fetch_market_data(symbol, interval, limit=1000):
     pair = symbol.upper()
     if not pair.endswith("USDT"):
         pair += "USDT"
-    params = {
-        "symbol": pair,
-        "interval": interval,
-        "limit": limit
-    }
     try:
-        response = requests.get(BINANCE_KLINES_URL, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = kline_store.get_klines(pair, interval, limit)
 
         df = pd.DataFrame(data, columns=[
             "timestamp", "Open", "High", "Low", "Close", "Volume",
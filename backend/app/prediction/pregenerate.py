@@ -0,0 +1,93 @@
+"""
+Scheduled pre-generation of concise AI reports.
+
+Most /predict traffic asks for the concise report of one of the tracked
+coins. After the hourly cron has stored new candles and indicators, this
+stage generates those reports ahead of time into the analysis cache, so
+/predict answers them as cache hits instead of waiting on the LLM. This
+only works with a shared CACHE_BACKEND (redis, or sqlite on a single host)
+that the cron process and the web workers both read; with the default
+process-local memory backend the run is skipped rather than spending LLM
+calls on reports nobody can read.
+
+Reports are generated for every tracked coin and each timeframe in
+PREGENERATE_TIMEFRAMES, PREGENERATE_WORKERS at a time, and kept for
+PREGENERATE_TTL_SECONDS so they last until the next run. Each run's cost
+(LLM calls, tokens spent, failures, duration) is logged and kept in the
+cache for GET /metrics.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from backend.app.prediction.ai_analysis import generate_analysis
+from backend.app.utils.cache import market_cache
+
+PREGENERATE_TIMEFRAMES = [
+    tf.strip() for tf in os.environ.get("PREGENERATE_TIMEFRAMES", "1d").split(",") if tf.strip()
+]
+PREGENERATE_WORKERS = int(os.environ.get("PREGENERATE_WORKERS", "3"))
+
+# Slightly longer than the hourly cron interval, so reports never lapse between runs
+PREGENERATE_TTL_SECONDS = int(os.environ.get("PREGENERATE_TTL_SECONDS", str(65 * 60)))
+
+PREGENERATE_RUNS_KEY = "llm_pregenerate:runs"
+
+# Number of past run summaries kept for /metrics
+PREGENERATE_RUNS_KEPT = 24
+
+
+def pregenerate_reports(app, symbols, timeframes=None, workers=PREGENERATE_WORKERS,
+                        ttl=PREGENERATE_TTL_SECONDS):
+    """
+    Generate and cache the concise report for every (coin, timeframe) pair.
+
+    Args:
+        app (Flask): App whose context the database reads run in
+        symbols (list[str]): Coin symbols, e.g. ['BTC', 'ETH']
+        timeframes (list[str], optional): Defaults to PREGENERATE_TIMEFRAMES
+        workers (int): Reports generated concurrently
+        ttl (float): Seconds each report is served from the cache
+
+    Returns:
+        dict or None: Run summary with report, LLM call, failure and token
+        counts, or None if skipped because the cache is not shared
+    """
+    if not market_cache.is_shared():
+        print("[Pregenerate] Skipped: CACHE_BACKEND is process-local (memory), so web workers "
+              "would never see the reports. Set CACHE_BACKEND=redis to enable pre-generation.")
+        return None
+
+    timeframes = timeframes or PREGENERATE_TIMEFRAMES
+    pairs = [(symbol, timeframe) for symbol in symbols for timeframe in timeframes]
+
+    def generate(pair):
+        symbol, timeframe = pair
+        with app.app_context():
+            return generate_analysis(symbol, timeframe, "concise", ttl=ttl, refresh=True)
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        outcomes = list(executor.map(generate, pairs))
+
+    summary = {
+        "started_at": started,
+        "duration_seconds": round(time.time() - started, 2),
+        "reports": len(pairs),
+        "llm_calls": sum(1 for result, _ in outcomes if "error" not in result),
+        "failed": [f"{symbol}:{timeframe}" for (symbol, timeframe), (result, _) in zip(pairs, outcomes)
+                   if "error" in result],
+        "prompt_tokens": sum(usage["prompt_tokens"] for _, usage in outcomes),
+        "completion_tokens": sum(usage["completion_tokens"] for _, usage in outcomes),
+    }
+    runs = (market_cache.peek(PREGENERATE_RUNS_KEY) or [])[-(PREGENERATE_RUNS_KEPT - 1):]
+    market_cache.set(PREGENERATE_RUNS_KEY, runs + [summary])
+
+    print(f"[Pregenerate] {summary['llm_calls']}/{summary['reports']} concise reports in "
+          f"{summary['duration_seconds']}s, {summary['prompt_tokens']} prompt + "
+          f"{summary['completion_tokens']} completion tokens, {len(summary['failed'])} failed")
+    return summary
+
+
+def get_pregenerate_runs():
+    """Summaries of the most recent pre-generation runs, oldest first."""
+    return market_cache.peek(PREGENERATE_RUNS_KEY) or []
@@ -3,22 +3,129 @@ Chart generation routes for cryptocurrency technical analysis.
 
 Provides endpoints to generate price charts, MACD/RSI charts, and Bollinger Bands
 visualization as PNG images.
+
+Rendered images are cached per last candle (see chart_cache.py) and served
+with ETag/Last-Modified validators, so repeat requests skip matplotlib and
+revalidating clients get 304 Not Modified. Rendering itself happens in a
+worker process pool (see chart_renderer.py); if the pool is saturated or a
+render times out, the newest cached image of the chart is served instead.
+
+Prediction reports fetch all their panels from /chart/report in one request,
+which shares a single data fetch and indicator pass between panels.
+
+/chart/data returns the underlying OHLCV + indicator series instead of an
+image, as columnar JSON or packed binary arrays, so clients can draw charts
+themselves without any server-side rendering.
 """
-from flask import Blueprint, send_file, request
-from io import BytesIO
+import base64
+import hashlib
+import time
+from flask import Blueprint, Response, jsonify, request
 from backend.app.prediction.market_data import fetch_market_data, calculate_indicators
-from backend.app.prediction.charts import plot_price_chart, plot_macd_rsi, plot_bollinger_bands
+from backend.app.utils.chart_cache import chart_cache, DEFAULT_CHART_THEME
+from backend.app.utils.chart_data import parse_fields, to_columnar, to_packed, BINARY_MIMETYPE
 from backend.app.utils.chart_helpers import aggregate_candles
+from backend.app.utils.chart_renderer import chart_render_pool, RenderUnavailable, pack_frame, CHART_PLOTTERS
 
 chart_bp = Blueprint("chart", __name__)
 
+# Clients retry after this many seconds when no image could be produced
+RENDER_RETRY_AFTER_SECONDS = 5
+
+
+def chart_response(image):
+    """Build a cacheable PNG response, answering 304 if the client's copy is current."""
+    response = Response(image.png, mimetype="image/png")
+    response.set_etag(image.etag)
+    response.last_modified = image.created_at
+    response.cache_control.public = True
+    response.cache_control.max_age = max(0, int(chart_cache.ttl - image.age()))
+    response = response.make_conditional(request)
+    if response.status_code == 304:
+        chart_cache.count("not_modified")
+    return response
+
+
+def render_panels(chart_types, symbol, timeframe):
+    """
+    Produce cached or freshly rendered images for several charts of one symbol.
+
+    Market data is fetched once, and on a cache miss candles are aggregated
+    and indicators calculated once for all panels. The missing panels are
+    then rendered in parallel in the worker pool.
+
+    Args:
+        chart_types (list[str]): Chart names ('price', 'macd-rsi', 'bollinger')
+        symbol (str): Cryptocurrency trading symbol
+        timeframe (str): Candle aggregation period
+
+    Returns:
+        tuple: (images, error). ``images`` maps chart name to ChartImage; on
+               failure it is None and ``error`` is a Flask response tuple
+               (404 if no data available, 503 if rendering is unavailable
+               and nothing is cached).
+    """
+    df_raw = fetch_market_data(symbol, timeframe)
+    if df_raw is None or df_raw.empty:
+        return None, ("No data available", 404)
 
-def render_chart(fig):
-    """Convert matplotlib figure to PNG and return as Flask response."""
-    output = BytesIO()
-    fig.savefig(output, format="png", bbox_inches='tight')
-    output.seek(0)
-    return send_file(output, mimetype="image/png")
+    last_candle = int(df_raw.index[-1].timestamp())
+    keys = {t: (t, symbol.upper(), timeframe, last_candle, DEFAULT_CHART_THEME) for t in chart_types}
+    images = {t: chart_cache.get(key) for t, key in keys.items()}
+    missing = [t for t, image in images.items() if image is None]
+    if not missing:
+        return images, None
+
+    df = aggregate_candles(df_raw, timeframe)
+    if df is None or df.empty:
+        return None, ("Not enough candles", 404)
+    frame = pack_frame(calculate_indicators(df))
+
+    futures = {}
+    for chart_type in missing:
+        try:
+            futures[chart_type] = chart_render_pool.submit(chart_type, symbol, timeframe, frame)
+        except RenderUnavailable as e:
+            futures[chart_type] = e
+
+    deadline = time.monotonic() + chart_render_pool.timeout
+    for chart_type, future in futures.items():
+        try:
+            if isinstance(future, RenderUnavailable):
+                raise future
+            png = chart_render_pool.wait(future, deadline)
+        except RenderUnavailable as e:
+            image = chart_cache.latest(keys[chart_type])
+            if image is None:
+                return None, ("Chart rendering busy, retry shortly", 503,
+                              {"Retry-After": str(RENDER_RETRY_AFTER_SECONDS)})
+            print(f"[Charts] {e}, serving cached {chart_type} chart for {symbol} {timeframe}")
+            images[chart_type] = image
+            continue
+        if png is None:
+            return None, ("Not enough candles", 404)
+        images[chart_type] = chart_cache.put(keys[chart_type], png)
+    return images, None
+
+
+def render_cached_chart(chart_type, symbol, timeframe):
+    """
+    Serve a chart from the image cache, rendering it in the worker pool on a miss.
+
+    Args:
+        chart_type (str): Chart name used in the cache key and by the renderer
+                          ('price', 'macd-rsi', 'bollinger')
+        symbol (str): Cryptocurrency trading symbol
+        timeframe (str): Candle aggregation period
+
+    Returns:
+        Response: PNG image (image/png), 304 if unchanged, 404 if no data available,
+                  or 503 if rendering is unavailable and nothing is cached
+    """
+    images, error = render_panels([chart_type], symbol, timeframe)
+    if error:
+        return error
+    return chart_response(images[chart_type])
 
 
 @chart_bp.route("/chart/price/<symbol>")
@@ -40,20 +147,11 @@ def price_chart(symbol):
                                   Options: '1h', '1d', '1w'
 
     Returns:
-        Response: PNG image (image/png) on success, or 404 error if no data available
+        Response: PNG image (image/png) on success, 304 if the client's copy is current,
+                  or 404 error if no data available
     """
     timeframe = request.args.get("timeframe", "1d")
-    df_raw = fetch_market_data(symbol, timeframe)
-    if df_raw is None or df_raw.empty:
-        return "No data available", 404
-
-    df = aggregate_candles(df_raw, timeframe)
-    if df is None or df.empty:
-        return "Not enough candles", 404
-
-    df = calculate_indicators(df)
-    fig = plot_price_chart(df, symbol, timeframe)
-    return render_chart(fig)
+    return render_cached_chart("price", symbol, timeframe)
 
 
 @chart_bp.route("/chart/macd-rsi/<symbol>")
@@ -75,20 +173,11 @@ def macd_rsi_chart(symbol):
                                   Options: '1h', '1d', '1w'
 
     Returns:
-        Response: PNG image (image/png) on success, or 404 error if no data available
+        Response: PNG image (image/png) on success, 304 if the client's copy is current,
+                  or 404 error if no data available
     """
     timeframe = request.args.get("timeframe", "1d")
-    df_raw = fetch_market_data(symbol, timeframe)
-    if df_raw is None or df_raw.empty:
-        return "No data available", 404
-
-    df = aggregate_candles(df_raw, timeframe)
-    if df is None or df.empty:
-        return "Not enough candles", 404
-
-    df = calculate_indicators(df)
-    fig = plot_macd_rsi(df, timeframe)
-    return render_chart(fig)
+    return render_cached_chart("macd-rsi", symbol, timeframe)
 
 
 @chart_bp.route("/chart/bollinger/<symbol>")
@@ -110,9 +199,99 @@ def bollinger_chart(symbol):
                                   Options: '1h', '1d', '1w'
 
     Returns:
-        Response: PNG image (image/png) on success, or 404 error if no data available
+        Response: PNG image (image/png) on success, 304 if the client's copy is current,
+                  or 404 error if no data available
+    """
+    timeframe = request.args.get("timeframe", "1d")
+    return render_cached_chart("bollinger", symbol, timeframe)
+
+
+@chart_bp.route("/chart/report/<symbol>")
+def report_charts(symbol):
+    """
+    Render several chart panels for one symbol in a single request.
+
+    Endpoint: GET /chart/report/<symbol>?timeframe=1h|1d|1w&panels=price,macd-rsi,bollinger
+
+    Used by the AI prediction page, which shows the price, MACD/RSI and
+    Bollinger charts together. Market data is fetched and indicators are
+    calculated once for all panels, and panels share the image cache with
+    the single-chart endpoints.
+
+    Args:
+        symbol (str): Cryptocurrency trading symbol (e.g., 'BTC', 'ETH')
+
+    Query Parameters:
+        timeframe (str, optional): Candle aggregation period. Default '1d'.
+                                  Options: '1h', '1d', '1w'
+        panels (str, optional): Comma-separated chart names. Default all three.
+
+    Returns:
+        JSON: {"symbol", "timeframe", "panels": {name: base64 PNG}}, 304 if the
+              client's copy is current, 400 for unknown panels, 404 if no data
+              available, or 503 if rendering is unavailable
+    """
+    timeframe = request.args.get("timeframe", "1d")
+    panels = [p.strip() for p in request.args.get("panels", ",".join(CHART_PLOTTERS)).split(",") if p.strip()]
+    unknown = [p for p in panels if p not in CHART_PLOTTERS]
+    if unknown or not panels:
+        return jsonify({"error": f"Unknown panels: {', '.join(unknown)}" if unknown else "No panels requested"}), 400
+
+    images, error = render_panels(panels, symbol, timeframe)
+    if error:
+        return error
+
+    response = jsonify({
+        "symbol": symbol.upper(),
+        "timeframe": timeframe,
+        "panels": {name: base64.b64encode(image.png).decode("ascii") for name, image in images.items()},
+    })
+    response.set_etag(hashlib.sha1("".join(images[p].etag for p in panels).encode()).hexdigest())
+    response.last_modified = max(image.created_at for image in images.values())
+    response.cache_control.public = True
+    response.cache_control.max_age = max(0, int(chart_cache.ttl - max(image.age() for image in images.values())))
+    response = response.make_conditional(request)
+    if response.status_code == 304:
+        chart_cache.count("not_modified")
+    return response
+
+
+@chart_bp.route("/chart/data/<symbol>")
+def chart_data(symbol):
+    """
+    Return OHLCV and indicator series for client-side chart rendering.
+
+    Endpoint: GET /chart/data/<symbol>?timeframe=1h|1d|1w&fields=Close,RSI&format=json|binary
+
+    Candles are aggregated and indicators calculated exactly as for the PNG
+    charts, so a client drawing from this data shows the same series.
+
+    Args:
+        symbol (str): Cryptocurrency trading symbol (e.g., 'BTC', 'ETH')
+
+    Query Parameters:
+        timeframe (str, optional): Candle aggregation period. Default '1d'.
+                                  Options: '1h', '1d', '1w'
+        fields (str, optional): Comma-separated columns. Default all OHLCV
+                               and indicator columns.
+        format (str, optional): 'json' (default) for columnar JSON, or
+                               'binary' for packed little-endian arrays:
+                               uint32 Unix-second times, then one float32
+                               array per field. Field order and row count
+                               are sent in X-Chart-Fields and X-Chart-Rows.
+
+    Returns:
+        Response: Series data, 304 if the client's copy is current, 400 for
+                  unknown fields or format, or 404 if no data available
     """
     timeframe = request.args.get("timeframe", "1d")
+    output_format = request.args.get("format", "json")
+    fields, unknown = parse_fields(request.args.get("fields"))
+    if unknown or not fields:
+        return jsonify({"error": f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested"}), 400
+    if output_format not in ("json", "binary"):
+        return jsonify({"error": "format must be 'json' or 'binary'"}), 400
+
     df_raw = fetch_market_data(symbol, timeframe)
     if df_raw is None or df_raw.empty:
         return "No data available", 404
@@ -120,7 +299,17 @@ def bollinger_chart(symbol):
     df = aggregate_candles(df_raw, timeframe)
     if df is None or df.empty:
         return "Not enough candles", 404
-
     df = calculate_indicators(df)
-    fig = plot_bollinger_bands(df, symbol, timeframe)
-    return render_chart(fig)
+
+    if output_format == "binary":
+        response = Response(to_packed(df, fields), mimetype=BINARY_MIMETYPE)
+        response.headers["X-Chart-Fields"] = ",".join(fields)
+        response.headers["X-Chart-Rows"] = str(len(df))
+    else:
+        response = jsonify({"symbol": symbol.upper(), "timeframe": timeframe, "fields": fields,
+                            **to_columnar(df, fields)})
+
+    response.add_etag()
+    response.cache_control.public = True
+    response.cache_control.max_age = chart_cache.ttl
+    return response.make_conditional(request)
@@ -0,0 +1,72 @@
+"""
+Health, readiness and metrics routes.
+
+Exposes the progress of the background startup data refresh so deploy
+platforms and the frontend can tell a warm instance from one still
+refreshing stale data, plus counters for upstream API usage.
+"""
+from flask import Blueprint, jsonify
+from backend.app.prediction.ai_analysis import get_analysis_cache_stats
+from backend.app.prediction.pregenerate import get_pregenerate_runs
+from backend.app.utils.api import get_ticker_request_stats
+from backend.app.utils.cache import market_cache
+from backend.app.utils.chart_cache import chart_cache
+from backend.app.utils.chart_renderer import chart_render_pool
+from backend.app.utils.kline_store import kline_store
+from backend.app.utils.prediction_jobs import prediction_jobs
+from backend.app.utils.startup import startup_refresh
+
+health_bp = Blueprint('health', __name__)
+
+
+@health_bp.route("/ready", methods=["GET"])
+def readiness():
+    """
+    Report startup warmup progress.
+
+    Endpoint: GET /ready
+
+    Returns:
+        JSON with the overall ``ready`` flag, whether warmup was started,
+        elapsed time and per-dataset state, last update and refresh duration.
+        Status 200 once every dataset has finished its check/refresh (or when
+        this process never started the warmup), 503 while warmup is running.
+    """
+    status = startup_refresh.status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+
+@health_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Report process-local counters for upstream API usage.
+
+    Endpoint: GET /metrics
+
+    Returns:
+        JSON keyed by source. ``binance_ticker`` holds the cumulative
+        request count, request weight, response bytes, tickers parsed and
+        JSON parse time of 24hr ticker refreshes. ``cache`` holds per-key
+        hit/miss/stale/refresh/error counters of the market-data cache.
+        ``klines`` holds hit/full-fetch/tail-update counters of the kline store.
+        ``charts`` holds hit/miss/eviction/304 counters of the chart image cache.
+        ``chart_renderer`` holds the render pool size, queue depth, timed-out
+        renders still running and submitted/completed/timeout/saturated counters. ``llm_analysis``
+        holds analysis cache hits/misses, LLM tokens spent and saved,
+        streamed and cancelled /predict/stream responses, and how prompt
+        data was obtained (cached, stored indicators or recomputed). ``prediction_jobs``
+        holds the prediction queue depth, running jobs, submitted/attached/
+        completed/failed/rejected counters and queue wait times.
+        ``llm_pregenerate`` lists recent concise-report pre-generation runs
+        with their LLM calls, tokens spent, failures and duration.
+    """
+    return jsonify({
+        "binance_ticker": get_ticker_request_stats(),
+        "cache": market_cache.get_stats(),
+        "klines": kline_store.get_stats(),
+        "charts": chart_cache.get_stats(),
+        "chart_renderer": chart_render_pool.get_stats(),
+        "llm_analysis": get_analysis_cache_stats(),
+        "prediction_jobs": prediction_jobs.get_stats(),
+        "llm_pregenerate": get_pregenerate_runs(),
+    })
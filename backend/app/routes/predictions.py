@@ -2,10 +2,21 @@
 AI-powered cryptocurrency prediction routes.
 
 Provides endpoints for generating LLM-based market analysis and price predictions
-using technical indicators and historical data.
+using technical indicators and historical data. /predict runs analyses as
+deduplicated jobs on the prediction queue (see prediction_jobs.py), which
+clients can also poll by id. /predict/stream sends the analysis as
+Server-Sent Events while the LLM is still generating it.
 """
-from flask import Blueprint, request, jsonify
-from backend.app.prediction.ai_analysis import analyze_with_llm
+import json
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app, url_for
+from backend.app.prediction.ai_analysis import analyze_with_llm, stream_analysis_with_llm
+from backend.app.utils.prediction_jobs import prediction_jobs, JobQueueFull, FAILED
+
+# Seconds a client is told to wait before retrying when the queue is full
+JOB_RETRY_AFTER_SECONDS = 5
+
+# Upper bound for /predict/jobs/<id>?wait= long polling
+MAX_JOB_WAIT_SECONDS = 30
 
 predictions_bp = Blueprint("predictions", __name__)
 
@@ -15,13 +26,18 @@ def get_prediction():
     """
     Generate AI-powered market analysis for a cryptocurrency.
 
+    The analysis runs as a job on the prediction queue; concurrent requests
+    for the same coin, timeframe and type share one job.
+
     Query parameters:
         coin: Symbol of the cryptocurrency (required)
         timeframe: Data timeframe (default: "1d")
         type: Report type - "concise" or "detailed" (default: "concise")
+        async: If "1", return the job id immediately instead of waiting
 
     Returns:
-        JSON response with AI analysis or error message
+        JSON response with AI analysis or error message, or 202 with the
+        job id when running asynchronously or the job is still running
     """
     coin = request.args.get("coin")
     timeframe = request.args.get("timeframe", "1d")
@@ -31,7 +47,86 @@ def get_prediction():
         return jsonify({"error": "Coin parameter is required"}), 400
 
     try:
-        result = analyze_with_llm(coin, timeframe, report_type)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
+        job, _ = prediction_jobs.submit(
+            (coin.upper(), timeframe, report_type),
+            lambda: analyze_with_llm(coin, timeframe, report_type),
+            current_app._get_current_object()
+        )
+    except JobQueueFull as e:
+        return jsonify({"error": f"Prediction failed: {str(e)}"}), 503, {"Retry-After": str(JOB_RETRY_AFTER_SECONDS)}
+
+    if request.args.get("async") == "1" or not prediction_jobs.wait(job):
+        return job_response(job, 202)
+
+    if job.status == FAILED:
+        return jsonify({"error": f"Prediction failed: {job.error}"}), 500
+    return jsonify(job.result)
+
+
+@predictions_bp.route("/predict/jobs/<job_id>", methods=["GET"])
+def get_prediction_job(job_id):
+    """
+    Poll a prediction job.
+
+    Query parameters:
+        wait: Seconds to wait for the job to finish before answering
+            (long polling, capped at MAX_JOB_WAIT_SECONDS; default: 0)
+
+    Returns:
+        JSON with job_id, status ("queued", "running", "done" or "failed")
+        and the result or error once finished; 404 for unknown or expired jobs
+    """
+    job = prediction_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    wait = min(request.args.get("wait", 0, type=float), MAX_JOB_WAIT_SECONDS)
+    if wait > 0:
+        prediction_jobs.wait(job, wait)
+    return job_response(job, 200)
+
+
+def job_response(job, status_code):
+    """JSON job status with a Location header pointing at the poll URL."""
+    response = jsonify(job.to_dict())
+    response.status_code = status_code
+    response.headers["Location"] = url_for("predictions.get_prediction_job", job_id=job.id)
+    return response
+
+
+@predictions_bp.route("/predict/stream", methods=["GET"])
+def stream_prediction():
+    """
+    Stream AI-powered market analysis as Server-Sent Events.
+
+    Query parameters are the same as /predict. Emits ``token`` events
+    ({"text"}) as the LLM generates them, then one ``done`` event
+    ({"coin", "cached"}) or an ``error`` event. Disconnecting stops the
+    upstream LLM request.
+
+    Returns:
+        text/event-stream response, or JSON error if the coin is missing
+    """
+    coin = request.args.get("coin")
+    timeframe = request.args.get("timeframe", "1d")
+    report_type = request.args.get("type", "concise")
+
+    if not coin:
+        return jsonify({"error": "Coin parameter is required"}), 400
+
+    def events():
+        analysis = stream_analysis_with_llm(coin, timeframe, report_type)
+        try:
+            for event, payload in analysis:
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': f'Prediction failed: {str(e)}'})}\n\n"
+        finally:
+            # Runs on client disconnect too, cancelling the LLM stream
+            analysis.close()
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
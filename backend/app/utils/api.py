@@ -2,90 +2,173 @@
 External API integration for cryptocurrency market data.
 
 Handles data fetching from Binance and CoinGecko APIs with intelligent caching
-to reduce API calls and avoid rate limiting. Provides unified interface for
+(through the shared ``market_cache``, see cache.py) to reduce API calls and
+avoid rate limiting. Provides unified interface for
 retrieving real-time coin prices, market caps, and trading volumes.
 """
+import json
 import requests
 import time
 import os
 from backend.app.models import Coin, CoinSnapshot
 from backend.app.utils.coin_gecko import COINGECKO_API
 from backend.app.constants import TOP_10_BINANCE_COINS, COIN_SYMBOL_TO_ID
+from backend.app.utils.cache import market_cache, RefreshError
 
-# Cache for CoinGecko market data
-_coingecko_cache = {
-    "data": None,
-    "timestamp": 0
-}
+# CoinGecko is heavily rate limited: fresh for 10 minutes, then served
+# stale for up to 10 more while a background refresh runs
+COINGECKO_CACHE_KEY = "coingecko_markets"
+COINGECKO_TTL_SECONDS = 600
+COINGECKO_STALE_SECONDS = 600
 
-# Cache for Binance ticker data
-_binance_cache = {
-    "data": None,
-    "timestamp": 0
-}
+# Binance tickers: fresh for 1 minute to match WebSocket emission frequency
+BINANCE_TICKERS_CACHE_KEY = "binance_tickers"
+BINANCE_TICKERS_TTL_SECONDS = 60
+BINANCE_TICKERS_STALE_SECONDS = 60
 
 BINANCE_BASE_URL = os.environ.get('BINANCE_BASE_URL', 'https://api.binance.com')
 
+# Only the pairs we display are requested from /api/v3/ticker/24hr
+TRACKED_BINANCE_SYMBOLS = [coin["symbol"] for coin in TOP_10_BINANCE_COINS]
 
-def get_cached_coingecko_data():
-    """Get CoinGecko data with caching. Optional - dashboard works without it."""
-    now = time.time()
-    # Cache for 10 minutes since CoinGecko is heavily rate limited
-    cache_duration = 600
+# Binance charges weight 2 for 1-20 symbols, 40 for 21-100 and 80 beyond
+# (or with no filter), so requests are chunked to stay in the cheapest tier
+TICKER_SYMBOLS_PER_REQUEST = 20
+
+# Cumulative cost of ticker refreshes, exposed via GET /metrics
+_ticker_request_stats = {
+    "requests": 0,
+    "weight": 0,
+    "bytes": 0,
+    "tickers": 0,
+    "parse_seconds": 0.0
+}
+
+
+def ticker_request_weight(symbol_count):
+    """Request weight Binance charges for a 24hr ticker call with N symbols."""
+    if 1 <= symbol_count <= 20:
+        return 2
+    if 21 <= symbol_count <= 100:
+        return 40
+    return 80
+
+
+def get_ticker_request_stats():
+    """Return a copy of the cumulative 24hr ticker request counters."""
+    stats = dict(_ticker_request_stats)
+    stats["parse_seconds"] = round(stats["parse_seconds"], 6)
+    return stats
+
+
+def _raise_if_throttled(source, res):
+    """Raise RefreshError for 429/418/5xx so the cache backs off the source."""
+    if res.status_code in (418, 429) or res.status_code >= 500:
+        retry_after = res.headers.get("Retry-After")
+        try:
+            retry_after = float(retry_after) if retry_after else None
+        except (TypeError, ValueError):
+            retry_after = None
+        raise RefreshError(f"{source} API error {res.status_code}", res.status_code, retry_after)
+
+
+def fetch_binance_tickers(symbols):
+    """
+    Fetch 24hr tickers for the given pairs, in chunks of TICKER_SYMBOLS_PER_REQUEST.
+
+    Args:
+        symbols (list[str]): Binance trading pairs (e.g., 'BTCUSDT')
+
+    Returns:
+        list[dict] or None: Tickers, or None if any chunk failed
+
+    Raises:
+        RefreshError: If Binance rate limited us or returned a server error
+    """
+    data = []
+    for start in range(0, len(symbols), TICKER_SYMBOLS_PER_REQUEST):
+        chunk = symbols[start:start + TICKER_SYMBOLS_PER_REQUEST]
+        res = requests.get(
+            f"{BINANCE_BASE_URL}/api/v3/ticker/24hr",
+            params={"symbols": json.dumps(chunk, separators=(",", ":"))},
+            timeout=10
+        )
+        _ticker_request_stats["requests"] += 1
+        _ticker_request_stats["weight"] += ticker_request_weight(len(chunk))
+        _ticker_request_stats["bytes"] += len(res.content)
+        _raise_if_throttled("Binance", res)
+        if res.status_code != 200:
+            print(f"[Binance] API error {res.status_code}, using stale cache if available")
+            return None
 
-    if _coingecko_cache["data"] and now - _coingecko_cache["timestamp"] < cache_duration:
-        return _coingecko_cache["data"]
+        parse_start = time.perf_counter()
+        tickers = res.json()
+        _ticker_request_stats["parse_seconds"] += time.perf_counter() - parse_start
+        _ticker_request_stats["tickers"] += len(tickers)
+        data.extend(tickers)
+    return data
 
+
+def _refresh_coingecko_data():
+    """Fetch CoinGecko markets for the tracked coins; None on failure, RefreshError on 429/5xx."""
     try:
         ids = ",".join(COIN_SYMBOL_TO_ID.values())
         res = requests.get(COINGECKO_API, params={"vs_currency": "usd", "ids": ids}, timeout=10)
 
-        if res.status_code == 429:
-            print(f"[CoinGecko] Rate limited, using stale cache if available")
-            return _coingecko_cache["data"] if _coingecko_cache["data"] else []
+        _raise_if_throttled("CoinGecko", res)
 
         if res.status_code != 200:
             print(f"[CoinGecko] API error {res.status_code}, using stale cache if available")
-            return _coingecko_cache["data"] if _coingecko_cache["data"] else []
+            return None
 
         data = res.json()
-        _coingecko_cache["data"] = data
-        _coingecko_cache["timestamp"] = now
+        if not data:
+            return None
         print(f"[CoinGecko] Cached {len(data)} coins")
         return data
+    except RefreshError:
+        raise
     except Exception as e:
         print(f"[CoinGecko] Error fetching market data: {e}, using stale cache if available")
-        return _coingecko_cache["data"] if _coingecko_cache["data"] else []
+        return None
 
 
-def get_cached_binance_tickers():
-    """Fetch all Binance tickers with caching to avoid rate limits"""
-    now = time.time()
-    # Cache for 1 minute to match WebSocket emission frequency
-    cache_duration = 60  # 1 minute
+def get_cached_coingecko_data():
+    """Get CoinGecko data with caching. Optional - dashboard works without it."""
+    return market_cache.get(COINGECKO_CACHE_KEY) or []
 
-    # Return cached data if fresh
-    if _binance_cache["data"] and now - _binance_cache["timestamp"] < cache_duration:
-        return _binance_cache["data"]
 
-    # Cache is stale or empty - try ONE refresh, but don't block on failure
+def _refresh_binance_tickers():
+    """Fetch tickers for the tracked pairs; None on failure, RefreshError on 429/5xx."""
     try:
-        # Single API call to get ALL tickers at once
-        res = requests.get(f"{BINANCE_BASE_URL}/api/v3/ticker/24hr", timeout=10)
-        if res.status_code != 200:
-            print(f"[Binance] API error {res.status_code}, using stale cache if available")
-            # Return stale cache if we have it, better than nothing
-            return _binance_cache["data"] if _binance_cache["data"] else []
-
-        data = res.json()
-        _binance_cache["data"] = data
-        _binance_cache["timestamp"] = now
+        # Only the tracked pairs, in as few cheap requests as possible
+        data = fetch_binance_tickers(TRACKED_BINANCE_SYMBOLS)
+        if not data:
+            return None
         print(f"[Binance] Cached {len(data)} tickers")
         return data
+    except RefreshError:
+        raise
     except Exception as e:
         print(f"[Binance] Error fetching tickers: {e}, using stale cache if available")
-        # Return stale cache if we have it
-        return _binance_cache["data"] if _binance_cache["data"] else []
+        return None
+
+
+def get_cached_binance_tickers():
+    """Fetch Binance tickers for the tracked coins with caching to avoid rate limits"""
+    # Return stale cache if we have it, better than nothing
+    return market_cache.get(BINANCE_TICKERS_CACHE_KEY) or []
+
+
+# Registered so the refresh-ahead scheduler keeps both warm (see refresh_ahead.py)
+market_cache.register(
+    COINGECKO_CACHE_KEY, _refresh_coingecko_data,
+    ttl=COINGECKO_TTL_SECONDS, stale_ttl=COINGECKO_STALE_SECONDS
+)
+market_cache.register(
+    BINANCE_TICKERS_CACHE_KEY, _refresh_binance_tickers,
+    ttl=BINANCE_TICKERS_TTL_SECONDS, stale_ttl=BINANCE_TICKERS_STALE_SECONDS
+)
 
 
 def fetch_coin_data(coin_id=None):
@@ -126,7 +209,7 @@ def fetch_coin_data(coin_id=None):
     """
     coins = []
 
-    # Get all tickers at once (cached)
+    # Get tracked tickers at once (cached)
     all_tickers = get_cached_binance_tickers()
     if not all_tickers:
         return [], "Failed to fetch Binance tickers"
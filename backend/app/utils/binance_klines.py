@@ -0,0 +1,228 @@
+"""
+Concurrent Binance kline fetcher with a shared connection pool.
+
+Provides a single pooled ``requests.Session`` for kline downloads, automatic
+pagination past Binance's 1,000-candle page size, retry with jittered
+exponential backoff, and a request-weight governor driven by the
+``X-MBX-USED-WEIGHT-1M`` response header. ``fetch_klines_many`` downloads
+several symbols in parallel with bounded concurrency for backfills and cold
+starts.
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+BINANCE_BASE_URL = os.environ.get('BINANCE_BASE_URL', 'https://api.binance.com')
+BINANCE_KLINES_URL = f"{BINANCE_BASE_URL}/api/v3/klines"
+
+MAX_KLINES_PER_REQUEST = 1000
+REQUEST_TIMEOUT = 10
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 0.5
+DEFAULT_MAX_WORKERS = int(os.environ.get('BINANCE_MAX_WORKERS', 8))
+
+# Weight Binance charges per /api/v3/klines call, whatever the limit
+# (the old 1/2/5/10 tiers by limit no longer apply)
+KLINE_REQUEST_WEIGHT = 2
+
+# Binance's per-IP request weight budget per minute; we stop short of it
+WEIGHT_LIMIT_PER_MINUTE = int(os.environ.get('BINANCE_WEIGHT_LIMIT', 6000))
+WEIGHT_SAFETY_RATIO = 0.8
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide pooled Session used for Binance requests."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=DEFAULT_MAX_WORKERS * 2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+class WeightGovernor:
+    """
+    Tracks Binance's 1-minute request weight and pauses callers near the limit.
+
+    Each request reserves its weight before it is sent. The used weight that
+    Binance reports in response headers overrides our local estimate, so
+    weight spent by other processes on the same IP is accounted for too.
+    """
+
+    def __init__(self, limit=WEIGHT_LIMIT_PER_MINUTE, safety_ratio=WEIGHT_SAFETY_RATIO):
+        self.budget = int(limit * safety_ratio)
+        self.used = 0
+        self.window = None
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self, weight):
+        """Block until ``weight`` fits in the current minute's budget, then reserve it."""
+        while True:
+            with self.lock:
+                now = time.time()
+                window = int(now // 60)
+                if window != self.window:
+                    self.window = window
+                    self.used = 0
+
+                if now >= self.blocked_until and self.used + weight <= self.budget:
+                    self.used += weight
+                    return
+
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                else:
+                    wait = (window + 1) * 60 - now
+            print(f"[Klines] Request weight budget reached, waiting {wait:.1f}s")
+            time.sleep(wait)
+
+    def observe(self, headers):
+        """Update the used weight from Binance's response headers."""
+        value = headers.get("X-MBX-USED-WEIGHT-1M") or headers.get("X-MBX-USED-WEIGHT")
+        if not value:
+            return
+        with self.lock:
+            self.used = max(self.used, int(value))
+
+    def pause(self, seconds):
+        """Stop all requests for ``seconds`` (after a 429/418 with Retry-After)."""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.time() + seconds)
+
+
+governor = WeightGovernor()
+
+
+def _backoff_delay(attempt):
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, BACKOFF_BASE_SECONDS * (2 ** attempt))
+
+
+def _get_json(params):
+    """
+    GET the klines endpoint with weight accounting and retries.
+
+    Retries connection errors, timeouts, 429/418 and 5xx responses up to
+    MAX_RETRIES times. 429/418 responses pause every caller for Retry-After.
+
+    Raises:
+        requests.RequestException: If the request still fails after retries
+    """
+    session = get_session()
+
+    for attempt in range(MAX_RETRIES + 1):
+        governor.acquire(KLINE_REQUEST_WEIGHT)
+        try:
+            response = session.get(BINANCE_KLINES_URL, params=params, timeout=REQUEST_TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(_backoff_delay(attempt))
+            continue
+
+        governor.observe(response.headers)
+
+        if response.status_code in (418, 429) or response.status_code >= 500:
+            if attempt == MAX_RETRIES:
+                response.raise_for_status()
+            delay = _backoff_delay(attempt)
+            retry_after = response.headers.get("Retry-After")
+            if response.status_code in (418, 429) and retry_after:
+                governor.pause(float(retry_after))
+                delay = max(delay, float(retry_after))
+            print(f"[Klines] HTTP {response.status_code} for {params['symbol']}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        response.raise_for_status()
+        return response.json()
+
+
+def fetch_klines(symbol, interval="1h", limit=500, start_time=None, end_time=None):
+    """
+    Fetch raw klines for a trading pair, paginating past 1,000 candles.
+
+    Without ``start_time`` the most recent ``limit`` candles (up to
+    ``end_time`` if given) are returned, paging backwards. With
+    ``start_time`` candles are paged forward from that open time.
+
+    Args:
+        symbol (str): Binance trading pair (e.g., 'BTCUSDT')
+        interval (str): Kline interval (e.g., '1h', '1d', '1w')
+        limit (int): Maximum number of candles to return
+        start_time (int, optional): Open time in ms to start from
+        end_time (int, optional): Open time in ms to stop at
+
+    Returns:
+        list: Raw Binance klines in chronological order
+
+    Raises:
+        requests.RequestException: If a page request fails after retries
+    """
+    klines = []
+
+    if start_time is not None:
+        cursor = start_time
+        while len(klines) < limit:
+            page_limit = min(MAX_KLINES_PER_REQUEST, limit - len(klines))
+            params = {"symbol": symbol, "interval": interval, "limit": page_limit, "startTime": cursor}
+            if end_time is not None:
+                params["endTime"] = end_time
+            page = _get_json(params)
+            klines.extend(page)
+            if len(page) < page_limit:
+                break
+            cursor = page[-1][0] + 1
+        return klines[:limit]
+
+    cursor = end_time
+    while len(klines) < limit:
+        page_limit = min(MAX_KLINES_PER_REQUEST, limit - len(klines))
+        params = {"symbol": symbol, "interval": interval, "limit": page_limit}
+        if cursor is not None:
+            params["endTime"] = cursor
+        page = _get_json(params)
+        klines = page + klines
+        if len(page) < page_limit:
+            break
+        cursor = page[0][0] - 1
+    return klines[-limit:]
+
+
+def fetch_klines_many(symbols, interval="1h", limit=500, max_workers=DEFAULT_MAX_WORKERS, **kwargs):
+    """
+    Fetch klines for several symbols concurrently.
+
+    Args:
+        symbols (list[str]): Binance trading pairs
+        interval (str): Kline interval
+        limit (int): Candles per symbol
+        max_workers (int): Maximum concurrent downloads
+        **kwargs: Passed through to ``fetch_klines`` (start_time, end_time)
+
+    Returns:
+        dict: Symbol to list of klines. Symbols that failed are logged and omitted.
+    """
+    def fetch(symbol):
+        try:
+            return symbol, fetch_klines(symbol, interval, limit, **kwargs)
+        except Exception as e:
+            print(f"[Klines] Failed to fetch {symbol}: {e}")
+            return symbol, None
+
+    workers = max(1, min(max_workers, len(symbols)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(fetch, symbols))
+
+    return {symbol: klines for symbol, klines in results if klines is not None}
@@ -0,0 +1,179 @@
+"""
+Live Binance miniTicker feed over WebSocket.
+
+Subscribes to Binance combined streams (``<symbol>@miniTicker``) for the
+tracked coins and keeps an in-memory ticker table in the same shape as the
+REST ``/api/v3/ticker/24hr`` response, so existing consumers can use either
+source. The stream runs in a daemon thread, reconnects with backoff when the
+connection drops, and callers fall back to the REST ticker cache whenever
+the stream is not live or has not yet received every symbol.
+"""
+import json
+import os
+import threading
+import time
+from simple_websocket import Client, ConnectionClosed
+from backend.app.constants import COINS
+from backend.app.utils.api import get_cached_binance_tickers
+
+BINANCE_WS_URL = os.environ.get('BINANCE_WS_URL', 'wss://stream.binance.com:9443')
+
+# Minimum seconds between Socket.IO pushes driven by stream updates
+STREAM_PUSH_THROTTLE_SECONDS = float(os.environ.get('BINANCE_STREAM_THROTTLE_SECONDS', 1.0))
+
+# The stream counts as live only if a message arrived this recently
+STREAM_STALE_AFTER_SECONDS = 30
+
+RECONNECT_BASE_SECONDS = 1
+RECONNECT_MAX_SECONDS = 60
+RECEIVE_TIMEOUT_SECONDS = 5
+
+
+def mini_ticker_to_rest(data):
+    """
+    Convert a miniTicker event into the REST 24hr ticker field layout.
+
+    Args:
+        data (dict): miniTicker payload (``s``, ``c``, ``o``, ``h``, ``l``, ``v``, ``q``)
+
+    Returns:
+        dict: Ticker with ``symbol``, ``lastPrice``, ``highPrice`` etc.
+    """
+    return {
+        "symbol": data["s"],
+        "lastPrice": data["c"],
+        "openPrice": data["o"],
+        "highPrice": data["h"],
+        "lowPrice": data["l"],
+        "volume": data["v"],
+        "quoteVolume": data["q"],
+        "closeTime": data.get("E"),
+    }
+
+
+class BinanceTickerStream:
+    """
+    Maintains live tickers for a fixed set of symbols from Binance.
+
+    Args:
+        symbols (list[str]): Binance trading pairs (e.g., 'BTCUSDT')
+        base_url (str): WebSocket base URL, overridable for tests
+    """
+
+    def __init__(self, symbols, base_url=BINANCE_WS_URL):
+        self.symbols = list(symbols)
+        self.base_url = base_url
+        self.tickers = {}
+        self.version = 0
+        self.connected = False
+        self.last_message_at = 0.0
+        self.reconnects = 0
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.ws = None
+
+    @property
+    def url(self):
+        streams = "/".join(f"{symbol.lower()}@miniTicker" for symbol in self.symbols)
+        return f"{self.base_url}/stream?streams={streams}"
+
+    def start(self):
+        """Start the background reader thread (no-op if already running)."""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="binance-ticker-stream", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the reader thread and close the connection."""
+        self.stop_event.set()
+        if self.ws is not None:
+            try:
+                self.ws.close()
+            except Exception:
+                pass
+        if self.thread:
+            self.thread.join(timeout=RECEIVE_TIMEOUT_SECONDS + 1)
+
+    def is_live(self):
+        """True if connected and a message arrived within STREAM_STALE_AFTER_SECONDS."""
+        return self.connected and time.time() - self.last_message_at < STREAM_STALE_AFTER_SECONDS
+
+    def get_tickers(self):
+        """
+        Return live tickers in REST layout.
+
+        Returns:
+            list[dict] or None: Tickers, or None if the stream is not live or
+            some subscribed symbol has not ticked yet (e.g. right after connecting)
+        """
+        if not self.is_live():
+            return None
+        with self.lock:
+            if any(symbol not in self.tickers for symbol in self.symbols):
+                return None
+            return [self.tickers[symbol] for symbol in self.symbols]
+
+    def handle_message(self, message):
+        """Apply one combined-stream message to the ticker table."""
+        payload = json.loads(message)
+        data = payload.get("data", payload)
+        if data.get("e") != "24hrMiniTicker":
+            return
+        ticker = mini_ticker_to_rest(data)
+        with self.lock:
+            self.tickers[ticker["symbol"]] = ticker
+            self.version += 1
+            self.last_message_at = time.time()
+
+    def _run(self):
+        attempt = 0
+        while not self.stop_event.is_set():
+            try:
+                self.ws = Client.connect(self.url)
+                self.connected = True
+                attempt = 0
+                print(f"[BinanceStream] Connected to {len(self.symbols)} miniTicker streams")
+
+                while not self.stop_event.is_set():
+                    message = self.ws.receive(timeout=RECEIVE_TIMEOUT_SECONDS)
+                    if message is not None:
+                        self.handle_message(message)
+            except ConnectionClosed:
+                print("[BinanceStream] Connection closed, falling back to REST tickers")
+            except Exception as e:
+                print(f"[BinanceStream] Stream error: {e}, falling back to REST tickers")
+            finally:
+                self.connected = False
+                if self.ws is not None:
+                    try:
+                        self.ws.close()
+                    except Exception:
+                        pass
+
+            if self.stop_event.is_set():
+                break
+            delay = min(RECONNECT_MAX_SECONDS, RECONNECT_BASE_SECONDS * (2 ** attempt))
+            attempt += 1
+            self.reconnects += 1
+            print(f"[BinanceStream] Reconnecting in {delay}s")
+            self.stop_event.wait(delay)
+
+
+ticker_stream = BinanceTickerStream([coin["binance_symbol"] for coin in COINS])
+
+
+def get_live_tickers():
+    """
+    Tickers from the live stream, or the REST ticker cache if the stream is
+    down or incomplete.
+
+    Returns:
+        list[dict]: Tickers in REST 24hr layout
+    """
+    tickers = ticker_stream.get_tickers()
+    if tickers:
+        return tickers
+    return get_cached_binance_tickers()
@@ -0,0 +1,442 @@
+"""
+Shared market-data cache with TTL and stale-while-revalidate.
+
+Upstream market data (Binance tickers, CoinGecko markets) is cached behind a
+small backend interface so every web worker and cron process can share one
+copy instead of each keeping its own module-level dict:
+
+- ``memory``: in-process dict (default, no shared state)
+- ``redis``: shared Redis instance (``CACHE_REDIS_URL`` / ``REDIS_URL``)
+- ``sqlite``: local SQLite file shared by processes on the same host
+
+Entries younger than ``ttl`` are served as hits. Entries within the
+``stale_ttl`` window after that are served immediately while a background
+refresh runs. Older or missing entries are refreshed inline, falling back to
+the last stored value if the upstream call fails. Refreshes are coalesced
+per key (see single_flight.py), so concurrent misses share one upstream call.
+Hit/miss/stale counters are kept per key and exposed via GET /metrics.
+
+Keys can be registered as sources with their refresh function and TTLs.
+Failed refreshes of a source back off exponentially (honoring Retry-After),
+and once the refresh-ahead scheduler (refresh_ahead.py) is running, reads
+of registered keys never call upstream inline.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from backend.app.utils.single_flight import SingleFlight
+
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or os.environ.get('REDIS_URL')
+CACHE_SQLITE_PATH = os.environ.get(
+    'CACHE_SQLITE_PATH',
+    os.path.join(os.path.dirname(__file__), '..', '..', 'instance', 'market_cache.sqlite3')
+)
+CACHE_KEY_PREFIX = "basi:cache:"
+
+# How long values are kept after their last refresh, for stale-if-error
+DEFAULT_RETAIN_SECONDS = 24 * 60 * 60
+
+# Per-source backoff after a failed refresh (doubles per consecutive failure)
+BACKOFF_BASE_SECONDS = 5
+BACKOFF_MAX_SECONDS = 600
+
+
+class RefreshError(Exception):
+    """
+    Raised by refresh callables when the upstream rejects a request.
+
+    Args:
+        message (str): Description of the failure
+        status_code (int, optional): HTTP status (429, 5xx, ...)
+        retry_after (float, optional): Seconds the upstream asked us to wait
+    """
+
+    def __init__(self, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class CacheSource:
+    """A registered upstream: how to refresh a key and its backoff state."""
+
+    def __init__(self, key, refresh, ttl, stale_ttl=0, retain_seconds=DEFAULT_RETAIN_SECONDS):
+        self.key = key
+        self.refresh = refresh
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.retain_seconds = retain_seconds
+        self.failures = 0
+        self.backoff_until = 0.0
+        self.last_error = None
+
+    def in_backoff(self, now=None):
+        return (now or time.time()) < self.backoff_until
+
+    def record_failure(self, error):
+        self.failures += 1
+        delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** (self.failures - 1)))
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            delay = max(delay, float(retry_after))
+        self.backoff_until = time.time() + delay
+        self.last_error = str(error)
+        return delay
+
+    def record_success(self):
+        self.failures = 0
+        self.backoff_until = 0.0
+        self.last_error = None
+
+
+class MemoryBackend:
+    """Process-local backend; values are stored as-is."""
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, stored_at, expires_at = entry
+            if expires_at <= time.time():
+                del self.entries[key]
+                return None
+            return value, stored_at
+
+    def set(self, key, value, stored_at, retain_seconds):
+        with self.lock:
+            self.entries[key] = (value, stored_at, stored_at + retain_seconds)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class RedisBackend:
+    """
+    Redis backend shared by all processes; values are stored as JSON.
+
+    Args:
+        client: A ``redis.Redis``-compatible client (e.g. ``fakeredis`` in tests)
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url):
+        import redis  # optional dependency, only needed for this backend
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key):
+        raw = self.client.get(CACHE_KEY_PREFIX + key)
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["value"], entry["stored_at"]
+
+    def set(self, key, value, stored_at, retain_seconds):
+        raw = json.dumps({"value": value, "stored_at": stored_at})
+        self.client.set(CACHE_KEY_PREFIX + key, raw, ex=max(1, int(retain_seconds)))
+
+    def delete(self, key):
+        self.client.delete(CACHE_KEY_PREFIX + key)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=CACHE_KEY_PREFIX + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+class SQLiteBackend:
+    """
+    SQLite file backend for processes on one host; values are stored as JSON.
+
+    Args:
+        path (str): Database file path (``:memory:`` for a private cache)
+    """
+
+    def __init__(self, path):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def get(self, key):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, stored_at FROM cache_entries WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, stored_at, retain_seconds):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), stored_at, stored_at + retain_seconds)
+            )
+
+    def delete(self, key):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def clear(self):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM cache_entries")
+
+
+def create_backend(name=CACHE_BACKEND, redis_url=CACHE_REDIS_URL):
+    """
+    Build a cache backend by name.
+
+    Args:
+        name (str): 'memory', 'redis' or 'sqlite'
+        redis_url (str, optional): Redis URL for the 'redis' backend
+
+    Returns:
+        Backend instance
+
+    Raises:
+        RuntimeError: If the 'redis' backend is chosen without a URL
+    """
+    if name == "redis":
+        if not redis_url:
+            # A guessed localhost URL would turn every cache read and write into an error
+            raise RuntimeError("CACHE_BACKEND=redis requires CACHE_REDIS_URL (or REDIS_URL) to be set")
+        return RedisBackend.from_url(redis_url)
+    if name == "sqlite":
+        return SQLiteBackend(CACHE_SQLITE_PATH)
+    if name != "memory":
+        print(f"[Cache] Unknown CACHE_BACKEND '{name}', using memory")
+    return MemoryBackend()
+
+
+class Cache:
+    """
+    TTL cache with stale-while-revalidate on top of a backend.
+
+    Backend errors are counted and treated as misses, so a Redis outage
+    degrades to direct upstream calls instead of failing requests.
+
+    Args:
+        backend: MemoryBackend, RedisBackend or SQLiteBackend
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.stats = defaultdict(lambda: {
+            "hits": 0, "misses": 0, "stale": 0, "refreshes": 0, "coalesced": 0, "errors": 0
+        })
+        self.flights = SingleFlight()
+        self.lock = threading.Lock()
+        self.sources = {}
+        # Set by the refresh-ahead scheduler once it is running in this process
+        self.refresh_ahead = False
+
+    def register(self, key, refresh, ttl, stale_ttl=0, retain_seconds=DEFAULT_RETAIN_SECONDS):
+        """
+        Register an upstream source so ``get`` and the scheduler can refresh it.
+
+        Args:
+            key (str): Cache key
+            refresh: Callable returning a fresh value, None on failure, or
+                raising RefreshError for 429/5xx responses
+            ttl (float): Seconds a value is served as fresh
+            stale_ttl (float): Extra seconds a value is served while refreshing
+            retain_seconds (float): Seconds a value is kept for stale-if-error
+
+        Returns:
+            CacheSource: The registered source
+        """
+        source = CacheSource(key, refresh, ttl, stale_ttl, retain_seconds)
+        self.sources[key] = source
+        return source
+
+    def get(self, key):
+        """Read a registered source through ``get_or_refresh`` with its settings."""
+        source = self.sources[key]
+        return self.get_or_refresh(key, source.refresh, source.ttl, source.stale_ttl, source.retain_seconds)
+
+    def age(self, key):
+        """Seconds since ``key`` was stored, or None if it is not cached."""
+        entry = self._read(key)
+        return time.time() - entry[1] if entry else None
+
+    def in_backoff(self, key):
+        """True if the registered source for ``key`` is backing off."""
+        source = self.sources.get(key)
+        return source is not None and source.in_backoff()
+
+    def _count(self, key, field):
+        with self.lock:
+            self.stats[key][field] += 1
+
+    def _read(self, key):
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            print(f"[Cache] Backend read failed for {key}: {e}")
+            self._count(key, "errors")
+            return None
+
+    def is_shared(self):
+        """True if other processes (web workers, cron) see this cache's entries."""
+        return not isinstance(self.backend, MemoryBackend)
+
+    def peek(self, key):
+        """Return the stored value for ``key`` regardless of age, or None."""
+        entry = self._read(key)
+        return entry[0] if entry else None
+
+    def set(self, key, value, retain_seconds=DEFAULT_RETAIN_SECONDS):
+        """Store a value, stamped with the current time."""
+        try:
+            self.backend.set(key, value, time.time(), retain_seconds)
+        except Exception as e:
+            print(f"[Cache] Backend write failed for {key}: {e}")
+            self._count(key, "errors")
+
+    def delete(self, key):
+        """Remove a key from the backend."""
+        try:
+            self.backend.delete(key)
+        except Exception as e:
+            print(f"[Cache] Backend delete failed for {key}: {e}")
+            self._count(key, "errors")
+
+    def _refresh(self, key, refresh, retain_seconds):
+        source = self.sources.get(key)
+
+        def run():
+            self._count(key, "refreshes")
+            try:
+                value = refresh()
+            except Exception as e:
+                self._count(key, "errors")
+                if source is not None:
+                    delay = source.record_failure(e)
+                    print(f"[Cache] Refresh failed for {key}: {e}, backing off {delay:.0f}s")
+                else:
+                    print(f"[Cache] Refresh failed for {key}: {e}")
+                return None
+            if value is not None:
+                self.set(key, value, retain_seconds)
+                if source is not None:
+                    source.record_success()
+            elif source is not None:
+                source.record_failure(RefreshError("refresh returned no data"))
+            return value
+
+        value, shared = self.flights.do(key, run)
+        if shared:
+            self._count(key, "coalesced")
+        return value
+
+    def _revalidate_in_background(self, key, refresh, retain_seconds):
+        # Someone is already refreshing this key; the stale value will do
+        if self.flights.in_flight(key):
+            return None
+
+        def run():
+            try:
+                self._refresh(key, refresh, retain_seconds)
+            except Exception as e:
+                print(f"[Cache] Background refresh failed for {key}: {e}")
+
+        thread = threading.Thread(target=run, name=f"cache-revalidate-{key}", daemon=True)
+        thread.start()
+        return thread
+
+    def get_or_refresh(self, key, refresh, ttl, stale_ttl=0, retain_seconds=DEFAULT_RETAIN_SECONDS):
+        """
+        Return a cached value, refreshing it according to its age.
+
+        Args:
+            key (str): Cache key
+            refresh: Callable returning a fresh JSON-serializable value, or
+                None if the upstream call failed
+            ttl (float): Seconds a value is served as fresh
+            stale_ttl (float): Extra seconds a value is served while a
+                background refresh runs
+            retain_seconds (float): Seconds a value is kept for stale-if-error
+
+        Returns:
+            The cached or refreshed value, or None if nothing is available
+        """
+        entry = self._read(key)
+        age = time.time() - entry[1] if entry else None
+
+        if entry and age < ttl:
+            self._count(key, "hits")
+            return entry[0]
+
+        backing_off = self.in_backoff(key)
+        scheduled = self.refresh_ahead and key in self.sources
+
+        if entry and (age < ttl + stale_ttl or scheduled):
+            self._count(key, "stale")
+            if not backing_off:
+                self._revalidate_in_background(key, refresh, retain_seconds)
+            return entry[0]
+
+        self._count(key, "misses")
+        if backing_off or scheduled:
+            # Never wait on an upstream that is rate limiting us, or that
+            # the scheduler is already keeping warm
+            if scheduled and not backing_off:
+                self._revalidate_in_background(key, refresh, retain_seconds)
+            return entry[0] if entry else None
+
+        value = self._refresh(key, refresh, retain_seconds)
+        if value is None and entry:
+            # Upstream failed: the last stored value is better than nothing
+            return entry[0]
+        return value
+
+    def get_stats(self):
+        """Per-key hit/miss/stale/refresh/error counters, plus backoff state for sources."""
+        with self.lock:
+            stats = {key: dict(counts) for key, counts in self.stats.items()}
+        now = time.time()
+        for key, source in self.sources.items():
+            if source.failures:
+                stats.setdefault(key, {})["backoff"] = {
+                    "failures": source.failures,
+                    "retry_in_seconds": round(max(0.0, source.backoff_until - now), 1),
+                    "last_error": source.last_error,
+                }
+        return stats
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        try:
+            self.backend.clear()
+        except Exception as e:
+            print(f"[Cache] Backend clear failed: {e}")
+        with self.lock:
+            self.stats.clear()
+        for source in self.sources.values():
+            source.record_success()
+
+
+market_cache = Cache(create_backend())
@@ -0,0 +1,134 @@
+"""
+Rendered chart image cache.
+
+Chart PNGs are the most CPU-expensive responses we serve, yet the candles
+behind them only change when the open candle ticks or a new one opens.
+Rendered images are kept in a size-bounded LRU keyed by (chart type,
+symbol, timeframe, last candle timestamp, theme), so a new candle produces
+a new key and old images age out. Entries also expire after
+CHART_CACHE_TTL_SECONDS so the still-open candle keeps moving.
+
+Each entry carries an ETag and Last-Modified time for conditional requests.
+When a fresh render is not possible, ``latest`` returns the newest image of
+the same chart regardless of its age.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+CHART_CACHE_MAX_ENTRIES = int(os.environ.get("CHART_CACHE_MAX_ENTRIES", "256"))
+CHART_CACHE_MAX_BYTES = int(os.environ.get("CHART_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CHART_CACHE_TTL_SECONDS = int(os.environ.get("CHART_CACHE_TTL_SECONDS", "60"))
+
+# Charts only come in the dark (black background) style for now
+DEFAULT_CHART_THEME = "dark"
+
+
+class ChartImage:
+    """A rendered PNG with its validators."""
+
+    def __init__(self, png):
+        self.png = png
+        self.etag = hashlib.sha1(png).hexdigest()
+        # HTTP dates have one-second resolution
+        self.created_at = int(time.time())
+
+    def age(self):
+        return time.time() - self.created_at
+
+
+class ChartImageCache:
+    """
+    LRU cache of rendered chart PNGs, bounded by entry count and total bytes.
+
+    Args:
+        max_entries (int): Maximum number of images kept
+        max_bytes (int): Maximum total PNG bytes kept
+        ttl (float): Seconds an image is served before it is rendered again
+    """
+
+    def __init__(self, max_entries=CHART_CACHE_MAX_ENTRIES, max_bytes=CHART_CACHE_MAX_BYTES,
+                 ttl=CHART_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.stats = defaultdict(int)
+
+    def get(self, key):
+        """Return the cached ChartImage for ``key`` if it is still fresh, else None."""
+        with self.lock:
+            image = self.entries.get(key)
+            if image is None or image.age() >= self.ttl:
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return image
+
+    def latest(self, key):
+        """
+        Most recent image for the same chart, ignoring age and last candle.
+
+        Used as a fallback when a fresh render is not possible.
+
+        Args:
+            key (tuple): Cache key; all but the last-candle part must match
+
+        Returns:
+            ChartImage or None
+        """
+        chart = key[:3] + key[4:]
+        with self.lock:
+            for candidate in reversed(self.entries):
+                if candidate[:3] + candidate[4:] == chart:
+                    self.stats["fallbacks"] += 1
+                    return self.entries[candidate]
+        return None
+
+    def put(self, key, png):
+        """
+        Store a rendered PNG, evicting least recently used images past the bounds.
+
+        Args:
+            key (tuple): (chart type, symbol, timeframe, last candle timestamp, theme)
+            png (bytes): Rendered image
+
+        Returns:
+            ChartImage: The stored image
+        """
+        image = ChartImage(png)
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old.png)
+            self.entries[key] = image
+            self.size += len(png)
+            while self.entries and (len(self.entries) > self.max_entries or self.size > self.max_bytes):
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted.png)
+                self.stats["evictions"] += 1
+        return image
+
+    def count(self, field):
+        """Increment a counter, e.g. ``not_modified`` for 304 responses."""
+        with self.lock:
+            self.stats[field] += 1
+
+    def get_stats(self):
+        """Hit/miss/eviction counters plus current entries and bytes."""
+        with self.lock:
+            return dict(self.stats, entries=len(self.entries), bytes=self.size)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.stats.clear()
+
+
+chart_cache = ChartImageCache()
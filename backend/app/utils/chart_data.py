@@ -0,0 +1,81 @@
+"""
+Compact chart-data encodings for client-side rendering.
+
+Serializes an aggregated OHLCV + indicator DataFrame either as columnar JSON
+(one array per field, NaN as null) or as packed little-endian binary arrays
+that JavaScript can map straight onto typed arrays:
+
+    uint32[rows]  candle open times (Unix seconds)
+    float32[rows] one array per field, in the order of the X-Chart-Fields header
+"""
+import numpy as np
+
+OHLCV_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Columns added by market_data.calculate_indicators
+INDICATOR_FIELDS = [
+    "SMA_50", "SMA_200", "MACD_Line", "Signal_Line", "MACD_Histogram", "RSI",
+    "Stoch_K", "Stoch_D", "SMA_20", "StdDev", "Upper_Band", "Lower_Band",
+]
+
+CHART_DATA_FIELDS = OHLCV_FIELDS + INDICATOR_FIELDS
+
+BINARY_MIMETYPE = "application/octet-stream"
+
+
+def parse_fields(raw):
+    """
+    Parse a comma-separated field list.
+
+    Args:
+        raw (str or None): e.g. 'Close,RSI'; empty or None selects every field
+
+    Returns:
+        tuple: (fields, unknown) lists of known and unknown field names
+    """
+    if not raw:
+        return list(CHART_DATA_FIELDS), []
+    requested = [f.strip() for f in raw.split(",") if f.strip()]
+    fields = [f for f in requested if f in CHART_DATA_FIELDS]
+    unknown = [f for f in requested if f not in CHART_DATA_FIELDS]
+    return fields, unknown
+
+
+def candle_times(df):
+    """Candle open times as Unix seconds."""
+    return (df.index.asi8 // 1_000_000_000).astype(np.int64)
+
+
+def to_columnar(df, fields):
+    """
+    Build a columnar JSON-ready dict: one list per field, NaN as None.
+
+    Args:
+        df (pd.DataFrame): Aggregated OHLCV data with indicators
+        fields (list[str]): Columns to include
+
+    Returns:
+        dict: {"time": [...], "columns": {field: [...]}}
+    """
+    columns = {}
+    for field in fields:
+        values = df[field].to_numpy(dtype=np.float64)
+        columns[field] = [None if np.isnan(v) else v for v in values.tolist()]
+    return {"time": candle_times(df).tolist(), "columns": columns}
+
+
+def to_packed(df, fields):
+    """
+    Pack times and fields into little-endian typed arrays.
+
+    Args:
+        df (pd.DataFrame): Aggregated OHLCV data with indicators
+        fields (list[str]): Columns to include, in order
+
+    Returns:
+        bytes: uint32 times followed by one float32 array per field
+    """
+    parts = [candle_times(df).astype("<u4").tobytes()]
+    for field in fields:
+        parts.append(df[field].to_numpy(dtype="<f4").tobytes())
+    return b"".join(parts)
@@ -0,0 +1,259 @@
+"""
+Chart rendering worker pool.
+
+matplotlib rendering is CPU-bound and would otherwise run inside the single
+gevent process, stalling WebSocket emits and every other request while a
+chart is drawn. Renders are sent to a ProcessPoolExecutor instead. The
+request greenlet passes the indicator DataFrame as compact numpy arrays,
+then waits cooperatively (gevent.sleep polling) for the PNG bytes.
+
+When more than CHART_RENDER_MAX_QUEUE renders are pending, or a render
+takes longer than CHART_RENDER_TIMEOUT_SECONDS, ``render`` raises
+RenderUnavailable. Callers then fall back to a cached image. A worker
+process cannot be interrupted, so a timed-out render that already started
+keeps its worker (and its queue slot) until it finishes; while every worker
+is held that way, new renders are refused instead of queueing behind them.
+Set CHART_RENDER_WORKERS=0 to render inline.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+import gevent
+import numpy as np
+import pandas as pd
+from backend.app.prediction.charts import plot_price_chart, plot_macd_rsi, plot_bollinger_bands
+
+CHART_RENDER_WORKERS = int(os.environ.get("CHART_RENDER_WORKERS", "2"))
+CHART_RENDER_TIMEOUT_SECONDS = float(os.environ.get("CHART_RENDER_TIMEOUT_SECONDS", "15"))
+CHART_RENDER_MAX_QUEUE = int(os.environ.get("CHART_RENDER_MAX_QUEUE", str(max(1, CHART_RENDER_WORKERS) * 4)))
+
+# How often a waiting request checks whether its render finished
+RENDER_POLL_SECONDS = 0.01
+
+# Chart type -> plot function, looked up inside the worker by name
+CHART_PLOTTERS = {
+    "price": lambda df, symbol, timeframe: plot_price_chart(df, symbol, timeframe),
+    "macd-rsi": lambda df, symbol, timeframe: plot_macd_rsi(df, timeframe),
+    "bollinger": lambda df, symbol, timeframe: plot_bollinger_bands(df, symbol, timeframe),
+}
+
+
+class RenderUnavailable(Exception):
+    """Raised when the pool is saturated, broken or a render timed out."""
+
+
+def render_png(fig):
+    """Convert matplotlib figure to PNG bytes, then release the figure's artists."""
+    output = BytesIO()
+    try:
+        fig.savefig(output, format="png", bbox_inches='tight')
+        return output.getvalue()
+    finally:
+        fig.clear()
+
+
+def pack_frame(df):
+    """Reduce a DataFrame to a datetime64 index and one float64 array per column."""
+    return {
+        "index": df.index.asi8,
+        "columns": {name: df[name].to_numpy(dtype=np.float64) for name in df.columns},
+    }
+
+
+def unpack_frame(frame):
+    """Rebuild the DataFrame produced by ``pack_frame``."""
+    return pd.DataFrame(frame["columns"], index=pd.DatetimeIndex(frame["index"].view("datetime64[ns]")))
+
+
+def render_chart_png(chart_type, symbol, timeframe, frame):
+    """
+    Render one chart to PNG. Runs inside the worker processes.
+
+    Args:
+        chart_type (str): Key of CHART_PLOTTERS
+        symbol (str): Cryptocurrency trading symbol
+        timeframe (str): Candle aggregation period
+        frame (dict): Indicator data packed by ``pack_frame``
+
+    Returns:
+        bytes or None: PNG image, or None if the plot had too little data
+    """
+    fig = CHART_PLOTTERS[chart_type](unpack_frame(frame), symbol, timeframe)
+    if fig is None:
+        return None
+    return render_png(fig)
+
+
+def _worker_context():
+    """
+    Multiprocessing context for render workers.
+
+    The pool starts lazily, when the process already runs the ticker stream,
+    refresh and prediction-job threads. Forking a multithreaded process can
+    deadlock the child on a lock held at fork time, so workers come from a
+    single-threaded forkserver (spawn where that is unavailable) that has the
+    chart module preloaded.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class ChartRenderPool:
+    """
+    Process pool for chart renders with a bounded queue and per-render timeout.
+
+    Args:
+        workers (int): Worker processes; 0 renders inline in the caller
+        timeout (float): Seconds to wait for a render
+        max_queue (int): Pending renders allowed before new ones are refused
+    """
+
+    def __init__(self, workers=CHART_RENDER_WORKERS, timeout=CHART_RENDER_TIMEOUT_SECONDS,
+                 max_queue=CHART_RENDER_MAX_QUEUE):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_queue = max_queue
+        self.executor = None
+        self.pending = 0
+        self.abandoned = 0
+        self.lock = threading.Lock()
+        self.stats = defaultdict(int)
+
+    def _get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_worker_context())
+            return self.executor
+
+    def _reset_executor(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finished(self, future):
+        if future.cancelled():
+            outcome = "cancelled"
+        else:
+            outcome = "failed" if future.exception() else "completed"
+        with self.lock:
+            self.pending -= 1
+            self.stats[outcome] += 1
+
+    def _abandoned_finished(self, future):
+        with self.lock:
+            self.abandoned -= 1
+
+    def submit(self, chart_type, symbol, timeframe, frame):
+        """
+        Queue a render in the pool.
+
+        Args:
+            chart_type (str): Key of CHART_PLOTTERS
+            symbol (str): Cryptocurrency trading symbol
+            timeframe (str): Candle aggregation period
+            frame (dict): Indicator data packed by ``pack_frame``
+
+        Returns:
+            concurrent.futures.Future: Resolves to the PNG bytes (or None)
+
+        Raises:
+            RenderUnavailable: If the queue is full, every worker is still busy
+                with a timed-out render, or the pool is broken
+        """
+        if self.workers <= 0:
+            future = Future()
+            future.set_result(render_chart_png(chart_type, symbol, timeframe, frame))
+            return future
+
+        with self.lock:
+            if self.pending >= self.max_queue:
+                self.stats["saturated"] += 1
+                raise RenderUnavailable("render queue is full")
+            if self.abandoned >= self.workers:
+                self.stats["saturated"] += 1
+                raise RenderUnavailable("render workers are busy with timed-out renders")
+            self.pending += 1
+            self.stats["submitted"] += 1
+
+        try:
+            future = self._get_executor().submit(render_chart_png, chart_type, symbol, timeframe, frame)
+        except (BrokenProcessPool, RuntimeError) as e:
+            with self.lock:
+                self.pending -= 1
+                self.stats["failed"] += 1
+            self._reset_executor()
+            raise RenderUnavailable(f"render pool unavailable: {e}")
+        future.add_done_callback(self._finished)
+        return future
+
+    def wait(self, future, deadline=None):
+        """
+        Wait for a submitted render without blocking the gevent hub.
+
+        Args:
+            future (concurrent.futures.Future): Returned by ``submit``
+            deadline (float, optional): time.monotonic() value to give up at;
+                defaults to the pool timeout from now
+
+        Returns:
+            bytes or None: PNG image, or None if the plot had too little data
+
+        Raises:
+            RenderUnavailable: If the render timed out or the pool broke
+        """
+        if deadline is None:
+            deadline = time.monotonic() + self.timeout
+        while not future.done():
+            if time.monotonic() >= deadline:
+                # A render that already started cannot be cancelled; track it until it ends
+                if not future.cancel():
+                    with self.lock:
+                        self.abandoned += 1
+                    future.add_done_callback(self._abandoned_finished)
+                with self.lock:
+                    self.stats["timeouts"] += 1
+                print(f"[Charts] Render timed out after {self.timeout}s")
+                raise RenderUnavailable("render timed out")
+            gevent.sleep(RENDER_POLL_SECONDS)
+
+        try:
+            return future.result()
+        except BrokenProcessPool as e:
+            self._reset_executor()
+            raise RenderUnavailable(f"render pool broke: {e}")
+
+    def render(self, chart_type, symbol, timeframe, df):
+        """
+        Render a single chart in the pool and wait for it.
+
+        Args:
+            chart_type (str): Key of CHART_PLOTTERS
+            symbol (str): Cryptocurrency trading symbol
+            timeframe (str): Candle aggregation period
+            df (pd.DataFrame): OHLCV data with indicators
+
+        Returns:
+            bytes or None: PNG image, or None if the plot had too little data
+
+        Raises:
+            RenderUnavailable: If the queue is full, the pool broke or the render timed out
+        """
+        return self.wait(self.submit(chart_type, symbol, timeframe, pack_frame(df)))
+
+    def get_stats(self):
+        """Pool size, queue depth, timed-out renders still running and submitted/completed/failed/timeout counters."""
+        with self.lock:
+            return dict(self.stats, workers=self.workers, queue_depth=self.pending, max_queue=self.max_queue,
+                        abandoned=self.abandoned)
+
+
+chart_render_pool = ChartRenderPool()
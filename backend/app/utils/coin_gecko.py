@@ -71,6 +71,10 @@ def update_coin_snapshots():
             db.session.add(snapshot)
 
         db.session.commit()
+
+        # Imported here: socket_tasks -> api -> coin_gecko would be circular
+        from backend.app.utils.socket_tasks import invalidate_snapshot_cache
+        invalidate_snapshot_cache()
         print("[Snapshot] CoinSnapshots updated successfully.")
 
     except Exception as e:
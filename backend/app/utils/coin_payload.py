@@ -0,0 +1,140 @@
+"""
+Pre-serialized, versioned coin_data broadcast payload.
+
+The ``coin_data`` message is built once per ticker-cache refresh, serialized
+to JSON once and stored with a version number. WebSocket connects, client
+requests, the periodic broadcast and the internal emit route all send that
+stored blob instead of rebuilding it from the DB. The version only changes
+when the serialized content does, so clients can skip unchanged payloads.
+
+Each change also produces a delta (only the fields that changed, per coin
+symbol) tagged with a sequence number equal to the payload version, for
+clients subscribed to the delta stream.
+
+``PayloadJSON`` is the JSON module handed to Socket.IO: it splices
+``RawJSON`` fragments into packets verbatim, so the stored blob reaches
+clients as a normal JSON array without being re-encoded per emit.
+"""
+import json
+import time
+
+
+class RawJSON(str):
+    """A string holding already-serialized JSON, emitted as-is."""
+
+
+class PayloadJSON:
+    """``json``-compatible module for Socket.IO that passes RawJSON through."""
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        if isinstance(obj, list) and any(isinstance(item, RawJSON) for item in obj):
+            parts = [item if isinstance(item, RawJSON) else json.dumps(item, **kwargs) for item in obj]
+            return "[" + ",".join(parts) + "]"
+        return json.dumps(obj, **kwargs)
+
+    @staticmethod
+    def loads(*args, **kwargs):
+        return json.loads(*args, **kwargs)
+
+
+def diff_coins(old, new):
+    """
+    Field-level difference between two coin lists, keyed by coin symbol.
+
+    Args:
+        old (list[dict]): Previous coin dicts
+        new (list[dict]): Current coin dicts
+
+    Returns:
+        tuple: (changes, removed) where changes maps symbol to the changed
+        fields (all fields for new coins) and removed lists dropped symbols
+    """
+    old_by_symbol = {coin["symbol"]: coin for coin in old}
+    changes = {}
+    for coin in new:
+        previous = old_by_symbol.get(coin["symbol"], {})
+        changed = {key: value for key, value in coin.items() if key not in previous or previous[key] != value}
+        if changed:
+            changes[coin["symbol"]] = changed
+    new_symbols = {coin["symbol"] for coin in new}
+    removed = [symbol for symbol in old_by_symbol if symbol not in new_symbols]
+    return changes, removed
+
+
+class CoinPayload:
+    """
+    Holds the latest coin_data payload and its version.
+
+    Args:
+        builder: Callable returning the list of coin dicts to broadcast
+    """
+
+    def __init__(self, builder):
+        self.builder = builder
+        self.version = 0
+        self.coins = []
+        self.json = None
+        self.delta = None
+        self.built_at = None
+
+    def refresh(self):
+        """
+        Rebuild the payload from the builder.
+
+        The version is bumped only if the serialized payload changed. An empty
+        build keeps the previous payload, so clients never receive an empty
+        list after a transient upstream failure.
+
+        Returns:
+            bool: True if the payload changed
+        """
+        coins = self.builder()
+        if not coins:
+            return False
+
+        blob = json.dumps(coins, separators=(",", ":"))
+        self.built_at = time.time()
+        if blob == self.json:
+            return False
+
+        changes, removed = diff_coins(self.coins, coins)
+        self.delta = RawJSON(json.dumps(
+            {"seq": self.version + 1, "base": self.version, "changes": changes, "removed": removed},
+            separators=(",", ":")
+        ))
+        self.coins = coins
+        self.json = RawJSON(blob)
+        self.version += 1
+        return True
+
+    def current(self):
+        """
+        Return the stored payload, building it first if none exists yet.
+
+        Returns:
+            tuple: (RawJSON blob or None, version)
+        """
+        if self.json is None:
+            self.refresh()
+        return self.json, self.version
+
+    def snapshot(self):
+        """
+        Full snapshot message for delta-stream clients.
+
+        Returns:
+            RawJSON or None: ``{"seq": version, "coins": [...]}``
+        """
+        blob, version = self.current()
+        if blob is None:
+            return None
+        return RawJSON(f'{{"seq":{version},"coins":{blob}}}')
+
+    def reset(self):
+        """Drop the stored payload (used by tests)."""
+        self.version = 0
+        self.coins = []
+        self.json = None
+        self.delta = None
+        self.built_at = None
@@ -0,0 +1,157 @@
+"""
+Bulk database write helpers for time-series ingestion.
+
+Provides a dialect-aware "insert, skip duplicates" primitive so ingest paths
+can write candles in batches without a per-row existence SELECT. Relies on the
+unique (coin_id, timestamp) index on historical_data to reject duplicates.
+Technical indicator rows are de-duplicated with a single timestamp lookup per
+coin and an anti-join in pandas before a bulk insert.
+"""
+from datetime import datetime, timezone
+import pandas as pd
+from sqlalchemy import insert, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from backend.app.models import db, HistoricalData, TechnicalIndicators
+
+# Rows per INSERT statement. Kept small enough that rows * columns stays under
+# SQLite's historical 999 bound-parameter limit for the widest tables we write.
+DEFAULT_BATCH_SIZE = 100
+
+
+def insert_ignore_duplicates(model, rows, conflict_columns, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Insert rows in batches, silently skipping rows that violate a unique index.
+
+    Uses ``INSERT ... ON CONFLICT DO NOTHING`` on PostgreSQL and
+    ``INSERT OR IGNORE`` on SQLite. Other dialects fall back to one SELECT per
+    batch to filter out existing keys. Does not commit; the caller owns the
+    transaction.
+
+    Args:
+        model: SQLAlchemy model class to insert into
+        rows (list[dict]): Column-name to value mappings
+        conflict_columns (tuple[str]): Columns covered by the unique index
+        batch_size (int): Rows per INSERT statement
+
+    Returns:
+        int: Number of rows actually inserted
+    """
+    if not rows:
+        return 0
+
+    table = model.__table__
+    dialect = db.session.get_bind().dialect.name
+    inserted = 0
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+
+        if dialect == "postgresql":
+            stmt = pg_insert(table).values(batch).on_conflict_do_nothing(index_elements=list(conflict_columns))
+        elif dialect == "sqlite":
+            stmt = insert(table).values(batch).prefix_with("OR IGNORE")
+        else:
+            key_cols = [table.c[name] for name in conflict_columns]
+            keys = {tuple(row[name] for name in conflict_columns) for row in batch}
+            existing = set(db.session.execute(
+                db.select(*key_cols).where(tuple_(*key_cols).in_(keys))
+            ).all())
+            batch = [row for row in batch if tuple(row[name] for name in conflict_columns) not in existing]
+            if not batch:
+                continue
+            stmt = insert(table).values(batch)
+
+        result = db.session.execute(stmt)
+        inserted += max(result.rowcount, 0)
+
+    return inserted
+
+
+def to_naive_utc(ts):
+    """Convert a datetime to naive UTC, matching how timestamps are stored in the DB."""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def kline_to_historical_row(coin_id, entry):
+    """
+    Convert a raw Binance kline into a HistoricalData row mapping.
+
+    Args:
+        coin_id (int): Database ID of the coin
+        entry (list): Binance kline ``[open_time, open, high, low, close, volume, ...]``
+
+    Returns:
+        dict: Column values for HistoricalData with a naive UTC timestamp
+    """
+    return {
+        "coin_id": coin_id,
+        "price": float(entry[4]),  # close price of the candle
+        "high": float(entry[2]),
+        "low": float(entry[3]),
+        "volume": float(entry[5]),
+        "timestamp": datetime.fromtimestamp(entry[0] / 1000.0, tz=timezone.utc).replace(tzinfo=None),
+    }
+
+
+def insert_historical_rows(rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Bulk insert HistoricalData rows, skipping (coin_id, timestamp) duplicates.
+
+    Args:
+        rows (list[dict]): HistoricalData column mappings
+        batch_size (int): Rows per INSERT statement
+
+    Returns:
+        int: Number of new rows inserted
+    """
+    for row in rows:
+        row["timestamp"] = to_naive_utc(row["timestamp"])
+    return insert_ignore_duplicates(HistoricalData, rows, ("coin_id", "timestamp"), batch_size)
+
+
+def insert_new_indicator_rows(coin_id, rows):
+    """
+    Bulk insert TechnicalIndicators rows whose timestamps are not stored yet.
+
+    Fetches the coin's existing timestamps in the rows' time range with one
+    query, drops those rows with a pandas anti-join and writes the remainder
+    with a single executemany INSERT. Does not commit; the caller owns the
+    transaction.
+
+    Args:
+        coin_id (int): Database ID of the coin
+        rows (list[dict] or pd.DataFrame): Indicator values keyed by
+            TechnicalIndicators column names, including ``timestamp``
+
+    Returns:
+        int: Number of rows inserted
+    """
+    df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows)
+    if df.empty:
+        return 0
+
+    df = df.drop_duplicates(subset="timestamp", keep="last")
+    timestamps = pd.to_datetime(df["timestamp"])
+    existing = db.session.execute(
+        db.select(TechnicalIndicators.timestamp).where(
+            TechnicalIndicators.coin_id == coin_id,
+            TechnicalIndicators.timestamp >= timestamps.min().to_pydatetime(),
+            TechnicalIndicators.timestamp <= timestamps.max().to_pydatetime()
+        )
+    ).scalars().all()
+
+    # Anti-join: keep only timestamps that are not already stored
+    new_rows = df[~timestamps.isin(pd.to_datetime(existing))]
+    if new_rows.empty:
+        return 0
+
+    columns = [c.name for c in TechnicalIndicators.__table__.columns if c.name not in ("id", "coin_id")]
+    records = new_rows[columns].to_dict("records")
+    for record in records:
+        record["coin_id"] = coin_id
+        record["timestamp"] = to_naive_utc(pd.Timestamp(record["timestamp"]).to_pydatetime())
+
+    db.session.execute(insert(TechnicalIndicators.__table__), records)
+    return len(records)
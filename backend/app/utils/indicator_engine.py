@@ -0,0 +1,404 @@
+"""
+Incremental technical-indicator engine.
+
+Keeps per-coin rolling state (EMA accumulators, Wilder RSI averages and
+fixed-size windows for SMA, Stochastic RSI and Bollinger Bands) so each new
+candle is folded in with O(1) work instead of recomputing a whole window.
+Produces the same values as the pandas / pandas_ta indicators used by the
+hourly cron (SMA/EMA via pandas, RSI, MACD, StochRSI and BBands via pandas_ta
+defaults) evaluated over the same chronological series.
+
+State is JSON-serializable and persisted in the ``indicator_engine_state``
+table, so the hourly cron only reads candles newer than the saved state.
+"""
+import json
+import math
+from collections import deque
+from datetime import datetime, timezone
+import numpy as np
+from sqlalchemy import func
+from backend.app.models import db, HistoricalData, IndicatorEngineState, TechnicalIndicators
+
+# Bump when the state layout or indicator definitions change; stored state
+# with a different version is discarded and rebuilt from the DB.
+ENGINE_VERSION = 1
+
+# Candles replayed when no usable state exists (matches the old 200-row tail)
+WARMUP_CANDLES = 200
+
+# Smallest positive float, used like pandas_ta.non_zero_range for flat windows
+EPSILON = np.finfo(float).eps
+
+
+def _mean(values):
+    """Mean computed like pandas (numpy pairwise sum divided by count)."""
+    return float(np.asarray(values, dtype=float).sum() / len(values))
+
+
+class _Ewm:
+    """
+    Exponentially weighted mean matching ``Series.ewm(adjust=False).mean()``.
+
+    When ``seed_length`` > 1 the first output is the simple mean of the first
+    ``seed_length`` values, which is how pandas_ta seeds its EMA (``presma``).
+    """
+
+    def __init__(self, com, seed_length=1):
+        self.alpha = 1.0 / (1.0 + com)
+        self.seed_length = seed_length
+        self.seed = []
+        self.value = None
+
+    @classmethod
+    def from_span(cls, span, seed_length=1):
+        return cls((span - 1) / 2.0, seed_length)
+
+    @classmethod
+    def from_alpha(cls, alpha, seed_length=1):
+        return cls(1.0 / alpha - 1.0, seed_length)
+
+    def update(self, x):
+        if self.value is None:
+            self.seed.append(x)
+            if len(self.seed) < self.seed_length:
+                return None
+            self.value = _mean(self.seed) if self.seed_length > 1 else x
+            self.seed = []
+            return self.value
+
+        # Same arithmetic as pandas' ewm kernel for adjust=False
+        if self.value != x:
+            old_wt = 1.0 - self.alpha
+            self.value = (old_wt * self.value + self.alpha * x) / (old_wt + self.alpha)
+        return self.value
+
+    def to_dict(self):
+        return {"seed": self.seed, "value": self.value}
+
+    def load(self, data):
+        self.seed = list(data["seed"])
+        self.value = data["value"]
+
+
+class _Window:
+    """Fixed-size rolling window; ``full`` mirrors pandas' default min_periods."""
+
+    def __init__(self, size):
+        self.values = deque(maxlen=size)
+
+    @property
+    def full(self):
+        return len(self.values) == self.values.maxlen
+
+    def push(self, x):
+        self.values.append(x)
+
+    def mean(self):
+        return _mean(self.values)
+
+    def std(self):
+        # Sample standard deviation (ddof=1), as used by pandas_ta.bbands
+        return float(np.std(np.asarray(self.values, dtype=float), ddof=1))
+
+    def to_list(self):
+        return list(self.values)
+
+    def load(self, values):
+        self.values.clear()
+        self.values.extend(values)
+
+
+class IncrementalIndicators:
+    """
+    Rolling indicator state for a single coin.
+
+    Feed candles in chronological order with ``update``. Once enough history
+    has been seen for every indicator to be defined (34 candles, driven by the
+    MACD signal line), each call returns a dict keyed like the
+    ``TechnicalIndicators`` columns; earlier calls return None, matching the
+    ``dropna`` of the batch computation.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.prev_price = None
+        self.prev_volume = None
+
+        # Trend (pandas rolling/ewm with min_periods=1)
+        self.sma_50 = _Window(50)
+        self.sma_200 = _Window(200)
+        self.ema_50 = _Ewm.from_span(50)
+        self.ema_200 = _Ewm.from_span(200)
+
+        # RSI(14), Wilder smoothing of gains and losses
+        self.rsi_gain = _Ewm.from_alpha(1.0 / 14)
+        self.rsi_loss = _Ewm.from_alpha(1.0 / 14)
+
+        # MACD(12, 26, 9) with SMA-seeded EMAs
+        self.ema_fast = _Ewm.from_span(12, seed_length=12)
+        self.ema_slow = _Ewm.from_span(26, seed_length=26)
+        self.macd_signal = _Ewm.from_span(9, seed_length=9)
+
+        # StochRSI(14, 14, 3, 3)
+        self.stoch_rsi = _Window(14)
+        self.stoch_k = _Window(3)
+        self.stoch_d = _Window(3)
+
+        # Bollinger Bands(5, 2)
+        self.bb = _Window(5)
+
+    def update(self, timestamp, price, volume):
+        """
+        Fold one candle into the state.
+
+        Args:
+            timestamp (datetime): Candle timestamp
+            price (float): Closing price
+            volume (float): Candle volume
+
+        Returns:
+            dict or None: Indicator values for this candle, or None while warming up
+        """
+        price = float(price)
+        volume = float(volume)
+        self.count += 1
+
+        self.sma_50.push(price)
+        self.sma_200.push(price)
+        ema_50 = self.ema_50.update(price)
+        ema_200 = self.ema_200.update(price)
+
+        rsi = None
+        volume_change = None
+        if self.prev_price is not None:
+            delta = price - self.prev_price
+            avg_gain = self.rsi_gain.update(delta if delta > 0 else 0.0)
+            avg_loss = self.rsi_loss.update(delta if delta < 0 else 0.0)
+            denominator = avg_gain + abs(avg_loss)
+            rsi = 100 * avg_gain / denominator if denominator != 0 else math.nan
+            volume_change = volume - self.prev_volume
+        self.prev_price = price
+        self.prev_volume = volume
+
+        macd = None
+        signal = None
+        fast = self.ema_fast.update(price)
+        slow = self.ema_slow.update(price)
+        if fast is not None and slow is not None:
+            macd = fast - slow
+            signal = self.macd_signal.update(macd)
+
+        stoch_k = None
+        stoch_d = None
+        if rsi is not None:
+            self.stoch_rsi.push(rsi)
+        if self.stoch_rsi.full:
+            if any(math.isnan(v) for v in self.stoch_rsi.values):
+                stoch = math.nan
+            else:
+                lowest = min(self.stoch_rsi.values)
+                highest = max(self.stoch_rsi.values)
+                spread = highest - lowest
+                stoch = 100 * (rsi - lowest) / (spread if spread != 0 else EPSILON)
+            self.stoch_k.push(stoch)
+            if self.stoch_k.full:
+                stoch_k = self.stoch_k.mean()
+                self.stoch_d.push(stoch_k)
+                if self.stoch_d.full:
+                    stoch_d = self.stoch_d.mean()
+
+        self.bb.push(price)
+        bb_middle = bb_upper = bb_lower = None
+        if self.bb.full:
+            bb_middle = self.bb.mean()
+            deviation = 2.0 * self.bb.std()
+            bb_upper = bb_middle + deviation
+            bb_lower = bb_middle - deviation
+
+        row = {
+            "SMA_50": self.sma_50.mean(),
+            "SMA_200": self.sma_200.mean(),
+            "EMA_50": ema_50,
+            "EMA_200": ema_200,
+            "RSI": rsi,
+            "MACD": macd,
+            "MACD_Signal": signal,
+            "Stoch_RSI_K": stoch_k,
+            "Stoch_RSI_D": stoch_d,
+            "BB_upper": bb_upper,
+            "BB_middle": bb_middle,
+            "BB_lower": bb_lower,
+            "Volume_Change": volume_change,
+        }
+        if any(v is None or math.isnan(v) for v in row.values()):
+            return None
+
+        row["timestamp"] = timestamp
+        return row
+
+    def to_dict(self):
+        """Serialize the state into JSON-compatible primitives."""
+        return {
+            "version": ENGINE_VERSION,
+            "count": self.count,
+            "prev_price": self.prev_price,
+            "prev_volume": self.prev_volume,
+            "sma_50": self.sma_50.to_list(),
+            "sma_200": self.sma_200.to_list(),
+            "ema_50": self.ema_50.to_dict(),
+            "ema_200": self.ema_200.to_dict(),
+            "rsi_gain": self.rsi_gain.to_dict(),
+            "rsi_loss": self.rsi_loss.to_dict(),
+            "ema_fast": self.ema_fast.to_dict(),
+            "ema_slow": self.ema_slow.to_dict(),
+            "macd_signal": self.macd_signal.to_dict(),
+            "stoch_rsi": self.stoch_rsi.to_list(),
+            "stoch_k": self.stoch_k.to_list(),
+            "stoch_d": self.stoch_d.to_list(),
+            "bb": self.bb.to_list(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Restore an engine from ``to_dict`` output.
+
+        Returns:
+            IncrementalIndicators or None: None if the state was written by
+            a different ENGINE_VERSION and must be rebuilt
+        """
+        if data.get("version") != ENGINE_VERSION:
+            return None
+
+        engine = cls()
+        engine.count = data["count"]
+        engine.prev_price = data["prev_price"]
+        engine.prev_volume = data["prev_volume"]
+        for name in ("sma_50", "sma_200", "stoch_rsi", "stoch_k", "stoch_d", "bb"):
+            getattr(engine, name).load(data[name])
+        for name in ("ema_50", "ema_200", "rsi_gain", "rsi_loss", "ema_fast", "ema_slow", "macd_signal"):
+            getattr(engine, name).load(data[name])
+        return engine
+
+    @classmethod
+    def replay(cls, candles):
+        """
+        Build a fresh engine from a chronological sequence of candles.
+
+        Args:
+            candles: Iterable of (timestamp, price, volume) tuples
+
+        Returns:
+            tuple: (engine, rows) where rows are the non-None ``update`` outputs
+        """
+        engine = cls()
+        rows = []
+        for timestamp, price, volume in candles:
+            row = engine.update(timestamp, price, volume)
+            if row is not None:
+                rows.append(row)
+        return engine, rows
+
+
+def _earliest_late_candle(coin_id, last_timestamp, last_id):
+    """
+    Timestamp of the oldest candle inserted after the state was saved but
+    dated at or before its last candle (e.g. a gap filled by a backfill),
+    or None. States saved before ``last_id`` was tracked are trusted.
+    """
+    if last_id is None:
+        return None
+    return db.session.query(func.min(HistoricalData.timestamp)).filter(
+        HistoricalData.coin_id == coin_id,
+        HistoricalData.timestamp <= last_timestamp,
+        HistoricalData.id > last_id
+    ).scalar()
+
+
+def _candles(coin_id, *criteria):
+    return (
+        db.session.query(HistoricalData.timestamp, HistoricalData.price, HistoricalData.volume)
+        .filter(HistoricalData.coin_id == coin_id, *criteria)
+        .order_by(HistoricalData.timestamp.asc())
+        .all()
+    )
+
+
+def compute_new_indicator_rows(coin_id):
+    """
+    Advance the persisted engine for a coin and return rows for new candles.
+
+    Loads the saved state and folds in only HistoricalData newer than the last
+    processed candle. If there is no usable state, the engine is rebuilt from
+    the most recent WARMUP_CANDLES candles.
+
+    A candle inserted after the state was saved but dated before its last
+    candle (detected via the highest candle id the state has seen) would be
+    skipped forever, so the engine is instead replayed from WARMUP_CANDLES
+    before that candle, and the stored indicator rows from it on are deleted
+    so they are rewritten from the corrected series. The updated state is
+    added to the session; the caller commits.
+
+    Args:
+        coin_id (int): Database ID of the coin
+
+    Returns:
+        list[dict]: Indicator rows (TechnicalIndicators columns) for new candles
+    """
+    saved = IndicatorEngineState.query.filter_by(coin_id=coin_id).first()
+    state = json.loads(saved.state) if saved else None
+    engine = IncrementalIndicators.from_dict(state) if state else None
+    late = _earliest_late_candle(coin_id, saved.last_timestamp, state.get("last_id")) if engine else None
+
+    if late is not None:
+        print(f"[Indicators] Coin {coin_id}: candle at {late} was inserted late, replaying from before it")
+        db.session.query(TechnicalIndicators).filter(
+            TechnicalIndicators.coin_id == coin_id,
+            TechnicalIndicators.timestamp >= late
+        ).delete()
+        warmup_start = (
+            db.session.query(HistoricalData.timestamp)
+            .filter(HistoricalData.coin_id == coin_id, HistoricalData.timestamp < late)
+            .order_by(HistoricalData.timestamp.desc())
+            .offset(WARMUP_CANDLES - 1)
+            .limit(1)
+            .scalar()
+        )
+        candles = _candles(coin_id, HistoricalData.timestamp >= warmup_start) if warmup_start else _candles(coin_id)
+        # Rows before the late candle are still stored and get skipped on insert
+        engine, rows = IncrementalIndicators.replay(candles)
+    elif engine is not None:
+        candles = _candles(coin_id, HistoricalData.timestamp > saved.last_timestamp)
+        rows = []
+        for timestamp, price, volume in candles:
+            row = engine.update(timestamp, price, volume)
+            if row is not None:
+                rows.append(row)
+    else:
+        candles = (
+            db.session.query(HistoricalData.timestamp, HistoricalData.price, HistoricalData.volume)
+            .filter(HistoricalData.coin_id == coin_id)
+            .order_by(HistoricalData.timestamp.desc())
+            .limit(WARMUP_CANDLES)
+            .all()
+        )
+        candles.reverse()
+        engine, rows = IncrementalIndicators.replay(candles)
+
+    if not candles:
+        return []
+
+    # Highest id among the candles the state now covers, to spot later late inserts
+    last_id = db.session.query(func.max(HistoricalData.id)).filter(
+        HistoricalData.coin_id == coin_id,
+        HistoricalData.timestamp <= candles[-1][0]
+    ).scalar()
+
+    if saved is None:
+        saved = IndicatorEngineState(coin_id=coin_id)
+        db.session.add(saved)
+    saved.last_timestamp = candles[-1][0]
+    saved.state = json.dumps(dict(engine.to_dict(), last_id=last_id))
+    saved.updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    return rows
@@ -0,0 +1,139 @@
+"""
+Server-side OHLCV kline store.
+
+Keeps the raw Binance klines for each (symbol, interval) in the shared
+``market_cache`` (memory, Redis or SQLite depending on CACHE_BACKEND), so
+chart and prediction requests stop downloading the same 1,000 candles on
+every call. After the first fill only the tail is fetched again: the last
+stored candle, which may still have been open when it was stored, plus
+anything newer, requested with a limit that covers just those candles.
+
+The tail is refetched as soon as the last stored candle's close time has
+passed, so a new candle shows up right after the boundary. While a candle
+is still open, it is refreshed at most every KLINE_TAIL_REFRESH_SECONDS.
+"""
+import os
+import threading
+import time
+from collections import defaultdict
+from backend.app.utils.binance_klines import fetch_klines
+from backend.app.utils.cache import market_cache
+from backend.app.utils.single_flight import SingleFlight
+
+# How often the still-open candle is refreshed between candle closes
+KLINE_TAIL_REFRESH_SECONDS = float(os.environ.get("KLINE_TAIL_REFRESH_SECONDS", "30"))
+
+KLINE_CACHE_KEY_PREFIX = "klines"
+
+# Indexes into a raw Binance kline
+OPEN_TIME = 0
+CLOSE_TIME = 6
+
+
+class KlineStore:
+    """
+    Incrementally updated kline series keyed by (symbol, interval).
+
+    Args:
+        cache (Cache): Cache the series are stored in
+    """
+
+    def __init__(self, cache=market_cache):
+        self.cache = cache
+        self.flights = SingleFlight()
+        self.lock = threading.Lock()
+        self.stats = defaultdict(int)
+
+    def _key(self, symbol, interval):
+        return f"{KLINE_CACHE_KEY_PREFIX}:{symbol}:{interval}"
+
+    def _count(self, field, amount=1):
+        with self.lock:
+            self.stats[field] += amount
+
+    def get_klines(self, symbol, interval, limit=1000):
+        """
+        Return the most recent ``limit`` klines, fetching only what is missing.
+
+        Args:
+            symbol (str): Binance trading pair (e.g., 'BTCUSDT')
+            interval (str): Kline interval (e.g., '1h', '1d', '1w')
+            limit (int): Number of candles to return
+
+        Returns:
+            list: Raw Binance klines in chronological order
+
+        Raises:
+            requests.RequestException: If the download fails
+        """
+        key = self._key(symbol, interval)
+        series = self.cache.peek(key)
+        if series is not None and not self._needs_update(series, limit):
+            self._count("hits")
+            return series["rows"][-limit:]
+
+        # Concurrent requests for the same series share one download
+        series, _ = self.flights.do(key, lambda: self._update(key, symbol, interval, limit))
+        return series["rows"][-limit:]
+
+    def _needs_update(self, series, limit):
+        if not series["rows"]:
+            return True
+        if limit > series["depth"] and not series["complete"]:
+            return True
+        now = time.time()
+        last_close = series["rows"][-1][CLOSE_TIME] / 1000
+        # Candle-close boundary passed since the last check: a new candle has opened
+        if series["checked_at"] <= last_close < now:
+            return True
+        return now - series["checked_at"] >= KLINE_TAIL_REFRESH_SECONDS
+
+    def _update(self, key, symbol, interval, limit):
+        # Another caller may have updated the series while this one waited
+        series = self.cache.peek(key)
+        if series is not None and not self._needs_update(series, limit):
+            self._count("hits")
+            return series
+
+        if series is None or not series["rows"] or (limit > series["depth"] and not series["complete"]):
+            rows = fetch_klines(symbol, interval, limit)
+            self._count("full_fetches")
+            self._count("candles_fetched", len(rows))
+            series = {
+                "rows": rows,
+                "depth": limit,
+                "complete": len(rows) < limit,
+                "checked_at": time.time(),
+            }
+        else:
+            rows = series["rows"]
+            tail_start = rows[-1][OPEN_TIME]
+            # Candles opened since the last stored one, plus one for clock skew
+            candle_ms = rows[-1][CLOSE_TIME] - tail_start + 1
+            missing = int((time.time() * 1000 - tail_start) // candle_ms) + 2
+            tail = fetch_klines(symbol, interval, min(series["depth"], missing), start_time=tail_start)
+            self._count("tail_updates")
+            self._count("candles_fetched", len(tail))
+            # Replace the (possibly open) last candle and append anything newer
+            merged = [row for row in rows if row[OPEN_TIME] < tail_start] + tail
+            series = {
+                "rows": merged[-series["depth"]:],
+                "depth": series["depth"],
+                "complete": series["complete"],
+                "checked_at": time.time(),
+            }
+
+        self.cache.set(key, series)
+        return series
+
+    def invalidate(self, symbol, interval):
+        """Drop a stored series so the next read refetches it in full."""
+        self.cache.delete(self._key(symbol, interval))
+
+    def get_stats(self):
+        """Hit, full-fetch and tail-update counters."""
+        with self.lock:
+            return dict(self.stats)
+
+
+kline_store = KlineStore()
@@ -2,11 +2,20 @@
 Helper functions for LLM-based cryptocurrency analysis.
 
 Provides data resampling and technical indicator computation functions
-specifically tailored for preparing market data for LLM analysis.
+specifically tailored for preparing market data for LLM analysis, and
+builds the same frame from indicators already stored by the hourly cron.
 """
 import pandas as pd
 import numpy as np
 
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# TechnicalIndicators columns used by the LLM prompt, in frame order
+STORED_INDICATOR_COLUMNS = [
+    "SMA_50", "SMA_200", "EMA_50", "EMA_200", "MACD", "MACD_Signal", "RSI",
+    "Stoch_RSI_K", "Stoch_RSI_D", "BB_upper", "BB_middle", "BB_lower",
+]
+
 
 def resample_and_compute_indicators(data, timeframe):
     """
@@ -90,3 +99,25 @@ def resample_and_compute_indicators(data, timeframe):
     df_resampled["BB_lower"] = (sma - 2 * std).fillna(df_resampled["close"])
 
     return df_resampled
+
+
+def stored_indicator_frame(rows):
+    """
+    Build an hourly indicator frame from stored candles and indicators.
+
+    Args:
+        rows: (timestamp, price, high, low, volume, *STORED_INDICATOR_COLUMNS)
+            tuples, i.e. HistoricalData outer-joined with TechnicalIndicators
+
+    Returns:
+        DataFrame shaped like ``resample_and_compute_indicators(data, '1h')``;
+        indicator columns are NaN for candles the cron has not processed yet
+    """
+    df = pd.DataFrame(rows, columns=["timestamp", "close", "high", "low", "volume"] + STORED_INDICATOR_COLUMNS)
+    df["open"] = df["close"]
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    df = df.set_index("timestamp").sort_index()
+    df = df[~df.index.duplicated(keep="last")]
+
+    df = df[df["close"] > 0.01].dropna(subset=OHLCV_COLUMNS)
+    return df[OHLCV_COLUMNS + STORED_INDICATOR_COLUMNS].astype(float)
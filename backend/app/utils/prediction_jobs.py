@@ -0,0 +1,198 @@
+"""
+Prediction job queue.
+
+Each /predict request used to run ``fetch_historical_data`` and its own LLM
+call, so a burst of requests for the same coin/timeframe/report type made
+the same Groq call several times over. Requests now become jobs: a job for
+a key that already has one queued or running attaches to it instead of
+starting another, and every caller gets the same job id and result.
+
+Jobs run in a thread pool of PREDICTION_JOB_WORKERS, which bounds how many
+LLM calls are in flight at once (protecting the Groq rate limit). Once
+PREDICTION_JOB_MAX_QUEUE jobs are waiting, new ones are refused with
+JobQueueFull. Finished jobs stay readable by id for
+PREDICTION_JOB_RETAIN_SECONDS so polling clients can collect them.
+"""
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import gevent
+
+PREDICTION_JOB_WORKERS = int(os.environ.get("PREDICTION_JOB_WORKERS", "2"))
+PREDICTION_JOB_MAX_QUEUE = int(os.environ.get("PREDICTION_JOB_MAX_QUEUE", "50"))
+PREDICTION_JOB_TIMEOUT_SECONDS = float(os.environ.get("PREDICTION_JOB_TIMEOUT_SECONDS", "60"))
+PREDICTION_JOB_RETAIN_SECONDS = float(os.environ.get("PREDICTION_JOB_RETAIN_SECONDS", "600"))
+
+# How often a waiting request checks whether its job finished
+JOB_POLL_SECONDS = 0.05
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised when PREDICTION_JOB_MAX_QUEUE jobs are already waiting."""
+
+
+class PredictionJob:
+    """One queued or finished prediction and the time it spent in each state."""
+
+    def __init__(self, key):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        """Job id, status and, once finished, the result or error."""
+        data = {"job_id": self.id, "status": self.status}
+        if self.status == DONE:
+            data["result"] = self.result
+        elif self.status == FAILED:
+            data["error"] = self.error
+        return data
+
+
+class PredictionJobQueue:
+    """
+    Deduplicating job queue backed by a bounded thread pool.
+
+    Request greenlets wait for jobs with gevent.sleep polling.
+
+    Args:
+        workers (int): Jobs run concurrently
+        max_queue (int): Jobs allowed to wait before new ones are refused
+        retain_seconds (float): How long finished jobs stay readable by id
+    """
+
+    def __init__(self, workers=PREDICTION_JOB_WORKERS, max_queue=PREDICTION_JOB_MAX_QUEUE,
+                 retain_seconds=PREDICTION_JOB_RETAIN_SECONDS):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retain_seconds = retain_seconds
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prediction-job")
+        self.jobs = {}
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.stats = defaultdict(int)
+        self.wait_seconds = []
+
+    def _prune(self):
+        cutoff = time.time() - self.retain_seconds
+        for job_id, job in list(self.jobs.items()):
+            if job.finished_at is not None and job.finished_at < cutoff:
+                del self.jobs[job_id]
+
+    def submit(self, key, fn, app=None):
+        """
+        Queue ``fn`` under ``key``, or attach to the job already in flight for it.
+
+        Args:
+            key (tuple): Identifies identical requests, e.g. (coin, timeframe, report type)
+            fn: Zero-argument callable producing the job result
+            app (Flask, optional): App whose context the job runs in
+
+        Returns:
+            tuple: (job, attached) where attached is True if an existing job was reused
+
+        Raises:
+            JobQueueFull: If max_queue jobs are already waiting
+        """
+        with self.lock:
+            self._prune()
+            job = self.in_flight.get(key)
+            if job is not None:
+                self.stats["attached"] += 1
+                return job, True
+
+            queued = sum(1 for j in self.in_flight.values() if j.status == QUEUED)
+            if queued >= self.max_queue:
+                self.stats["rejected"] += 1
+                raise JobQueueFull("prediction queue is full")
+
+            job = PredictionJob(key)
+            self.jobs[job.id] = job
+            self.in_flight[key] = job
+            self.stats["submitted"] += 1
+
+        self.executor.submit(self._run, job, fn, app)
+        return job, False
+
+    def _run(self, job, fn, app):
+        with self.lock:
+            job.status = RUNNING
+            job.started_at = time.time()
+            self.wait_seconds.append(job.started_at - job.created_at)
+            del self.wait_seconds[:-1000]
+
+        try:
+            if app is not None:
+                with app.app_context():
+                    result = fn()
+            else:
+                result = fn()
+            status, error = DONE, None
+        except Exception as e:
+            print(f"[Predictions] Job {job.id} for {job.key} failed: {e}")
+            result, status, error = None, FAILED, str(e)
+
+        with self.lock:
+            job.result = result
+            job.error = error
+            job.status = status
+            job.finished_at = time.time()
+            self.stats["completed" if status == DONE else "failed"] += 1
+            self.in_flight.pop(job.key, None)
+        job.done.set()
+
+    def get(self, job_id):
+        """Return the job with ``job_id``, or None if unknown or expired."""
+        with self.lock:
+            self._prune()
+            return self.jobs.get(job_id)
+
+    def wait(self, job, timeout=PREDICTION_JOB_TIMEOUT_SECONDS):
+        """
+        Wait for a job to finish without blocking the gevent hub.
+
+        Args:
+            job (PredictionJob): Returned by ``submit``
+            timeout (float): Seconds to wait
+
+        Returns:
+            bool: True if the job finished within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while not job.done.is_set():
+            if time.monotonic() >= deadline:
+                return False
+            gevent.sleep(JOB_POLL_SECONDS)
+        return True
+
+    def get_stats(self):
+        """Queue depth, running jobs, dedup/completion counters and queue wait times."""
+        with self.lock:
+            queued = sum(1 for j in self.in_flight.values() if j.status == QUEUED)
+            waits = self.wait_seconds
+            return dict(
+                self.stats,
+                workers=self.workers,
+                queue_depth=queued,
+                running=len(self.in_flight) - queued,
+                max_queue=self.max_queue,
+                avg_wait_seconds=round(sum(waits) / len(waits), 3) if waits else 0.0,
+                max_wait_seconds=round(max(waits), 3) if waits else 0.0,
+            )
+
+
+prediction_jobs = PredictionJobQueue()
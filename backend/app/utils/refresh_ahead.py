@@ -0,0 +1,63 @@
+"""
+Refresh-ahead scheduler for the shared market-data cache.
+
+Runs as a background task in the Socket.IO (gevent) loop, next to the coin
+stream. Every tick it looks at the sources registered on the cache (see
+``Cache.register``) and starts a background refresh for any entry that has
+passed REFRESH_AHEAD_FRACTION of its TTL, so entries are replaced before
+they expire and request paths never wait on an upstream call.
+
+Refreshes themselves run in daemon threads (``Cache._revalidate_in_background``).
+Sources that are backing off after a 429/5xx are skipped until their
+backoff expires.
+"""
+import os
+from backend.app.utils.cache import market_cache
+
+# Refresh once an entry is this far through its TTL (0.8 = at 80%)
+REFRESH_AHEAD_FRACTION = float(os.environ.get("CACHE_REFRESH_AHEAD_FRACTION", "0.8"))
+
+# How often the scheduler checks the registered sources
+REFRESH_AHEAD_TICK_SECONDS = 1
+
+
+def refresh_due(cache=market_cache, fraction=REFRESH_AHEAD_FRACTION):
+    """
+    Start background refreshes for registered sources that are due.
+
+    Args:
+        cache (Cache): Cache whose registered sources are checked
+        fraction (float): Portion of the TTL after which an entry is refreshed
+
+    Returns:
+        list[str]: Keys a refresh was started for
+    """
+    started = []
+    for key, source in list(cache.sources.items()):
+        if source.in_backoff() or cache.flights.in_flight(key):
+            continue
+        age = cache.age(key)
+        if age is None or age >= source.ttl * fraction:
+            cache._revalidate_in_background(key, source.refresh, source.retain_seconds)
+            started.append(key)
+    return started
+
+
+def start_refresh_ahead(socketio_instance, cache=market_cache):
+    """
+    Start the background task that keeps registered cache sources warm.
+
+    Once it runs, reads of registered keys switch to refresh-ahead mode and
+    are always answered from the cache.
+    """
+    def refresh_loop():
+        cache.refresh_ahead = True
+        print(f"[Cache] Refresh-ahead started for {len(cache.sources)} sources at {REFRESH_AHEAD_FRACTION:.0%} of TTL")
+        while True:
+            try:
+                refresh_due(cache)
+            except Exception as e:
+                print(f"[Cache] Refresh-ahead tick failed: {e}")
+            socketio_instance.sleep(REFRESH_AHEAD_TICK_SECONDS)
+
+    socketio_instance.start_background_task(refresh_loop)
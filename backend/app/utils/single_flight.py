@@ -0,0 +1,83 @@
+"""
+Single-flight request coalescing.
+
+When many callers need the same upstream result at once (e.g. right after a
+cache entry expires), only the first caller runs the fetch; the others wait
+for its result instead of each firing their own HTTP call. Errors raised by
+the fetch are re-raised in every waiting caller.
+"""
+import threading
+
+
+class _Call:
+    """One in-flight call and the callers waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.thread_id = threading.get_ident()
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key.
+
+    Waiting uses a threading.Event. A caller whose leader is a greenlet on
+    its own OS thread could never be woken, so it runs the fetch itself.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def in_flight(self, key):
+        """True if a call for ``key`` is currently running."""
+        with self.lock:
+            return key in self.calls
+
+    def do(self, key, fn):
+        """
+        Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Hashable identifier of the upstream request
+            fn: Zero-argument callable doing the fetch
+
+        Returns:
+            tuple: (result, shared) where shared is True if this caller
+            received another caller's result
+
+        Raises:
+            Exception: Whatever ``fn`` raised, in the leader and all waiters
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            if call is None:
+                call = _Call()
+                self.calls[key] = call
+                leader = True
+            elif call.thread_id == threading.get_ident():
+                leader = None
+            else:
+                leader = False
+
+        if leader is None:
+            return fn(), False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
@@ -3,30 +3,62 @@ WebSocket tasks for real-time cryptocurrency data streaming.
 
 Manages WebSocket connections and emits live coin data updates every minute
 to connected clients. Handles client connections, data requests, and background
-data emission tasks.
+data emission tasks. All senders share one pre-serialized, versioned payload.
 """
-from flask_socketio import emit
-from backend.app.utils.api import get_cached_binance_tickers, get_cached_coingecko_data
-from backend.app.models import Coin, CoinSnapshot
+import time
+from flask_socketio import emit, join_room, leave_room
+from backend.app.utils.api import get_cached_coingecko_data
+from backend.app.utils.binance_stream import ticker_stream, get_live_tickers, STREAM_PUSH_THROTTLE_SECONDS
+from backend.app.utils.coin_payload import CoinPayload
+from backend.app.models import db, Coin, CoinSnapshot
 from backend.app.constants import TOP_10_BINANCE_COINS
-from sqlalchemy import desc
+from sqlalchemy import func
 
 socketio_instance_ref = None
 
+# Rooms for the two coin_data protocols: legacy clients get the full list on
+# every change, delta subscribers get a snapshot once and then only changes
+FULL_ROOM = "coin_data_full"
+DELTA_ROOM = "coin_data_delta"
+
+# Rebuild interval when falling back to the REST ticker cache (its TTL)
+REST_REFRESH_SECONDS = 60
+
+# Snapshots change once a day (cron), so only re-check the DB this often
+SNAPSHOT_RECHECK_SECONDS = 300
+
+# Latest snapshot per coin, keyed by (newest snapshot timestamp, coin count)
+_snapshot_cache = {"key": None, "checked_at": 0, "coins": {}}
+
 
 def start_coin_stream(socketio_instance, app):
-    """Start background task that emits live coin data every minute."""
+    """
+    Start background task that rebuilds and broadcasts coin data.
+
+    While the Binance WebSocket feed is live, new ticks are pushed at most
+    every STREAM_PUSH_THROTTLE_SECONDS. Otherwise the payload is rebuilt from
+    the REST ticker cache every REST_REFRESH_SECONDS, as before.
+    """
     global socketio_instance_ref
     socketio_instance_ref = socketio_instance
 
     def emit_coins():
         with app.app_context():
+            last_refresh = 0.0
+            last_stream_version = None
             while True:
-                coins = prepare_coin_data()
-                if coins:
-                    socketio_instance.emit("coin_data", coins, namespace="/")
-                    print(f"[SOCKET] 🔄 Emitted {len(coins)} coins")
-                socketio_instance.sleep(60)
+                now = time.time()
+                streaming = ticker_stream.is_live()
+                stream_changed = streaming and ticker_stream.version != last_stream_version
+                if stream_changed or now - last_refresh >= REST_REFRESH_SECONDS:
+                    last_refresh = now
+                    last_stream_version = ticker_stream.version
+                    # Only broadcast real changes
+                    if coin_payload.refresh():
+                        broadcast_coin_payload(socketio_instance)
+                        if not streaming:
+                            print(f"[SOCKET] 🔄 Emitted {len(coin_payload.coins)} coins (v{coin_payload.version})")
+                socketio_instance.sleep(STREAM_PUSH_THROTTLE_SECONDS if streaming else 1)
 
     socketio_instance.start_background_task(emit_coins)
 
@@ -34,35 +66,150 @@ def start_coin_stream(socketio_instance, app):
 def register_socket_handlers(socketio_instance, app):
     """Register WebSocket event handlers for client connections."""
     @socketio_instance.on("connect", namespace="/")
-    def handle_connect():
+    def handle_connect(auth=None):
         print("[SOCKET] ⚡ Client connected")
+        # Clients can opt into the delta stream up front with auth={"coin_stream": "delta"}
+        if isinstance(auth, dict) and auth.get("coin_stream") == "delta":
+            join_room(DELTA_ROOM)
+            emit_coin_snapshot()
+            return
+        join_room(FULL_ROOM)
         emit_coin_data(socketio_instance)
 
+    @socketio_instance.on("subscribe_coin_deltas", namespace="/")
+    def handle_subscribe_coin_deltas():
+        print("[SOCKET] 📩 Client switched to coin delta stream")
+        leave_room(FULL_ROOM)
+        join_room(DELTA_ROOM)
+        emit_coin_snapshot()
+
+    @socketio_instance.on("resync_coin_data", namespace="/")
+    def handle_resync_coin_data():
+        print("[SOCKET] 📩 Client requested coin snapshot resync")
+        emit_coin_snapshot()
+
     @socketio_instance.on("request_coin_data", namespace="/")
-    def handle_request_coin_data():
+    def handle_request_coin_data(data=None):
         print("[SOCKET] 📩 Client requested coin data")
-        emit_coin_data(socketio_instance)
+        known_version = data.get("version") if isinstance(data, dict) else None
+        emit_coin_data(socketio_instance, known_version)
+
+
+def emit_coin_data(socketio_instance, known_version=None):
+    """
+    Emit the stored coin data payload to the requesting client.
+
+    Args:
+        socketio_instance: SocketIO server
+        known_version (int, optional): Version the client already has; if it
+            matches, only ``coin_data_unchanged`` is sent
+    """
+    blob, version = coin_payload.current()
+    if blob is None:
+        return
+    if known_version == version:
+        emit("coin_data_unchanged", {"version": version}, namespace="/")
+        return
+    # The second argument is ignored by clients that only read the coin list
+    emit("coin_data", (blob, {"version": version}), namespace="/")
+    print(f"[SOCKET] ✅ Emitted coin_data v{version} to client")
+
+
+def emit_coin_snapshot():
+    """Emit a full ``coin_snapshot`` to the requesting delta-stream client."""
+    snapshot = coin_payload.snapshot()
+    if snapshot is not None:
+        emit("coin_snapshot", snapshot, namespace="/")
 
 
-def emit_coin_data(socketio_instance):
-    """Emit current coin data to connected clients."""
-    coins = prepare_coin_data()
-    if coins:
-        emit("coin_data", coins, namespace="/")
-        print("[SOCKET] ✅ Emitted coin_data to client")
+def broadcast_coin_payload(socketio_instance, changed=True):
+    """
+    Broadcast the latest change to every connected client.
+
+    Legacy clients receive the full ``coin_data`` list; delta subscribers
+    receive ``coin_delta`` with ``seq``/``base`` so they can detect a gap and
+    send ``resync_coin_data``.
+
+    Args:
+        socketio_instance: SocketIO server
+        changed (bool): False when re-sending an unchanged payload; delta
+            subscribers then get a ``coin_snapshot``, since repeating the last
+            ``coin_delta`` would look like a gap to clients already at its seq
+    """
+    blob, version = coin_payload.current()
+    if blob is None:
+        return
+    socketio_instance.emit("coin_data", (blob, {"version": version}), namespace="/", to=FULL_ROOM)
+    if not changed:
+        socketio_instance.emit("coin_snapshot", coin_payload.snapshot(), namespace="/", to=DELTA_ROOM)
+    elif coin_payload.delta is not None:
+        socketio_instance.emit("coin_delta", coin_payload.delta, namespace="/", to=DELTA_ROOM)
+
+
+def invalidate_snapshot_cache():
+    """Force the next prepare_coin_data call to re-read coins and snapshots."""
+    _snapshot_cache["checked_at"] = 0
+
+
+def get_latest_snapshots():
+    """
+    Return every coin joined to its latest CoinSnapshot, cached in process.
+
+    Within SNAPSHOT_RECHECK_SECONDS the cached result is returned without
+    touching the DB. After that, one lightweight query reads the newest
+    snapshot timestamp and the coin count; the full coins-to-latest-snapshot
+    join only runs again if either changed.
+
+    Returns:
+        dict: Upper-case coin symbol to dict with ``id``, ``has_snapshot``,
+        ``market_cap`` and ``global_volume``
+    """
+    now = time.time()
+    if now - _snapshot_cache["checked_at"] < SNAPSHOT_RECHECK_SECONDS:
+        return _snapshot_cache["coins"]
+
+    key = tuple(db.session.execute(db.select(
+        db.select(func.max(CoinSnapshot.timestamp)).scalar_subquery(),
+        db.select(func.count(Coin.id)).scalar_subquery()
+    )).one())
+
+    if key != _snapshot_cache["key"]:
+        latest = (
+            db.select(CoinSnapshot.coin_id, func.max(CoinSnapshot.timestamp).label("timestamp"))
+            .group_by(CoinSnapshot.coin_id)
+            .subquery()
+        )
+        rows = db.session.execute(
+            db.select(Coin.id, Coin.coin_symbol, CoinSnapshot.id, CoinSnapshot.market_cap, CoinSnapshot.global_volume)
+            .outerjoin(latest, latest.c.coin_id == Coin.id)
+            .outerjoin(CoinSnapshot, (CoinSnapshot.coin_id == latest.c.coin_id)
+                       & (CoinSnapshot.timestamp == latest.c.timestamp))
+        ).all()
+        _snapshot_cache["coins"] = {
+            symbol.upper(): {
+                "id": coin_id,
+                "has_snapshot": snapshot_id is not None,
+                "market_cap": market_cap,
+                "global_volume": global_volume,
+            }
+            for coin_id, symbol, snapshot_id, market_cap, global_volume in rows
+        }
+        _snapshot_cache["key"] = key
+
+    _snapshot_cache["checked_at"] = now
+    return _snapshot_cache["coins"]
 
 
 def prepare_coin_data():
     """Prepare coin data from cache/DB, never blocking on API calls"""
     coins = []
 
-    # Get cached Binance tickers (will use cache if available, try one fetch if stale)
-    all_tickers = get_cached_binance_tickers()
+    # Live stream tickers, or cached REST tickers if the stream is down
+    all_tickers = get_live_tickers()
     ticker_map = {ticker["symbol"]: ticker for ticker in all_tickers} if all_tickers else {}
 
-    # Get all coins from DB
-    coin_objs = Coin.query.all()
-    coin_ids = {c.coin_symbol.upper(): c.id for c in coin_objs}
+    # Coins and their latest snapshot (market cap) from one cached query
+    db_coins = get_latest_snapshots()
 
     # Get CoinGecko data if available (optional, never blocks)
     gecko_data = get_cached_coingecko_data()
@@ -76,22 +223,14 @@ def prepare_coin_data():
         # Get ticker data from cache
         ticker_data = ticker_map.get(symbol, {})
 
-        # Get snapshot from DB for market cap
-        coin_obj = Coin.query.filter_by(coin_symbol=clean_symbol).first()
-        snapshot = None
-        if coin_obj:
-            snapshot = (
-                CoinSnapshot.query
-                .filter_by(coin_id=coin_obj.id)
-                .order_by(desc(CoinSnapshot.timestamp))
-                .first()
-            )
+        db_coin = db_coins.get(clean_symbol.upper(), {})
+        has_snapshot = db_coin.get("has_snapshot", False)
 
         # Get gecko data if available
         gecko_item = gecko_map.get(clean_symbol.upper())
 
         coins.append({
-            "id": coin_ids.get(clean_symbol.upper()),
+            "id": db_coin.get("id"),
             "symbol": clean_symbol,
             "name": coin_config["name"],
             "image": coin_config["image"],
@@ -99,17 +238,20 @@ def prepare_coin_data():
             "high_24h": float(ticker_data.get("highPrice", 0)) if ticker_data else 0,
             "low_24h": float(ticker_data.get("lowPrice", 0)) if ticker_data else 0,
             "total_volume": float(ticker_data.get("volume", 0)) if ticker_data else 0,
-            "market_cap": snapshot.market_cap if snapshot else (gecko_item.get("market_cap") if gecko_item else None),
-            "global_volume": snapshot.global_volume if snapshot else (gecko_item.get("total_volume") if gecko_item else None)
+            "market_cap": db_coin.get("market_cap") if has_snapshot else (gecko_item.get("market_cap") if gecko_item else None),
+            "global_volume": db_coin.get("global_volume") if has_snapshot else (gecko_item.get("total_volume") if gecko_item else None)
         })
 
     if not coins:
         print("[SOCKET] ⚠️ No coin data available")
         return []
 
-    print(f"[SOCKET] ✅ Prepared {len(coins)} coins from cache/DB")
     return coins
 
+
+# Shared, pre-serialized coin_data message (see coin_payload.py)
+coin_payload = CoinPayload(prepare_coin_data)
+
 def register_emit_route(app):
     """Register internal REST endpoint to manually trigger WebSocket emit."""
     @app.route("/internal/emit-coin-data", methods=["POST"])
@@ -118,9 +260,9 @@ def register_emit_route(app):
         if socketio_instance_ref is None:
             return {"error": "SocketIO instance not initialized"}, 500
 
-        coins = prepare_coin_data()
-        if coins:
-            socketio_instance_ref.emit("coin_data", coins, namespace="/")
+        changed = coin_payload.refresh()
+        if coin_payload.json is not None:
+            broadcast_coin_payload(socketio_instance_ref, changed)
             print("[SOCKET] ✅ Manual REST emit completed")
-            return {"status": "success", "emitted": len(coins)}
+            return {"status": "success", "emitted": len(coin_payload.coins), "version": coin_payload.version}
         return {"error": "No coins to emit"}, 500
@@ -0,0 +1,279 @@
+"""
+Startup data refresh orchestrator.
+
+Runs the cold-start freshness checks (historical candles, CoinGecko
+snapshots, top volume, Fear & Greed Index, Binance ticker cache) in
+background threads so the server can accept requests immediately and serve
+whatever data is already in the database. Independent datasets refresh
+concurrently; datasets that need another one first (e.g. top volume needs
+fresh candles) wait for it. Per-dataset progress and timings are exposed
+through ``startup_refresh.status()`` for the readiness endpoint.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import desc
+from sqlalchemy.exc import ProgrammingError, OperationalError
+from backend.app.models import HistoricalData, CoinSnapshot, TopVolume24h, FearGreedIndex
+
+HISTORICAL_STALE_AFTER = timedelta(hours=6)
+DASHBOARD_STALE_AFTER = timedelta(hours=24)
+
+# States a dataset ends in; anything else means warmup is still running
+FINISHED_STATES = ("fresh", "refreshed", "skipped", "failed")
+
+
+def make_aware(dt):
+    """Treat naive DB timestamps as UTC so they compare with aware datetimes."""
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def latest_timestamp(model):
+    """Timestamp of the newest row of a model, or None if the table is empty."""
+    latest = model.query.order_by(desc(model.timestamp)).first()
+    return make_aware(latest.timestamp) if latest else None
+
+
+class StartupDataset:
+    """
+    One dataset the startup refresh keeps warm.
+
+    Args:
+        name (str): Key used in the readiness report
+        check: Callable returning ``(needs_refresh, last_update)``
+        refresh: Callable that refreshes the dataset
+        after (tuple[str]): Datasets that must finish before this one starts
+    """
+
+    def __init__(self, name, check, refresh, after=()):
+        self.name = name
+        self.check = check
+        self.refresh = refresh
+        self.after = tuple(after)
+
+
+class StartupRefresh:
+    """
+    Runs startup datasets concurrently and records their progress.
+
+    Each dataset runs in its own daemon thread inside an app context.
+    """
+
+    def __init__(self, datasets):
+        self.datasets = {dataset.name: dataset for dataset in datasets}
+        self.lock = threading.Lock()
+        self.started_at = None
+        self.finished_at = None
+        self.status_by_name = {}
+        self.done = {}
+        self.reset()
+
+    def reset(self):
+        """Clear recorded progress so the refresh can be started again."""
+        with self.lock:
+            self.started_at = None
+            self.finished_at = None
+            self.status_by_name = {name: {"state": "pending"} for name in self.datasets}
+            self.done = {name: threading.Event() for name in self.datasets}
+
+    def _update(self, name, **fields):
+        with self.lock:
+            self.status_by_name[name].update(fields)
+            if all(s["state"] in FINISHED_STATES for s in self.status_by_name.values()):
+                self.finished_at = time.time()
+                print(f"[STARTUP] All data checks complete in {self.finished_at - self.started_at:.1f}s")
+
+    def state(self, name):
+        """Current state string of a dataset."""
+        with self.lock:
+            return self.status_by_name[name]["state"]
+
+    def start(self, app):
+        """
+        Launch every dataset's check/refresh in a background thread.
+
+        Args:
+            app: Flask app whose context the checks run in
+
+        Returns:
+            list[threading.Thread]: The started threads
+        """
+        self.reset()
+        self.started_at = time.time()
+        print(f"[STARTUP] Checking data freshness for {len(self.datasets)} datasets in the background...")
+
+        threads = []
+        for dataset in self.datasets.values():
+            thread = threading.Thread(target=self._run, args=(app, dataset), name=f"startup-{dataset.name}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        return threads
+
+    def _run(self, app, dataset):
+        name = dataset.name
+        started = time.time()
+        try:
+            if dataset.after:
+                self._update(name, state="waiting", waiting_for=list(dataset.after))
+                for dependency in dataset.after:
+                    self.done[dependency].wait()
+                started = time.time()
+
+            self._update(name, state="checking", started_at=_iso(started))
+
+            with app.app_context():
+                try:
+                    needs_refresh, last_update = dataset.check()
+                except (ProgrammingError, OperationalError):
+                    print(f"[STARTUP] Tables not ready, skipping {name} check")
+                    self._finish(name, started, state="skipped", error="tables not ready")
+                    return
+
+                self._update(name, last_update=_iso(last_update))
+                if not needs_refresh:
+                    print(f"[STARTUP] {name} is fresh (last update: {last_update})")
+                    self._finish(name, started, state="fresh")
+                    return
+
+                print(f"[STARTUP] {name} is stale (last update: {last_update}), refreshing...")
+                self._update(name, state="refreshing")
+                dataset.refresh()
+
+            print(f"[STARTUP] {name} refresh complete in {time.time() - started:.1f}s")
+            self._finish(name, started, state="refreshed")
+        except Exception as e:
+            print(f"[STARTUP] Error checking/updating {name}: {e}")
+            self._finish(name, started, state="failed", error=str(e))
+        finally:
+            self.done[name].set()
+
+    def _finish(self, name, started, state, error=None):
+        finished = time.time()
+        fields = {
+            "state": state,
+            "finished_at": _iso(finished),
+            "duration_seconds": round(finished - started, 3),
+        }
+        if error:
+            fields["error"] = error
+        self._update(name, **fields)
+
+    def status(self):
+        """
+        Snapshot of warmup progress for the readiness endpoint.
+
+        Only app.py starts the warmup; processes that never start it (flask
+        run, backend/run.py, other WSGI entry points) have nothing to wait
+        for and report ready.
+
+        Returns:
+            dict: ``ready`` and ``started`` flags, overall timings and
+            per-dataset status
+        """
+        with self.lock:
+            datasets = {name: dict(status) for name, status in self.status_by_name.items()}
+            started_at = self.started_at
+            finished_at = self.finished_at
+
+        ready = started_at is None or finished_at is not None
+        elapsed = None
+        if started_at is not None:
+            elapsed = round((finished_at or time.time()) - started_at, 3)
+        return {
+            "ready": ready,
+            "started": started_at is not None,
+            "started_at": _iso(started_at),
+            "elapsed_seconds": elapsed,
+            "datasets": datasets,
+        }
+
+
+def _iso(value):
+    """Format an epoch float or datetime as ISO 8601, passing None through."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        value = datetime.fromtimestamp(value, tz=timezone.utc)
+    return value.isoformat()
+
+
+def _check_backfill():
+    return HistoricalData.query.first() is None, None
+
+
+def _run_backfill():
+    from backfill import backfill_historical_data
+    backfill_historical_data()
+
+
+def _check_historical():
+    last_update = latest_timestamp(HistoricalData)
+    return last_update is None or last_update < datetime.now(timezone.utc) - HISTORICAL_STALE_AFTER, last_update
+
+
+def _refresh_historical():
+    from backend.app.tasks import backfill_recent_klines, update_historical_data, update_technical_indicators
+    backfill_recent_klines()
+    update_historical_data()
+    update_technical_indicators()
+
+
+def _dashboard_check(model):
+    def check():
+        last_update = latest_timestamp(model)
+        return last_update is None or last_update < datetime.now(timezone.utc) - DASHBOARD_STALE_AFTER, last_update
+    return check
+
+
+def _refresh_snapshots():
+    from backend.app.utils.coin_gecko import update_coin_snapshots
+    update_coin_snapshots()
+
+
+def _refresh_top_volume():
+    from backend.app.dashboard.top_volume import update_top_volume_24h
+    update_top_volume_24h()
+
+
+def _refresh_fear_greed():
+    from backend.app.dashboard.fear_greed import fetch_fear_and_greed_index
+    fetch_fear_and_greed_index()
+
+
+def _check_descriptions():
+    # Only seeded after a fresh backfill, as before; it spends ~15s per coin
+    return startup_refresh.state("backfill") == "refreshed", None
+
+
+def _seed_descriptions():
+    from backfill import seed_descriptions
+    seed_descriptions()
+
+
+def _check_binance_tickers():
+    return True, None
+
+
+def _warm_binance_tickers():
+    from backend.app.utils.api import get_cached_binance_tickers
+    tickers = get_cached_binance_tickers()
+    if not tickers:
+        raise RuntimeError("Binance ticker cache is empty")
+    print(f"[STARTUP] Binance ticker cache populated with {len(tickers)} tickers")
+
+
+startup_refresh = StartupRefresh([
+    StartupDataset("backfill", _check_backfill, _run_backfill),
+    StartupDataset("historical", _check_historical, _refresh_historical, after=("backfill",)),
+    # Snapshots need the coin rows a first-time backfill creates
+    StartupDataset("snapshots", _dashboard_check(CoinSnapshot), _refresh_snapshots, after=("backfill",)),
+    StartupDataset("top_volume", _dashboard_check(TopVolume24h), _refresh_top_volume, after=("historical",)),
+    StartupDataset("fear_greed", _dashboard_check(FearGreedIndex), _refresh_fear_greed),
+    StartupDataset("binance_tickers", _check_binance_tickers, _warm_binance_tickers),
+    # Descriptions also hit CoinGecko, so they queue behind the snapshot call
+    StartupDataset("descriptions", _check_descriptions, _seed_descriptions, after=("backfill", "snapshots")),
+])
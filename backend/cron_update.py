@@ -2,7 +2,8 @@
 Cron job script for updating historical data and technical indicators.
 
 Scheduled task that fetches latest cryptocurrency price data from APIs
-and calculates technical indicators for all tracked coins.
+and calculates technical indicators for all tracked coins, then
+pre-generates the concise AI reports from the new data.
 Runs every hour via cron.
 """
 import sys
@@ -11,8 +12,9 @@ import os
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
-from backend.app.tasks import update_historical_data, update_technical_indicators
+from backend.app.tasks import update_historical_data, update_technical_indicators, pregenerate_concise_reports
 
 if __name__ == "__main__":
     update_historical_data()
     update_technical_indicators()
+    pregenerate_concise_reports()
@@ -6,48 +6,29 @@ populates the database. Also fetches coin descriptions from CoinGecko.
 Run once during initial setup or to rebuild historical data.
 """
 import requests
-import datetime
 import time
 import re
-import os
 from backend.app import create_app, db
-from backend.app.models import Coin, HistoricalData
+from backend.app.models import Coin
+from backend.app.utils.binance_klines import fetch_klines_many
+from backend.app.utils.db_helpers import insert_historical_rows, kline_to_historical_row
 from backend.app.tasks import update_technical_indicators
 from backend.app.constants import COINS
 
-BINANCE_BASE_URL = os.environ.get('BINANCE_BASE_URL', 'https://api.binance.com')
-BINANCE_URL = f"{BINANCE_BASE_URL}/api/v3/klines"
-
-def fetch_binance_ohlcv(symbol, interval="1h", limit=1440):
-    """
-    Fetch OHLCV candlestick data from Binance API.
-
-    Args:
-        symbol: Trading pair symbol (e.g., 'BTCUSDT')
-        interval: Candlestick interval (default: '1h')
-        limit: Number of candlesticks to fetch (default: 1440)
-
-    Returns:
-        list: Raw Binance kline data
-
-    Raises:
-        requests.HTTPError: If API request fails
-    """
-    url = f"{BINANCE_URL}?symbol={symbol}&interval={interval}&limit={limit}"
-    response = requests.get(url, timeout=10)
-    response.raise_for_status()
-    return response.json()
 
 def backfill_historical_data():
     """
     Backfill historical data for all configured coins from Binance.
 
-    Fetches 60 days of hourly OHLCV data, creates coin records if needed,
-    and populates HistoricalData table. Also updates technical indicators
-    after data import.
+    Fetches 60 days of hourly OHLCV data for all coins concurrently, creates
+    coin records if needed, and populates HistoricalData table. Also updates
+    technical indicators after data import.
     """
     app = create_app()
     with app.app_context():
+        print(f"Fetching data for {len(COINS)} coins")
+        ohlcv_by_symbol = fetch_klines_many([coin["binance_symbol"] for coin in COINS], "1h", 1440)
+
         for coin in COINS:
             binance_symbol = coin["binance_symbol"]
             name = coin["name"]
@@ -61,30 +42,16 @@ def backfill_historical_data():
                 db.session.add(coin_obj)
                 db.session.commit()
 
-            print(f"Fetching data for {binance_symbol}")
-            try:
-                ohlcv = fetch_binance_ohlcv(binance_symbol)
-            except Exception as e:
-                print(f"Failed to fetch {binance_symbol}: {e}")
+            ohlcv = ohlcv_by_symbol.get(binance_symbol)
+            if ohlcv is None:
+                print(f"Failed to fetch {binance_symbol}")
                 continue
 
-            for entry in ohlcv:
-                ts = datetime.datetime.fromtimestamp(entry[0] / 1000.0, tz=datetime.timezone.utc)
-                exists = HistoricalData.query.filter_by(coin_id=coin_obj.id, timestamp=ts).first()
-                if exists:
-                    continue
-                hd = HistoricalData(
-                    coin_id=coin_obj.id,
-                    price=float(entry[4]),
-                    high=float(entry[2]),
-                    low=float(entry[3]),
-                    volume=float(entry[5]),
-                    timestamp=ts
-                )
-                db.session.add(hd)
+            rows = [kline_to_historical_row(coin_obj.id, entry) for entry in ohlcv]
+            inserted = insert_historical_rows(rows)
+            print(f"Inserted {inserted} new candles for {binance_symbol}")
 
             db.session.commit()
-            time.sleep(1)
 
         print("Updating technical indicators...")
         update_technical_indicators()
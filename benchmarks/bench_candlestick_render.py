@@ -0,0 +1,78 @@
+"""
+Benchmark for candlestick rendering.
+
+Compares the previous per-candle renderer (one ``plot`` wick and one ``bar``
+body per candle, with ``.iloc`` lookups) against the batched renderer in
+``charts.draw_candles`` (one wick LineCollection, one body PolyCollection).
+Renders the 96-candle 1h and 120-candle 1d charts to PNG, as the chart
+routes do.
+
+Usage:
+    python -m benchmarks.bench_candlestick_render
+"""
+import time
+from io import BytesIO
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from backend.app.prediction import charts
+
+ROUNDS = 20
+
+
+def draw_candles_per_candle(ax1, df, candle_width):
+    """The previous renderer: one wick line and one bar per candle."""
+    for i in range(len(df)):
+        date = df.index[i]
+        open_price = df["Open"].iloc[i]
+        close_price = df["Close"].iloc[i]
+        high_price = df["High"].iloc[i]
+        low_price = df["Low"].iloc[i]
+        color = "lime" if close_price > open_price else "red"
+        ax1.plot([date, date], [low_price, high_price], color=color, linewidth=0.5)
+        body_height = abs(close_price - open_price)
+        body_bottom = min(open_price, close_price)
+        ax1.bar(date, body_height, bottom=body_bottom, color=color, width=candle_width, linewidth=0)
+
+
+def make_ohlcv(hours):
+    """Random-walk hourly candles."""
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2024-01-01", periods=hours, freq="1h")
+    close = 100 + rng.normal(0, 1, hours).cumsum()
+    open_price = close + rng.normal(0, 0.5, hours)
+    return pd.DataFrame({
+        "Open": open_price,
+        "High": np.maximum(open_price, close) + rng.uniform(0, 1, hours),
+        "Low": np.minimum(open_price, close) - rng.uniform(0, 1, hours),
+        "Close": close,
+        "Volume": rng.uniform(1, 10, hours),
+    }, index=index)
+
+
+def render(df, timeframe):
+    fig, _, _ = charts.plot_base_candlestick_chart(df.copy(), "BTC", timeframe)
+    fig.savefig(BytesIO(), format="png", bbox_inches="tight")
+
+
+def run(label, df, timeframe):
+    render(df, timeframe)  # warm up fonts and caches
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        render(df, timeframe)
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    print(f"{label:<12} {timeframe}  {elapsed * 1000:8.1f} ms/chart")
+    return elapsed
+
+
+def main():
+    for timeframe, hours in [("1h", 96), ("1d", 120 * 24)]:
+        df = make_ohlcv(hours)
+        with patch.object(charts, "draw_candles", draw_candles_per_candle):
+            before = run("per-candle", df, timeframe)
+        after = run("batched", df, timeframe)
+        print(f"Speedup ({timeframe}): {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark for writing TechnicalIndicators rows.
+
+Compares the previous per-row write (one existence SELECT plus one ORM add per
+row) with the set-based writer in ``db_helpers.insert_new_indicator_rows``
+(one timestamp query per coin, pandas anti-join, executemany INSERT).
+Uses an in-memory SQLite database with 10 coins x 1,440 hourly rows.
+
+Usage:
+    python -m benchmarks.bench_indicator_writes
+"""
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from backend.app import create_app
+from backend.app.models import db, Coin, TechnicalIndicators
+from backend.app.utils.db_helpers import insert_new_indicator_rows
+
+COINS = 10
+HOURS = 1440
+COLUMNS = ["SMA_50", "SMA_200", "EMA_50", "EMA_200", "RSI", "MACD", "MACD_Signal",
+           "Stoch_RSI_K", "Stoch_RSI_D", "BB_upper", "BB_middle", "BB_lower", "Volume_Change"]
+
+
+def make_rows():
+    """Random indicator rows for HOURS consecutive hourly timestamps."""
+    rng = np.random.default_rng(0)
+    start = datetime(2024, 1, 1)
+    values = rng.uniform(1, 100, size=(HOURS, len(COLUMNS)))
+    return [
+        dict(zip(COLUMNS, map(float, values[i])), timestamp=start + timedelta(hours=i))
+        for i in range(HOURS)
+    ]
+
+
+def write_per_row(coin_ids, rows):
+    """The previous writer: existence query and ORM add for every row."""
+    for coin_id in coin_ids:
+        for row in rows:
+            existing = TechnicalIndicators.query.filter_by(coin_id=coin_id, timestamp=row["timestamp"]).first()
+            if existing:
+                continue
+            db.session.add(TechnicalIndicators(coin_id=coin_id, **row))
+        db.session.commit()
+
+
+def write_bulk(coin_ids, rows):
+    """The set-based writer, committed once."""
+    for coin_id in coin_ids:
+        insert_new_indicator_rows(coin_id, rows)
+    db.session.commit()
+
+
+def run(label, writer, coin_ids, rows):
+    TechnicalIndicators.query.delete()
+    db.session.commit()
+
+    start = time.perf_counter()
+    writer(coin_ids, rows)
+    elapsed = time.perf_counter() - start
+
+    total = TechnicalIndicators.query.count()
+    print(f"{label:<10} {total:>7} rows in {elapsed:7.3f}s  ->  {total / elapsed:>10,.0f} rows/s")
+    return elapsed
+
+
+def main():
+    app = create_app('testing')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+
+    with app.app_context():
+        db.create_all()
+        for i in range(COINS):
+            db.session.add(Coin(coin_name=f"Coin {i}", coin_symbol=f"C{i}"))
+        db.session.commit()
+        coin_ids = [c.id for c in Coin.query.all()]
+        rows = make_rows()
+
+        print(f"Writing {COINS} coins x {HOURS} hours of TechnicalIndicators")
+        before = run("per-row", write_per_row, coin_ids, rows)
+        after = run("bulk", write_bulk, coin_ids, rows)
+        print(f"Speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
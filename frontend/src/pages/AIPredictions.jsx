@@ -2,6 +2,47 @@ import { useState, useEffect } from "react";
 import api from '@/api/axios';
 import ReactMarkdown from "react-markdown";
 
+// Charts the backend can render in a single /chart/report request
+const REPORT_PANELS = ["price", "macd-rsi", "bollinger"];
+
+const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5050';
+
+// Seconds each /predict/jobs poll waits server-side for the job to finish
+const JOB_POLL_WAIT_SECONDS = 20;
+
+// Read /predict/stream Server-Sent Events, passing the text so far to onText as
+// tokens arrive; resolves like a /predict response once the stream is done
+const streamPrediction = (params, onText) =>
+  new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_URL}/predict/stream?${new URLSearchParams(params)}`);
+    let analysis = "";
+    source.addEventListener("token", (e) => {
+      analysis += JSON.parse(e.data).text;
+      onText(analysis);
+    });
+    source.addEventListener("done", (e) => {
+      source.close();
+      resolve({ ...JSON.parse(e.data), analysis });
+    });
+    source.addEventListener("error", (e) => {
+      source.close();
+      // Server error events carry a message; a dropped connection has no data
+      if (e.data) resolve(JSON.parse(e.data));
+      else reject(new Error("Prediction stream failed"));
+    });
+  });
+
+// /predict answers 202 with a job id when the analysis is still queued or running;
+// long-poll the job until it finishes and return the analysis like a 200 would
+const waitForPrediction = async (res) => {
+  const jobUrl = res.headers?.location || `/predict/jobs/${res.data.job_id}`;
+  let job = res.data;
+  while (job.status === "queued" || job.status === "running") {
+    job = (await api.get(jobUrl, { params: { wait: JOB_POLL_WAIT_SECONDS } })).data;
+  }
+  return job.status === "done" ? job.result : { error: job.error || "Prediction failed." };
+};
+
 const AIPredictions = () => {
   // Selected coin and available coins list
   const [coin, setCoin] = useState("");
@@ -16,6 +57,12 @@ const AIPredictions = () => {
   const [prediction, setPrediction] = useState(null);
   const [displayedPrediction, setDisplayedPrediction] = useState(null);
 
+  // Analysis text received so far while the prediction is streaming
+  const [streamedText, setStreamedText] = useState("");
+
+  // Report chart images (data URLs) keyed by placeholder, e.g. "chart-price"; null while loading
+  const [chartImages, setChartImages] = useState(null);
+
   // Fetch available coins list on component mount
   useEffect(() => {
     api
@@ -24,24 +71,57 @@ const AIPredictions = () => {
       .catch((err) => console.error("Error fetching coins:", err));
   }, []);
 
+  // Fetch all charts referenced by the report in one request
+  useEffect(() => {
+    const panels = [...(displayedPrediction?.analysis || "").matchAll(/\(\s*chart-([a-z-]+)\s*\)/g)]
+      .map((m) => m[1])
+      .filter((name) => REPORT_PANELS.includes(name));
+    if (panels.length === 0) {
+      setChartImages({});
+      return;
+    }
+    setChartImages(null);
+
+    api
+      .get(`/chart/report/${displayedPrediction._coin}`, {
+        params: { timeframe: displayedPrediction._timeframe, panels: [...new Set(panels)].join(",") },
+      })
+      .then((res) => {
+        const images = {};
+        Object.entries(res.data.panels).forEach(([name, png]) => {
+          images[`chart-${name}`] = `data:image/png;base64,${png}`;
+        });
+        setChartImages(images);
+      })
+      .catch((err) => {
+        // Fall back to loading each chart from its own endpoint
+        console.error("Error fetching report charts:", err);
+        setChartImages({});
+      });
+  }, [displayedPrediction]);
+
   // Generate AI prediction for selected coin
   const handlePrediction = async () => {
     if (!coin) return alert("Please select a coin.");
     setLoading(true);
     setPrediction(null);
+    setStreamedText("");
 
     try {
-      // Request prediction from AI endpoint
-      const res = await api.get("/predict", {
-        params: {
-          coin,
-          timeframe,
-          type: outputStyle,
-        },
-      });
-      setPrediction(res.data);
+      const params = { coin, timeframe, type: outputStyle };
+      let result;
+      try {
+        // Show the analysis as the AI writes it
+        result = await streamPrediction(params, setStreamedText);
+      } catch (streamErr) {
+        // Fall back to the blocking endpoint if the stream could not be read
+        console.error("Prediction stream error:", streamErr);
+        const res = await api.get("/predict", { params });
+        result = res.status === 202 ? await waitForPrediction(res) : res.data;
+      }
+      setPrediction(result);
       setDisplayedPrediction({
-        ...res.data,
+        ...result,
         _coin: coin,
         _timeframe: timeframe,
       });
@@ -53,6 +133,7 @@ const AIPredictions = () => {
       console.error("Prediction error:", err);
       setPrediction({ error: "Failed to fetch prediction." });
     } finally {
+      setStreamedText("");
       setLoading(false);
     }
   };
@@ -135,8 +216,19 @@ const AIPredictions = () => {
         </button>
       </div>
 
+      {/* Analysis streaming in; charts are loaded once it is complete */}
+      {streamedText && (
+        <div className="mt-8 bg-white dark:bg-gray-800 p-6 rounded-md border dark:border-gray-700 shadow-sm">
+          <div className="prose dark:prose-invert text-gray-800 dark:text-gray-100 max-w-none">
+            <ReactMarkdown components={{ img: () => <p className="my-6 text-gray-500">Loading chart...</p> }}>
+              {streamedText}
+            </ReactMarkdown>
+          </div>
+        </div>
+      )}
+
       {/* AI Prediction output with markdown rendering and charts */}
-      {displayedPrediction && (
+      {displayedPrediction && !streamedText && (
         <div className="mt-8 bg-gray-50 dark:bg-gray-900 p-4 rounded-md border border-gray-200 dark:border-gray-700">
           {displayedPrediction.error ? (
             <p className="text-red-600">{displayedPrediction.error}</p>
@@ -153,12 +245,15 @@ const AIPredictions = () => {
                         img: ({ alt, src }) => {
                             // Map chart placeholders to dynamic chart URLs
                             const chartUrls = {
-                                "chart-price": `${import.meta.env.VITE_API_URL || 'http://localhost:5050'}/chart/price/${displayedPrediction._coin}?timeframe=${displayedPrediction._timeframe}`,
-                                "chart-macd-rsi": `${import.meta.env.VITE_API_URL || 'http://localhost:5050'}/chart/macd-rsi/${displayedPrediction._coin}?timeframe=${displayedPrediction._timeframe}`,
-                                "chart-bollinger": `${import.meta.env.VITE_API_URL || 'http://localhost:5050'}/chart/bollinger/${displayedPrediction._coin}?timeframe=${displayedPrediction._timeframe}`,
+                                "chart-price": `${API_URL}/chart/price/${displayedPrediction._coin}?timeframe=${displayedPrediction._timeframe}`,
+                                "chart-macd-rsi": `${API_URL}/chart/macd-rsi/${displayedPrediction._coin}?timeframe=${displayedPrediction._timeframe}`,
+                                "chart-bollinger": `${API_URL}/chart/bollinger/${displayedPrediction._coin}?timeframe=${displayedPrediction._timeframe}`,
                             };
 
-                            const chartUrl = chartUrls[src?.trim()];
+                            if (chartImages === null) return <p className="my-6 text-gray-500">Loading chart...</p>;
+
+                            // Prefer the images loaded together via /chart/report
+                            const chartUrl = chartImages[src?.trim()] || chartUrls[src?.trim()];
                             if (!chartUrl) return <p className="text-red-600"> Unknown chart: {src}</p>;
 
                             return (
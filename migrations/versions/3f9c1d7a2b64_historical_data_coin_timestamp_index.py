@@ -0,0 +1,31 @@
+"""unique (coin_id, timestamp) index on historical_data
+
+Revision ID: 3f9c1d7a2b64
+Revises: 8b50a2e1c4f3
+Create Date: 2026-10-18 10:12:41.208114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c1d7a2b64'
+down_revision = '8b50a2e1c4f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Drop duplicate candles (keep the oldest row) so the unique index can be built
+    op.execute(
+        "DELETE FROM historical_data WHERE id NOT IN ("
+        "SELECT MIN(id) FROM historical_data GROUP BY coin_id, timestamp)"
+    )
+    with op.batch_alter_table('historical_data', schema=None) as batch_op:
+        batch_op.create_index('ix_historical_data_coin_id_timestamp', ['coin_id', 'timestamp'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('historical_data', schema=None) as batch_op:
+        batch_op.drop_index('ix_historical_data_coin_id_timestamp')
@@ -0,0 +1,33 @@
+"""add indicator_engine_state table
+
+Revision ID: a4e2c8d19f07
+Revises: 3f9c1d7a2b64
+Create Date: 2026-10-18 11:03:27.554910
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4e2c8d19f07'
+down_revision = '3f9c1d7a2b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('indicator_engine_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('coin_id', sa.Integer(), nullable=False),
+    sa.Column('last_timestamp', sa.DateTime(), nullable=False),
+    sa.Column('state', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['coin_id'], ['coins.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('coin_id')
+    )
+
+
+def downgrade():
+    op.drop_table('indicator_engine_state')
@@ -0,0 +1,26 @@
+"""(coin_id, timestamp) index on technical_indicators
+
+Revision ID: c7d3f5a81e26
+Revises: a4e2c8d19f07
+Create Date: 2026-10-18 15:42:09.371604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d3f5a81e26'
+down_revision = 'a4e2c8d19f07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('technical_indicators', schema=None) as batch_op:
+        batch_op.create_index('ix_technical_indicators_coin_id_timestamp', ['coin_id', 'timestamp'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('technical_indicators', schema=None) as batch_op:
+        batch_op.drop_index('ix_technical_indicators_coin_id_timestamp')
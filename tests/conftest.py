@@ -1,7 +1,12 @@
+import threading
+import time
 import pytest
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 from backend.app import create_app
 from backend.app.models import db as _db, User, Coin
+from backend.app.prediction import ai_analysis
+from backend.app.utils.cache import market_cache
 
 @pytest.fixture(scope='session')
 def app():
@@ -91,3 +96,73 @@ def sample_coin(db, app):
         db.session.add(coin)
         db.session.commit()
         return coin
+
+@pytest.fixture
+def clean_analysis_cache():
+    """Empty market cache and zeroed LLM analysis counters, restored afterwards."""
+    saved = dict(ai_analysis._analysis_stats)
+    market_cache.clear()
+    ai_analysis._analysis_stats.update({k: 0 for k in saved})
+    yield
+    market_cache.clear()
+    ai_analysis._analysis_stats.update(saved)
+
+@pytest.fixture
+def analysis_data():
+    """
+    Canned market data for the LLM analysis functions, no database needed.
+
+    Set ``latest["timestamp"]`` on the yielded dict to simulate a new candle.
+    """
+    latest = {"timestamp": "2024-03-01 00:00:00"}
+
+    def fetch(symbol, timeframe):
+        return {"coin": symbol.upper(), "timeframe": timeframe, "latest_data": dict(latest)}
+
+    with patch.object(ai_analysis, "fetch_historical_data", side_effect=fetch), \
+            patch.object(ai_analysis, "generate_prompt", return_value="prompt"):
+        yield latest
+
+class FakeGroq:
+    """Groq client stand-in: canned completions, call counts and peak concurrency."""
+
+    def __init__(self, content="BTC looks bullish", prompt_tokens=900, completion_tokens=400):
+        self.content = content
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.delay = 0.0
+        self.errors = []
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+
+    def create(self, **kwargs):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            error = self.errors.pop(0) if self.errors else None
+        try:
+            time.sleep(self.delay)
+            if error:
+                raise error
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))],
+                usage=SimpleNamespace(prompt_tokens=self.prompt_tokens, completion_tokens=self.completion_tokens),
+            )
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def client(self, api_key=None):
+        client = MagicMock()
+        client.chat.completions.create.side_effect = self.create
+        return client
+
+@pytest.fixture
+def fake_groq():
+    """Patch ai_analysis.Groq with a FakeGroq; set ``errors`` to make calls fail in order."""
+    groq = FakeGroq()
+    with patch.object(ai_analysis, "Groq", side_effect=groq.client):
+        yield groq
@@ -0,0 +1,57 @@
+import pytest
+from unittest.mock import patch
+from backend.app.prediction import ai_analysis
+
+pytestmark = pytest.mark.usefixtures("clean_analysis_cache")
+
+
+class TestAnalysisCache:
+    # A repeat request for the same candle is served without calling the LLM
+    def test_repeat_request_is_cached(self, analysis_data, fake_groq):
+        first = ai_analysis.analyze_with_llm("BTC", "1d", "full")
+        second = ai_analysis.analyze_with_llm("btc", "1d", "full")
+
+        assert fake_groq.calls == 1
+        assert first["cached"] is False
+        assert second == {"coin": "BTC", "analysis": "BTC looks bullish", "cached": True}
+        stats = ai_analysis.get_analysis_cache_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1 and stats["llm_calls"] == 1
+        assert stats["prompt_tokens_spent"] == stats["prompt_tokens_saved"] == 900
+        assert stats["completion_tokens_saved"] == 400
+
+    # A new candle, another report type or another model each miss the cache
+    def test_key_components(self, analysis_data, fake_groq):
+        ai_analysis.analyze_with_llm("BTC", "1d", "full")
+        ai_analysis.analyze_with_llm("BTC", "1d", "concise")
+        analysis_data["timestamp"] = "2024-03-02 00:00:00"
+        ai_analysis.analyze_with_llm("BTC", "1d", "full")
+        with patch.object(ai_analysis, "GROQ_MODEL", "other-model"):
+            ai_analysis.analyze_with_llm("BTC", "1d", "full")
+
+        assert fake_groq.calls == 4
+
+    # Entries older than the TTL are regenerated
+    def test_expired_entry_regenerates(self, analysis_data, fake_groq):
+        with patch.object(ai_analysis, "ANALYSIS_CACHE_TTL_SECONDS", 0):
+            ai_analysis.analyze_with_llm("BTC", "1d", "concise")
+            ai_analysis.analyze_with_llm("BTC", "1d", "concise")
+
+        assert fake_groq.calls == 2
+
+    # Failed LLM calls are not cached
+    def test_errors_are_not_cached(self, analysis_data, fake_groq):
+        fake_groq.errors = [RuntimeError("rate limited")]
+        failed = ai_analysis.analyze_with_llm("BTC", "1d", "concise")
+        retried = ai_analysis.analyze_with_llm("BTC", "1d", "concise")
+
+        assert "error" in failed
+        assert retried["cached"] is False
+
+    # Savings are reported on /metrics
+    def test_metrics(self, client, analysis_data, fake_groq):
+        ai_analysis.analyze_with_llm("BTC", "1d", "concise")
+        ai_analysis.analyze_with_llm("BTC", "1d", "concise")
+
+        stats = client.get('/metrics').get_json()["llm_analysis"]
+        assert stats["hits"] == 1
+        assert stats["completion_tokens_saved"] == 400
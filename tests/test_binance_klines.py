@@ -0,0 +1,115 @@
+import pytest
+import requests
+from unittest.mock import patch, MagicMock
+from backend.app.utils import binance_klines
+from backend.app.utils.binance_klines import WeightGovernor, fetch_klines, fetch_klines_many
+
+HOUR_MS = 3_600_000
+LATEST_OPEN_MS = 1_700_000_000_000
+
+
+def make_response(payload, status=200, headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    response.json.return_value = payload
+    if status >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(f"HTTP {status}")
+    return response
+
+
+def fake_exchange(total=5000):
+    """Serve hourly klines ending at LATEST_OPEN_MS, honoring limit/startTime/endTime."""
+    opens = [LATEST_OPEN_MS - (total - 1 - i) * HOUR_MS for i in range(total)]
+
+    def get(url, params, timeout):
+        limit = params["limit"]
+        if "startTime" in params:
+            page = [t for t in opens if t >= params["startTime"]][:limit]
+        else:
+            end = params.get("endTime", LATEST_OPEN_MS)
+            page = [t for t in opens if t <= end][-limit:]
+        return make_response([[t, "1", "1", "1", "1", "1"] for t in page], headers={"X-MBX-USED-WEIGHT-1M": "10"})
+
+    return get
+
+
+@pytest.fixture
+def session():
+    fake = MagicMock()
+    with patch.object(binance_klines, "get_session", return_value=fake), \
+            patch.object(binance_klines, "governor", WeightGovernor()), \
+            patch.object(binance_klines.time, "sleep") as sleep:
+        fake.sleep = sleep
+        yield fake
+
+
+class TestFetchKlines:
+    # Limits past 1,000 page backwards and come back in chronological order
+    def test_paginates_backwards(self, session):
+        session.get.side_effect = fake_exchange()
+        klines = fetch_klines("BTCUSDT", "1h", 2500)
+        assert session.get.call_count == 3
+        opens = [k[0] for k in klines]
+        assert len(opens) == 2500
+        assert opens == sorted(opens)
+        assert opens[-1] == LATEST_OPEN_MS
+
+    # startTime pages forward and stops when the exchange runs out of candles
+    def test_paginates_forward_from_start_time(self, session):
+        session.get.side_effect = fake_exchange(total=1500)
+        start = LATEST_OPEN_MS - 1499 * HOUR_MS
+        klines = fetch_klines("BTCUSDT", "1h", 5000, start_time=start)
+        assert len(klines) == 1500
+        assert klines[0][0] == start
+        assert session.get.call_count == 2
+
+    # A 429 is retried after Retry-After, then succeeds
+    def test_retries_rate_limit(self, session):
+        ok = make_response([[LATEST_OPEN_MS, "1", "1", "1", "1", "1"]])
+        session.get.side_effect = [make_response([], status=429, headers={"Retry-After": "2"}), ok]
+        klines = fetch_klines("BTCUSDT", "1h", 1)
+        assert len(klines) == 1
+        assert session.get.call_count == 2
+        session.sleep.assert_any_call(2.0)
+
+    # Persistent server errors raise after the retry budget is spent
+    def test_gives_up_after_retries(self, session):
+        session.get.return_value = make_response([], status=503)
+        with pytest.raises(requests.HTTPError):
+            fetch_klines("BTCUSDT", "1h", 10)
+        assert session.get.call_count == binance_klines.MAX_RETRIES + 1
+
+
+class TestWeightGovernor:
+    # Binance's reported weight overrides the local estimate
+    def test_observe_uses_header(self):
+        governor = WeightGovernor(limit=1000, safety_ratio=1.0)
+        governor.acquire(5)
+        governor.observe({"X-MBX-USED-WEIGHT-1M": "700"})
+        assert governor.used == 700
+
+    # A request that would exceed the budget waits for the next window
+    def test_acquire_waits_when_budget_spent(self):
+        governor = WeightGovernor(limit=10, safety_ratio=1.0)
+        governor.acquire(10)
+        with patch.object(binance_klines.time, "sleep", side_effect=lambda s: setattr(governor, "window", None)) as sleep:
+            governor.acquire(5)
+        assert sleep.call_count == 1
+        assert governor.used == 5
+
+
+class TestFetchKlinesMany:
+    # Symbols are fetched concurrently and failures are omitted
+    def test_omits_failed_symbols(self, session):
+        exchange = fake_exchange()
+
+        def get(url, params, timeout):
+            if params["symbol"] == "BADUSDT":
+                raise requests.ConnectionError("boom")
+            return exchange(url, params, timeout)
+
+        session.get.side_effect = get
+        result = fetch_klines_many(["BTCUSDT", "BADUSDT", "ETHUSDT"], "1h", 24)
+        assert set(result) == {"BTCUSDT", "ETHUSDT"}
+        assert len(result["BTCUSDT"]) == 24
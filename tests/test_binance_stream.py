@@ -0,0 +1,161 @@
+import json
+import queue
+import socket
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from wsproto import WSConnection, ConnectionType
+from wsproto.events import AcceptConnection, CloseConnection, Request, TextMessage
+from backend.app.utils import binance_stream
+from backend.app.utils.binance_stream import BinanceTickerStream, get_live_tickers
+
+
+class FakeBinanceServer:
+    """Minimal local WebSocket server that pushes whatever the test queues."""
+
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+        self.paths = []
+        self.outbox = queue.Queue()
+        self.connections = 0
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.port}"
+
+    def _serve(self):
+        while self.running:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            self._handle(conn)
+
+    def _handle(self, conn):
+        ws = WSConnection(ConnectionType.SERVER)
+        conn.settimeout(0.05)
+        try:
+            while self.running:
+                try:
+                    data = conn.recv(4096)
+                    if not data:
+                        return
+                    ws.receive_data(data)
+                except socket.timeout:
+                    pass
+                for event in ws.events():
+                    if isinstance(event, Request):
+                        self.paths.append(event.target)
+                        conn.sendall(ws.send(AcceptConnection()))
+                    elif isinstance(event, CloseConnection):
+                        return
+
+                while not self.outbox.empty():
+                    message = self.outbox.get()
+                    if message is None:
+                        # Simulate the exchange dropping the connection
+                        return
+                    conn.sendall(ws.send(TextMessage(data=json.dumps(message))))
+        finally:
+            conn.close()
+
+    def push(self, message):
+        self.outbox.put(message)
+
+    def drop(self):
+        self.outbox.put(None)
+
+    def close(self):
+        self.running = False
+        self.sock.close()
+
+
+def mini_ticker(symbol, close):
+    return {
+        "stream": f"{symbol.lower()}@miniTicker",
+        "data": {"e": "24hrMiniTicker", "E": 1700000000000, "s": symbol, "c": str(close),
+                 "o": "100", "h": "110", "l": "90", "v": "12.5", "q": "1250"},
+    }
+
+
+def wait_for(condition, timeout=3):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def fake_binance():
+    server = FakeBinanceServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def stream(fake_binance):
+    stream = BinanceTickerStream(["BTCUSDT", "ETHUSDT"], base_url=fake_binance.url)
+    with patch.object(binance_stream, "RECONNECT_BASE_SECONDS", 0.05), \
+            patch.object(binance_stream, "RECEIVE_TIMEOUT_SECONDS", 0.1):
+        yield stream
+        stream.stop()
+
+
+class TestBinanceTickerStream:
+    # Subscribes to the combined miniTicker streams and maps ticks to the REST layout
+    def test_receives_ticks(self, fake_binance, stream):
+        stream.start()
+        assert wait_for(lambda: stream.connected)
+        assert fake_binance.paths == ["/stream?streams=btcusdt@miniTicker/ethusdt@miniTicker"]
+
+        fake_binance.push(mini_ticker("BTCUSDT", 65000))
+        assert wait_for(lambda: stream.version == 1)
+        # Not every subscribed symbol has ticked yet
+        assert stream.get_tickers() is None
+
+        fake_binance.push(mini_ticker("ETHUSDT", 3000))
+        assert wait_for(lambda: stream.version == 2)
+        ticker = stream.get_tickers()[0]
+        assert ticker["symbol"] == "BTCUSDT"
+        assert ticker["lastPrice"] == "65000"
+        assert ticker["highPrice"] == "110"
+
+    # A dropped connection is re-established automatically
+    def test_reconnects_after_drop(self, fake_binance, stream):
+        stream.start()
+        assert wait_for(lambda: stream.connected)
+        fake_binance.drop()
+        assert wait_for(lambda: fake_binance.connections == 2 and stream.connected)
+        assert stream.reconnects >= 1
+
+        fake_binance.push(mini_ticker("ETHUSDT", 3000))
+        assert wait_for(lambda: stream.version == 1)
+
+    # Without a live stream, callers get the REST ticker cache instead
+    def test_falls_back_to_rest(self, stream):
+        rest = [{"symbol": "BTCUSDT", "lastPrice": "1"}]
+        with patch.object(binance_stream, "ticker_stream", stream), \
+                patch.object(binance_stream, "get_cached_binance_tickers", return_value=rest):
+            assert get_live_tickers() == rest
+
+            stream.connected = True
+            stream.handle_message(json.dumps(mini_ticker("BTCUSDT", 2)))
+            # A partial table would broadcast zero prices for ETH, so REST is used
+            assert get_live_tickers() == rest
+
+            stream.handle_message(json.dumps(mini_ticker("ETHUSDT", 3)))
+            assert get_live_tickers()[0]["lastPrice"] == "2"
+
+            # Ticks that stop arriving count as a dead stream
+            stream.last_message_at -= binance_stream.STREAM_STALE_AFTER_SECONDS
+            assert get_live_tickers() == rest
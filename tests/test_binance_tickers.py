@@ -0,0 +1,79 @@
+import json
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+from backend.app.utils import api
+from backend.app.utils.cache import market_cache
+
+
+def make_response(symbols, status=200, headers=None):
+    body = json.dumps([{"symbol": s, "lastPrice": "1.0"} for s in symbols]).encode()
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    response.content = body
+    response.json.side_effect = lambda: json.loads(body)
+    return response
+
+
+def serve_requested(url, params, timeout):
+    return make_response(json.loads(params["symbols"]))
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    saved = dict(api._ticker_request_stats)
+    market_cache.clear()
+    yield
+    market_cache.clear()
+    api._ticker_request_stats.update(saved)
+
+
+class TestTrackedTickers:
+    # Only the tracked pairs are requested, in the cheapest weight tier
+    def test_requests_tracked_symbols_only(self):
+        with patch.object(api.requests, "get", side_effect=serve_requested) as get:
+            tickers = api.get_cached_binance_tickers()
+
+        assert get.call_count == 1
+        assert json.loads(get.call_args.kwargs["params"]["symbols"]) == api.TRACKED_BINANCE_SYMBOLS
+        assert [t["symbol"] for t in tickers] == api.TRACKED_BINANCE_SYMBOLS
+
+    # Long symbol lists are split into chunks and merged
+    def test_chunks_large_symbol_lists(self):
+        symbols = [f"C{i}USDT" for i in range(45)]
+        with patch.object(api.requests, "get", side_effect=serve_requested) as get:
+            tickers = api.fetch_binance_tickers(symbols)
+
+        assert get.call_count == 3
+        assert [t["symbol"] for t in tickers] == symbols
+
+    # A failed chunk keeps serving the stale cache
+    def test_failed_refresh_keeps_stale_cache(self):
+        stale = [{"symbol": "BTCUSDT", "lastPrice": "1.0"}]
+        market_cache.backend.set(api.BINANCE_TICKERS_CACHE_KEY, stale, time.time() - 3600, 86400)
+        throttled = make_response([], status=429, headers={"Retry-After": "120"})
+        with patch.object(api.requests, "get", return_value=throttled):
+            assert api.get_cached_binance_tickers() == stale
+
+        # The source backs off for at least as long as Binance asked
+        source = market_cache.sources[api.BINANCE_TICKERS_CACHE_KEY]
+        assert source.backoff_until >= time.time() + 100
+        source.record_success()
+
+    # Weight and bytes are counted and exposed on /metrics
+    def test_metrics_report_weight_and_bytes(self, client):
+        api._ticker_request_stats.update(requests=0, weight=0, bytes=0, tickers=0, parse_seconds=0.0)
+        with patch.object(api.requests, "get", side_effect=serve_requested):
+            api.get_cached_binance_tickers()
+
+        stats = client.get('/metrics').get_json()["binance_ticker"]
+        assert stats["requests"] == 1
+        assert stats["weight"] == 2
+        assert stats["tickers"] == len(api.TRACKED_BINANCE_SYMBOLS)
+        assert stats["bytes"] > 0
+
+    # Weight tiers follow Binance's documented table
+    @pytest.mark.parametrize("count,weight", [(1, 2), (20, 2), (21, 40), (100, 40), (101, 80), (0, 80)])
+    def test_request_weight(self, count, weight):
+        assert api.ticker_request_weight(count) == weight
@@ -0,0 +1,97 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from backend.app.utils.cache import Cache, MemoryBackend, RedisBackend, SQLiteBackend, create_backend
+
+
+@pytest.fixture(params=["memory", "redis", "sqlite"])
+def cache(request):
+    if request.param == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        backend = RedisBackend(fakeredis.FakeRedis())
+    elif request.param == "sqlite":
+        backend = SQLiteBackend(":memory:")
+    else:
+        backend = MemoryBackend()
+    return Cache(backend)
+
+
+def age(cache, key, seconds):
+    """Backdate a stored entry by ``seconds``."""
+    value, stored_at = cache.backend.get(key)
+    cache.backend.set(key, value, stored_at - seconds, 3600)
+
+
+class TestCache:
+    # A fresh value is served without calling upstream again
+    def test_hit_within_ttl(self, cache):
+        calls = []
+        refresh = lambda: calls.append(1) or [{"symbol": "BTCUSDT"}]
+        assert cache.get_or_refresh("k", refresh, ttl=60) == [{"symbol": "BTCUSDT"}]
+        assert cache.get_or_refresh("k", refresh, ttl=60) == [{"symbol": "BTCUSDT"}]
+        assert len(calls) == 1
+        assert cache.get_stats()["k"]["misses"] == 1
+        assert cache.get_stats()["k"]["hits"] == 1
+
+    # A stale value is returned immediately while a background refresh runs
+    def test_stale_while_revalidate(self, cache):
+        cache.get_or_refresh("k", lambda: "old", ttl=60)
+        age(cache, "k", 90)
+
+        release = threading.Event()
+
+        def slow_refresh():
+            release.wait(2)
+            return "new"
+
+        assert cache.get_or_refresh("k", slow_refresh, ttl=60, stale_ttl=60) == "old"
+        assert cache.get_stats()["k"]["stale"] == 1
+        release.set()
+
+        deadline = time.time() + 2
+        while cache.backend.get("k")[0] != "new" and time.time() < deadline:
+            time.sleep(0.01)
+        assert cache.get_or_refresh("k", lambda: "unused", ttl=60) == "new"
+
+    # Past the stale window the refresh is inline, falling back to the old value on failure
+    def test_expired_refresh_failure_keeps_old_value(self, cache):
+        cache.get_or_refresh("k", lambda: {"v": 1}, ttl=60)
+        age(cache, "k", 600)
+        assert cache.get_or_refresh("k", lambda: None, ttl=60, stale_ttl=60) == {"v": 1}
+        assert cache.get_or_refresh("k", lambda: {"v": 2}, ttl=60, stale_ttl=60) == {"v": 2}
+
+    # A broken backend degrades to direct upstream calls
+    def test_backend_errors_are_misses(self):
+        cache = Cache(MemoryBackend())
+        with patch.object(cache.backend, "get", side_effect=ConnectionError("down")):
+            assert cache.get_or_refresh("k", lambda: 42, ttl=60) == 42
+        assert cache.get_stats()["k"]["errors"] == 1
+
+
+class TestSharedBackends:
+    # Two caches on the same Redis share entries, like separate workers would
+    def test_redis_shared_between_workers(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        worker_a = Cache(RedisBackend(fakeredis.FakeRedis(server=server)))
+        worker_b = Cache(RedisBackend(fakeredis.FakeRedis(server=server)))
+
+        worker_a.get_or_refresh("k", lambda: [1, 2, 3], ttl=60)
+        assert worker_b.get_or_refresh("k", lambda: pytest.fail("upstream called twice"), ttl=60) == [1, 2, 3]
+
+    # Only the memory backend is process-local
+    def test_is_shared(self):
+        assert not Cache(MemoryBackend()).is_shared()
+        assert Cache(SQLiteBackend(":memory:")).is_shared()
+
+    # The redis backend refuses to start without a URL instead of guessing localhost
+    def test_redis_requires_url(self):
+        with pytest.raises(RuntimeError, match="CACHE_REDIS_URL"):
+            create_backend("redis", redis_url=None)
+
+    # Two processes pointing at one SQLite file share entries
+    def test_sqlite_file_shared(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        Cache(SQLiteBackend(path)).get_or_refresh("k", lambda: {"a": 1}, ttl=60)
+        assert Cache(SQLiteBackend(path)).get_or_refresh("k", lambda: None, ttl=60) == {"a": 1}
@@ -0,0 +1,170 @@
+import base64
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from backend.app.routes import chart_routes
+from backend.app.utils.chart_cache import ChartImageCache, chart_cache
+
+
+def make_market_data(periods=300, end="2024-03-01"):
+    index = pd.date_range(end=end, periods=periods, freq="1h")
+    close = 100 + np.sin(np.arange(periods) / 10) * 5
+    return pd.DataFrame({
+        "Open": close - 0.5, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 10.0
+    }, index=index)
+
+
+def from_packed(data, fields):
+    """Decode /chart/data binary output the way a client does: times, then one array per field."""
+    rows = len(data) // (4 * (len(fields) + 1))
+    times = np.frombuffer(data, dtype="<u4", count=rows)
+    columns = {
+        field: np.frombuffer(data, dtype="<f4", count=rows, offset=4 * rows * (i + 1))
+        for i, field in enumerate(fields)
+    }
+    return times, columns
+
+
+@pytest.fixture(autouse=True)
+def clean_chart_cache():
+    chart_cache.clear()
+    yield
+    chart_cache.clear()
+
+
+class TestChartImageCache:
+    # Least recently used images are evicted past the entry bound
+    def test_evicts_least_recently_used(self):
+        cache = ChartImageCache(max_entries=2, max_bytes=1000)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        cache.get("a")
+        cache.put("c", b"3")
+
+        assert cache.get("b") is None
+        assert cache.get("a").png == b"1"
+        assert cache.get_stats()["evictions"] == 1
+
+    # Total PNG bytes stay under the size bound
+    def test_evicts_past_byte_bound(self):
+        cache = ChartImageCache(max_entries=10, max_bytes=10)
+        cache.put("a", b"x" * 6)
+        cache.put("b", b"y" * 6)
+
+        assert cache.get("a") is None
+        assert cache.get_stats()["bytes"] == 6
+
+    # Images expire so the open candle keeps updating
+    def test_expires_after_ttl(self):
+        cache = ChartImageCache(ttl=0)
+        cache.put("a", b"1")
+        assert cache.get("a") is None
+
+
+class TestChartRoutesCaching:
+    # Repeat requests are served from cache with validators; revalidation gets a 304
+    def test_repeat_request_skips_rendering(self, client):
+        df = make_market_data()
+        with patch.object(chart_routes, "fetch_market_data", side_effect=lambda *a: df.copy()), \
+                patch.object(chart_routes.chart_render_pool, "submit",
+                             wraps=chart_routes.chart_render_pool.submit) as render:
+            first = client.get('/chart/price/BTC?timeframe=1h')
+            second = client.get('/chart/price/btc?timeframe=1h')
+            revalidated = client.get('/chart/price/BTC?timeframe=1h',
+                                     headers={"If-None-Match": first.headers["ETag"]})
+
+        assert first.status_code == 200
+        assert first.mimetype == "image/png"
+        assert "public" in first.headers["Cache-Control"]
+        assert "max-age" in first.headers["Cache-Control"]
+        assert first.headers["Last-Modified"]
+        assert second.data == first.data
+        assert revalidated.status_code == 304
+        assert render.call_count == 1
+        assert chart_cache.get_stats()["not_modified"] == 1
+
+    # A new candle changes the key, so the chart is rendered again
+    def test_new_candle_invalidates(self, client):
+        with patch.object(chart_routes, "fetch_market_data", return_value=make_market_data()):
+            first = client.get('/chart/bollinger/ETH?timeframe=1h')
+        with patch.object(chart_routes, "fetch_market_data", return_value=make_market_data(end="2024-03-01 01:00")):
+            second = client.get('/chart/bollinger/ETH?timeframe=1h',
+                                headers={"If-None-Match": first.headers["ETag"]})
+
+        assert second.status_code == 200
+        assert second.headers["ETag"] != first.headers["ETag"]
+        assert chart_cache.get_stats()["entries"] == 2
+
+
+class TestReportCharts:
+    # One request fetches market data and computes indicators once for all panels
+    def test_renders_all_panels_from_one_fetch(self, client):
+        df = make_market_data()
+        with patch.object(chart_routes, "fetch_market_data", return_value=df) as fetch, \
+                patch.object(chart_routes, "calculate_indicators", wraps=chart_routes.calculate_indicators) as indicators:
+            response = client.get('/chart/report/BTC?timeframe=1h')
+            single = client.get('/chart/bollinger/BTC?timeframe=1h')
+
+        data = response.get_json()
+        assert response.status_code == 200
+        assert set(data["panels"]) == {"price", "macd-rsi", "bollinger"}
+        assert all(base64.b64decode(png).startswith(b"\x89PNG") for png in data["panels"].values())
+        assert fetch.call_count == 2
+        assert indicators.call_count == 1
+        # Panels share the single-chart image cache
+        assert base64.b64decode(data["panels"]["bollinger"]) == single.data
+
+    # Revalidation with the combined ETag returns 304
+    def test_conditional_and_panel_selection(self, client):
+        with patch.object(chart_routes, "fetch_market_data", side_effect=lambda *a: make_market_data()):
+            first = client.get('/chart/report/ETH?timeframe=1h&panels=price')
+            again = client.get('/chart/report/ETH?timeframe=1h&panels=price',
+                               headers={"If-None-Match": first.headers["ETag"]})
+            unknown = client.get('/chart/report/ETH?panels=price,volume')
+
+        assert list(first.get_json()["panels"]) == ["price"]
+        assert again.status_code == 304
+        assert unknown.status_code == 400
+
+
+class TestChartData:
+    # Columnar JSON carries the same aggregated series the PNG charts use
+    def test_columnar_json(self, client):
+        with patch.object(chart_routes, "fetch_market_data", return_value=make_market_data()):
+            response = client.get('/chart/data/BTC?timeframe=1h&fields=Close,RSI')
+
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data["fields"] == ["Close", "RSI"]
+        assert set(data["columns"]) == {"Close", "RSI"}
+        assert len(data["time"]) == len(data["columns"]["Close"]) == 96
+        assert data["time"][-1] == int(pd.Timestamp("2024-03-01").timestamp())
+        # RSI of the first candle has no previous close
+        assert data["columns"]["RSI"][0] is None
+
+    # Packed float32 arrays decode back to the JSON values
+    def test_binary_matches_json(self, client):
+        with patch.object(chart_routes, "fetch_market_data", side_effect=lambda *a: make_market_data()):
+            as_json = client.get('/chart/data/BTC?timeframe=1d').get_json()
+            binary = client.get('/chart/data/BTC?timeframe=1d&format=binary',
+                                headers={"Origin": "http://localhost:5173"})
+            again = client.get('/chart/data/BTC?timeframe=1d&format=binary',
+                               headers={"If-None-Match": binary.headers["ETag"]})
+
+        fields = binary.headers["X-Chart-Fields"].split(",")
+        times, columns = from_packed(binary.data, fields)
+        assert binary.mimetype == "application/octet-stream"
+        # A cross-origin frontend can only read the layout headers if CORS exposes them
+        exposed = binary.headers["Access-Control-Expose-Headers"]
+        assert "X-Chart-Fields" in exposed and "X-Chart-Rows" in exposed
+        assert fields == as_json["fields"]
+        assert int(binary.headers["X-Chart-Rows"]) == len(times)
+        assert times.tolist() == as_json["time"]
+        np.testing.assert_allclose(columns["Close"], as_json["columns"]["Close"], rtol=1e-6)
+        assert again.status_code == 304
+
+    # Unknown fields and formats are rejected
+    def test_rejects_unknown_fields(self, client):
+        assert client.get('/chart/data/BTC?fields=Close,Nope').status_code == 400
+        assert client.get('/chart/data/BTC?format=xml').status_code == 400
@@ -0,0 +1,127 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from backend.app.prediction.market_data import calculate_indicators
+from backend.app.routes import chart_routes
+from backend.app.utils.chart_cache import chart_cache
+from backend.app.utils import chart_renderer
+from backend.app.utils.chart_helpers import aggregate_candles
+from backend.app.utils.chart_renderer import (
+    ChartRenderPool, RenderUnavailable, pack_frame, unpack_frame, render_chart_png
+)
+
+
+def make_indicator_frame(periods=96):
+    index = pd.date_range("2024-01-01", periods=periods, freq="1h")
+    close = 100 + np.sin(np.arange(periods) / 10) * 5
+    df = pd.DataFrame({
+        "Open": close - 0.5, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 10.0
+    }, index=index)
+    return calculate_indicators(aggregate_candles(df, "1h"))
+
+
+@pytest.fixture(autouse=True)
+def clean_chart_cache():
+    chart_cache.clear()
+    yield
+    chart_cache.clear()
+
+
+class TestChartRenderPool:
+    # Frames survive the trip to the workers unchanged
+    def test_pack_roundtrip(self):
+        df = make_indicator_frame()
+        pd.testing.assert_frame_equal(unpack_frame(pack_frame(df)), df, check_freq=False)
+
+    # Worker processes produce the same PNG as an inline render
+    def test_process_render_matches_inline(self):
+        df = make_indicator_frame()
+        pool = ChartRenderPool(workers=1, timeout=60, max_queue=2)
+        try:
+            png = pool.render("price", "BTC", "1h", df)
+        finally:
+            pool._reset_executor()
+
+        assert png == render_chart_png("price", "BTC", "1h", pack_frame(df))
+        stats = pool.get_stats()
+        assert stats["submitted"] == stats["completed"] == 1
+        assert stats["queue_depth"] == 0
+
+    # A full queue refuses new renders
+    def test_saturated_queue_refuses(self):
+        pool = ChartRenderPool(workers=1, max_queue=0)
+        with pytest.raises(RenderUnavailable):
+            pool.render("price", "BTC", "1h", make_indicator_frame())
+        assert pool.get_stats()["saturated"] == 1
+
+    # Renders that exceed the timeout give up instead of holding the request
+    def test_timeout(self):
+        pool = ChartRenderPool(workers=1, timeout=0, max_queue=2)
+        try:
+            with pytest.raises(RenderUnavailable):
+                pool.render("price", "BTC", "1h", make_indicator_frame())
+        finally:
+            pool._reset_executor()
+        assert pool.get_stats()["timeouts"] == 1
+
+    # A timed-out render that is already running keeps its worker until it ends
+    def test_running_timeout_is_tracked(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow_render(*args):
+            started.set()
+            release.wait(5)
+            return b"png"
+
+        pool = ChartRenderPool(workers=1, timeout=0.05, max_queue=4)
+        executor = ThreadPoolExecutor(max_workers=1)
+        with patch.object(pool, "_get_executor", return_value=executor), \
+                patch.object(chart_renderer, "render_chart_png", slow_render):
+            future = pool.submit("price", "BTC", "1h", {})
+            assert started.wait(5)
+            with pytest.raises(RenderUnavailable):
+                pool.wait(future)
+            assert pool.get_stats()["abandoned"] == 1
+
+            # Nothing is queued behind it while it holds the only worker
+            with pytest.raises(RenderUnavailable, match="timed-out"):
+                pool.submit("price", "BTC", "1h", {})
+
+            release.set()
+            deadline = time.monotonic() + 5
+            while pool.get_stats()["abandoned"] and time.monotonic() < deadline:
+                time.sleep(0.01)
+        executor.shutdown()
+
+        stats = pool.get_stats()
+        assert stats["abandoned"] == stats["queue_depth"] == 0
+        assert stats["completed"] == 1 and stats["saturated"] == 1
+
+    # When rendering is unavailable, the newest cached image is served, else 503
+    def test_route_falls_back_to_cached_image(self, client):
+        raw = make_indicator_frame()[["Open", "High", "Low", "Close", "Volume"]]
+        saturated = ChartRenderPool(workers=1, max_queue=0)
+        with patch.object(chart_routes, "fetch_market_data", side_effect=lambda *a: raw.copy()), \
+                patch.object(chart_routes, "chart_render_pool", saturated):
+            busy = client.get('/chart/macd-rsi/BTC?timeframe=1h')
+        assert busy.status_code == 503
+        assert busy.headers["Retry-After"]
+
+        with patch.object(chart_routes, "fetch_market_data", return_value=raw.copy()), \
+                patch.object(chart_routes.chart_render_pool, "workers", 0):
+            fresh = client.get('/chart/macd-rsi/BTC?timeframe=1h')
+
+        newer = raw.copy()
+        newer.index = newer.index + pd.Timedelta(hours=1)
+        with patch.object(chart_routes, "fetch_market_data", return_value=newer), \
+                patch.object(chart_routes, "chart_render_pool", saturated):
+            fallback = client.get('/chart/macd-rsi/BTC?timeframe=1h')
+
+        assert fallback.status_code == 200
+        assert fallback.data == fresh.data
+        assert chart_cache.get_stats()["fallbacks"] == 1
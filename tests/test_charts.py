@@ -0,0 +1,103 @@
+import os
+import threading
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from backend.app.prediction import charts
+from backend.app.utils.chart_renderer import render_png
+
+# Renders in the memory soak test; raise it (e.g. 10000) for a longer local run
+SOAK_RENDERS = int(os.environ.get("CHART_SOAK_RENDERS", "200"))
+
+
+def draw_candles_per_candle(ax1, df, candle_width):
+    """The previous renderer: one wick line and one bar per candle."""
+    for i in range(len(df)):
+        date = df.index[i]
+        open_price = df["Open"].iloc[i]
+        close_price = df["Close"].iloc[i]
+        color = "lime" if close_price > open_price else "red"
+        ax1.plot([date, date], [df["Low"].iloc[i], df["High"].iloc[i]], color=color, linewidth=0.5)
+        ax1.bar(date, abs(close_price - open_price), bottom=min(open_price, close_price),
+                color=color, width=candle_width, linewidth=0)
+
+
+def make_ohlcv(periods, freq):
+    rng = np.random.default_rng(1)
+    index = pd.date_range("2024-01-01", periods=periods, freq=freq)
+    close = 100 + rng.normal(0, 1, periods).cumsum()
+    open_price = close + rng.normal(0, 0.5, periods)
+    return pd.DataFrame({
+        "Open": open_price,
+        "High": np.maximum(open_price, close) + rng.uniform(0, 1, periods),
+        "Low": np.minimum(open_price, close) - rng.uniform(0, 1, periods),
+        "Close": close,
+        "Volume": rng.uniform(1, 10, periods),
+    }, index=index)
+
+
+def render_pixels(df, timeframe):
+    fig, ax1, _ = charts.plot_base_candlestick_chart(df.copy(), "BTC", timeframe)
+    fig.canvas.draw()
+    pixels = np.asarray(fig.canvas.buffer_rgba())[..., :3].astype(float)
+    artists = len(ax1.get_children())
+    return pixels, artists
+
+
+class TestCandlestickRendering:
+    # Batched candles render the same pixels as the per-candle loop did
+    @pytest.mark.parametrize("timeframe,periods,freq", [("1h", 96, "1h"), ("1d", 120 * 24, "1h"), ("1w", 96 * 7, "1D")])
+    def test_matches_per_candle_output(self, timeframe, periods, freq):
+        df = make_ohlcv(periods, freq)
+        batched, batched_artists = render_pixels(df, timeframe)
+        with patch.object(charts, "draw_candles", draw_candles_per_candle):
+            reference, reference_artists = render_pixels(df, timeframe)
+
+        assert batched.shape == reference.shape
+        np.testing.assert_array_equal(batched, reference)
+        # Two collections instead of two artists per candle
+        assert reference_artists - batched_artists >= 2 * len(charts.aggregate_candles(df.copy(), timeframe)) - 2
+
+
+def rss_megabytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+class TestFigureLifecycle:
+    # Figures never enter pyplot's global registry
+    def test_no_pyplot_figures_leak(self):
+        before = plt.get_fignums()
+        fig, _, _ = charts.plot_base_candlestick_chart(make_ohlcv(96, "1h"), "BTC", "1h")
+        render_png(fig)
+        assert plt.get_fignums() == before
+        assert fig.axes == []
+
+    # Concurrent renders don't interfere with each other
+    def test_concurrent_renders_are_isolated(self):
+        df = make_ohlcv(96, "1h")
+        expected = render_png(charts.plot_base_candlestick_chart(df.copy(), "BTC", "1h")[0])
+        results = []
+
+        def worker():
+            results.append(render_png(charts.plot_base_candlestick_chart(df.copy(), "BTC", "1h")[0]))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [expected] * 4
+
+    # Memory stays flat over many renders
+    @pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="needs /proc to read RSS")
+    def test_soak_memory_is_bounded(self):
+        df = make_ohlcv(24, "1h")
+        for _ in range(20):
+            render_png(charts.plot_base_candlestick_chart(df.copy(), "BTC", "1h")[0])
+        baseline = rss_megabytes()
+        for _ in range(SOAK_RENDERS):
+            render_png(charts.plot_base_candlestick_chart(df.copy(), "BTC", "1h")[0])
+        assert rss_megabytes() - baseline < 25
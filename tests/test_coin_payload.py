@@ -0,0 +1,142 @@
+import json
+import pytest
+from unittest.mock import patch
+from backend.app import socketio
+from backend.app.utils import socket_tasks
+from backend.app.utils.coin_payload import CoinPayload, PayloadJSON, RawJSON, diff_coins
+
+COINS = [{"symbol": "BTC", "current_price": 65000.0}, {"symbol": "ETH", "current_price": 3000.0}]
+
+
+@pytest.fixture
+def payload():
+    socket_tasks.coin_payload.reset()
+    with patch.object(socket_tasks.coin_payload, "builder", return_value=COINS) as builder:
+        yield builder
+    socket_tasks.coin_payload.reset()
+
+
+def coin_data_events(received):
+    return [event for event in received if event["name"] == "coin_data"]
+
+
+class TestCoinPayload:
+    # Raw JSON fragments are spliced into the packet without re-encoding
+    def test_payload_json_splices_raw_fragments(self):
+        encoded = PayloadJSON.dumps(["coin_data", RawJSON('[{"a":1}]'), {"version": 2}], separators=(",", ":"))
+        assert encoded == '["coin_data",[{"a":1}],{"version":2}]'
+        assert PayloadJSON.dumps({"a": 1}) == json.dumps({"a": 1})
+
+    # The version only moves when the serialized payload changes
+    def test_version_bumps_on_change_only(self):
+        coins = [dict(COINS[0])]
+        payload = CoinPayload(lambda: coins)
+        assert payload.refresh() is True
+        assert payload.refresh() is False
+        assert payload.version == 1
+
+        coins[0]["current_price"] = 66000.0
+        assert payload.refresh() is True
+        assert payload.version == 2
+
+    # An empty build keeps serving the last good payload
+    def test_empty_build_keeps_previous(self):
+        results = [COINS, []]
+        payload = CoinPayload(lambda: results.pop(0))
+        payload.refresh()
+        assert payload.refresh() is False
+        assert json.loads(payload.json) == COINS
+
+
+class TestCoinDataSocket:
+    # Connects are served from the stored blob without rebuilding it
+    def test_connect_reuses_payload(self, app, payload):
+        first = socketio.test_client(app)
+        second = socketio.test_client(app)
+        events = coin_data_events(second.get_received())
+        assert payload.call_count == 1
+        assert events[0]["args"] == [COINS, {"version": 1}]
+        first.disconnect()
+        second.disconnect()
+
+    # A client that already has the current version gets a tiny ack instead
+    def test_request_with_current_version_is_skipped(self, app, payload):
+        client = socketio.test_client(app)
+        client.get_received()
+
+        client.emit("request_coin_data", {"version": 1})
+        received = client.get_received()
+        assert [event["name"] for event in received] == ["coin_data_unchanged"]
+
+        client.emit("request_coin_data")
+        assert coin_data_events(client.get_received())[0]["args"][0] == COINS
+        client.disconnect()
+
+    # The internal emit route rebuilds once and broadcasts the shared blob
+    def test_internal_emit_route(self, app, client, payload):
+        listener = socketio.test_client(app)
+        listener.get_received()
+
+        res = client.post('/internal/emit-coin-data')
+        assert res.status_code == 200
+        assert res.get_json() == {"status": "success", "emitted": 2, "version": 1}
+        assert coin_data_events(listener.get_received())[0]["args"] == [COINS, {"version": 1}]
+        listener.disconnect()
+
+
+class TestCoinDeltaStream:
+    # Only changed fields are reported, plus added and removed coins
+    def test_diff_coins(self):
+        old = [{"symbol": "BTC", "current_price": 1.0, "name": "Bitcoin"}, {"symbol": "DOGE", "current_price": 0.1}]
+        new = [{"symbol": "BTC", "current_price": 2.0, "name": "Bitcoin"}, {"symbol": "ETH", "current_price": 3.0}]
+        changes, removed = diff_coins(old, new)
+        assert changes == {"BTC": {"current_price": 2.0}, "ETH": {"symbol": "ETH", "current_price": 3.0}}
+        assert removed == ["DOGE"]
+
+    # Subscribers get a snapshot, then seq-numbered deltas instead of full lists
+    def test_subscriber_receives_snapshot_then_deltas(self, app, payload):
+        legacy = socketio.test_client(app)
+        subscriber = socketio.test_client(app, auth={"coin_stream": "delta"})
+        legacy.get_received()
+
+        snapshot = subscriber.get_received()
+        assert [event["name"] for event in snapshot] == ["coin_snapshot"]
+        assert snapshot[0]["args"][0] == {"seq": 1, "coins": COINS}
+
+        payload.return_value = [COINS[0], dict(COINS[1], current_price=3100.0)]
+        socket_tasks.coin_payload.refresh()
+        socket_tasks.broadcast_coin_payload(socketio)
+
+        deltas = subscriber.get_received()
+        assert [event["name"] for event in deltas] == ["coin_delta"]
+        assert deltas[0]["args"][0] == {"seq": 2, "base": 1, "changes": {"ETH": {"current_price": 3100.0}}, "removed": []}
+        assert coin_data_events(legacy.get_received())[0]["args"][1] == {"version": 2}
+
+        subscriber.emit("resync_coin_data")
+        assert subscriber.get_received()[0]["args"][0]["seq"] == 2
+        legacy.disconnect()
+        subscriber.disconnect()
+
+    # A manual emit without changes re-sends a snapshot, not the previous delta
+    def test_unchanged_manual_emit_sends_snapshot(self, app, client, payload):
+        subscriber = socketio.test_client(app, auth={"coin_stream": "delta"})
+        subscriber.get_received()
+
+        assert client.post('/internal/emit-coin-data').status_code == 200
+        received = subscriber.get_received()
+        assert [event["name"] for event in received] == ["coin_snapshot"]
+        assert received[0]["args"][0] == {"seq": 1, "coins": COINS}
+        subscriber.disconnect()
+
+    # Existing clients can switch protocols after connecting
+    def test_subscribe_after_connect(self, app, payload):
+        client = socketio.test_client(app)
+        client.get_received()
+        client.emit("subscribe_coin_deltas")
+        assert client.get_received()[0]["name"] == "coin_snapshot"
+
+        payload.return_value = [dict(COINS[0], current_price=1.0), COINS[1]]
+        socket_tasks.coin_payload.refresh()
+        socket_tasks.broadcast_coin_payload(socketio)
+        assert [event["name"] for event in client.get_received()] == ["coin_delta"]
+        client.disconnect()
@@ -0,0 +1,92 @@
+import pytest
+from datetime import datetime, timezone, timedelta
+from backend.app.models import HistoricalData, Coin, TechnicalIndicators
+from backend.app.utils.db_helpers import insert_historical_rows, insert_new_indicator_rows, kline_to_historical_row
+
+
+@pytest.fixture
+def coin_id(db, sample_coin):
+    return Coin.query.filter_by(coin_symbol='BTC').first().id
+
+
+def make_indicator_rows(n, start=datetime(2024, 1, 1)):
+    columns = ["SMA_50", "SMA_200", "EMA_50", "EMA_200", "RSI", "MACD", "MACD_Signal",
+               "Stoch_RSI_K", "Stoch_RSI_D", "BB_upper", "BB_middle", "BB_lower", "Volume_Change"]
+    return [dict({c: float(i) for c in columns}, timestamp=start + timedelta(hours=i)) for i in range(n)]
+
+
+def make_kline(open_time_ms, close=100.0):
+    return [open_time_ms, "99.0", "101.0", "98.0", str(close), "12.5", open_time_ms + 3599999]
+
+
+class TestHistoricalBulkInsert:
+    # Kline conversion produces a naive UTC timestamp and float prices
+    def test_kline_to_row(self):
+        row = kline_to_historical_row(1, make_kline(1_700_000_000_000, close=105.5))
+        assert row["price"] == 105.5
+        assert row["high"] == 101.0
+        assert row["timestamp"].tzinfo is None
+        assert row["timestamp"] == datetime(2023, 11, 14, 22, 13, 20)
+
+    # Fresh rows are all inserted in batches
+    def test_inserts_new_rows(self, db, coin_id):
+        rows = [kline_to_historical_row(coin_id, make_kline(1_700_000_000_000 + i * 3_600_000))
+                for i in range(250)]
+        inserted = insert_historical_rows(rows, batch_size=100)
+        db.session.commit()
+        assert inserted == 250
+        assert HistoricalData.query.count() == 250
+
+    # Re-ingesting overlapping candles skips duplicates instead of raising
+    def test_skips_duplicates(self, db, coin_id):
+        first = [kline_to_historical_row(coin_id, make_kline(1_700_000_000_000 + i * 3_600_000))
+                 for i in range(10)]
+        insert_historical_rows(first)
+        db.session.commit()
+
+        overlap = [kline_to_historical_row(coin_id, make_kline(1_700_000_000_000 + i * 3_600_000))
+                   for i in range(5, 15)]
+        inserted = insert_historical_rows(overlap)
+        db.session.commit()
+        assert inserted == 5
+        assert HistoricalData.query.count() == 15
+
+    # Aware and naive timestamps for the same instant collapse to one row
+    def test_aware_timestamps_normalized(self, db, coin_id):
+        aware = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+        base = {"coin_id": coin_id, "price": 1.0, "high": 1.0, "low": 1.0, "volume": 1.0}
+        insert_historical_rows([dict(base, timestamp=aware)])
+        inserted = insert_historical_rows([dict(base, timestamp=aware.replace(tzinfo=None))])
+        db.session.commit()
+        assert inserted == 0
+        assert HistoricalData.query.count() == 1
+
+    # Empty input is a no-op
+    def test_empty_rows(self, db):
+        assert insert_historical_rows([]) == 0
+
+
+class TestIndicatorBulkInsert:
+    # All rows are written when none exist yet
+    def test_inserts_all_new(self, db, coin_id):
+        inserted = insert_new_indicator_rows(coin_id, make_indicator_rows(48))
+        db.session.commit()
+        assert inserted == 48
+        assert TechnicalIndicators.query.filter_by(coin_id=coin_id).count() == 48
+
+    # Already stored timestamps are dropped by the anti-join
+    def test_skips_existing_timestamps(self, db, coin_id):
+        rows = make_indicator_rows(48)
+        insert_new_indicator_rows(coin_id, rows[:30])
+        db.session.commit()
+
+        inserted = insert_new_indicator_rows(coin_id, rows)
+        db.session.commit()
+        assert inserted == 18
+        stored = TechnicalIndicators.query.filter_by(coin_id=coin_id).order_by(TechnicalIndicators.timestamp).all()
+        assert [r.timestamp for r in stored] == [r["timestamp"] for r in rows]
+        assert stored[-1].RSI == 47.0
+
+    # Empty input is a no-op
+    def test_empty_rows(self, db, coin_id):
+        assert insert_new_indicator_rows(coin_id, []) == 0
@@ -0,0 +1,115 @@
+import pytest
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from backend.app.models import Coin, HistoricalData, TechnicalIndicators
+from backend.app.prediction import ai_analysis
+from backend.app.utils.db_helpers import insert_historical_rows, insert_new_indicator_rows
+from backend.app.utils.indicator_engine import compute_new_indicator_rows
+
+pytestmark = pytest.mark.usefixtures("clean_analysis_cache")
+
+
+def store_candles(db, coin_id, hours, end):
+    """Hourly random-walk candles ending at ``end``."""
+    rng = np.random.default_rng(3)
+    prices = 30000 * np.exp(np.cumsum(rng.normal(0, 0.01, hours)))
+    insert_historical_rows([{
+        "coin_id": coin_id,
+        "price": float(price),
+        "high": float(price) * 1.01,
+        "low": float(price) * 0.99,
+        "volume": float(rng.uniform(100, 1000)),
+        "timestamp": end - timedelta(hours=hours - 1 - i),
+    } for i, price in enumerate(prices)])
+    db.session.commit()
+
+
+def store_indicators(db, coin_id):
+    insert_new_indicator_rows(coin_id, compute_new_indicator_rows(coin_id))
+    db.session.commit()
+
+
+@pytest.fixture
+def coin_id(sample_coin):
+    return Coin.query.filter_by(coin_symbol="BTC").one().id
+
+
+@pytest.fixture
+def now():
+    return datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0, tzinfo=None)
+
+
+@pytest.fixture
+def recompute():
+    with patch.object(ai_analysis, "resample_and_compute_indicators",
+                      wraps=ai_analysis.resample_and_compute_indicators) as spy:
+        yield spy
+
+
+class TestHourlyStoredIndicators:
+    # The 1h path reads the cron's stored indicators instead of recomputing them
+    def test_reads_stored_indicators(self, db, coin_id, now, recompute):
+        store_candles(db, coin_id, 60, now)
+        store_indicators(db, coin_id)
+
+        data = ai_analysis.fetch_historical_data("btc", "1h")
+
+        stored = TechnicalIndicators.query.filter_by(coin_id=coin_id).order_by(
+            TechnicalIndicators.timestamp.desc()).first()
+        assert recompute.call_count == 0
+        assert data["latest_data"]["timestamp"] == str(now)
+        assert data["momentum_indicators"]["RSI"] == round(stored.RSI, 2)
+        assert data["trend_indicators"]["SMA_200"] == round(stored.SMA_200, 2)
+        assert data["volatility"]["BB_upper"] == round(stored.BB_upper, 2)
+        assert ai_analysis.get_analysis_cache_stats()["stored_indicator_reads"] == 1
+
+    # A repeat request for the same latest candle is served from the cache
+    def test_repeat_is_cached(self, db, coin_id, now):
+        store_candles(db, coin_id, 60, now)
+        store_indicators(db, coin_id)
+
+        first = ai_analysis.fetch_historical_data("BTC", "1h")
+        second = ai_analysis.fetch_historical_data("BTC", "1h")
+
+        assert second == first
+        stats = ai_analysis.get_analysis_cache_stats()
+        assert stats["stored_indicator_reads"] == 1 and stats["data_cache_hits"] == 1
+
+    # Without stored indicators for the newest candle, pandas recomputes them (uncached)
+    def test_recomputes_when_latest_missing(self, db, coin_id, now, recompute):
+        store_candles(db, coin_id, 60, now - timedelta(hours=1))
+        store_indicators(db, coin_id)
+        store_candles(db, coin_id, 1, now)
+
+        data = ai_analysis.fetch_historical_data("BTC", "1h")
+        assert recompute.call_count == 1
+        assert data["latest_data"]["timestamp"] == str(now)
+
+        # Once the cron stores the new candle's indicators they are used
+        store_indicators(db, coin_id)
+        ai_analysis.fetch_historical_data("BTC", "1h")
+        stats = ai_analysis.get_analysis_cache_stats()
+        assert recompute.call_count == 1
+        assert stats["indicator_recomputes"] == 1 and stats["stored_indicator_reads"] == 1
+
+    # Unknown coins and coins without recent candles return None
+    def test_no_data(self, db, coin_id, now):
+        assert ai_analysis.fetch_historical_data("DOGE", "1h") is None
+        store_candles(db, coin_id, 5, now - timedelta(hours=12))
+        assert ai_analysis.fetch_historical_data("BTC", "1h") is None
+
+
+class TestDailyRecompute:
+    # Daily indicators are recomputed only when a new candle has been stored
+    def test_recomputed_once_per_candle(self, db, coin_id, now, recompute):
+        store_candles(db, coin_id, 72, now - timedelta(hours=1))
+
+        first = ai_analysis.fetch_historical_data("BTC", "1d")
+        assert ai_analysis.fetch_historical_data("BTC", "1d") == first
+        assert recompute.call_count == 1
+
+        store_candles(db, coin_id, 1, now)
+        ai_analysis.fetch_historical_data("BTC", "1d")
+        assert recompute.call_count == 2
+        assert HistoricalData.query.count() == 73
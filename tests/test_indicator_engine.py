@@ -0,0 +1,151 @@
+import json
+import pytest
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from backend.app.models import Coin, HistoricalData, IndicatorEngineState, TechnicalIndicators
+from backend.app.utils.db_helpers import insert_historical_rows, insert_new_indicator_rows
+from backend.app.utils.indicator_engine import IncrementalIndicators, compute_new_indicator_rows
+
+COLUMNS = ["SMA_50", "SMA_200", "EMA_50", "EMA_200", "RSI", "MACD", "MACD_Signal",
+           "Stoch_RSI_K", "Stoch_RSI_D", "BB_upper", "BB_middle", "BB_lower", "Volume_Change"]
+
+
+def make_candles(n, seed=7, flat_prefix=0):
+    """Hourly random-walk candles, optionally starting with a flat stretch."""
+    rng = np.random.default_rng(seed)
+    prices = 30000 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    prices[:flat_prefix] = prices[0]
+    volumes = rng.uniform(100, 1000, n)
+    start = datetime(2024, 1, 1)
+    index = [start + timedelta(hours=i) for i in range(n)]
+    return pd.DataFrame({"price": prices, "volume": volumes}, index=index)
+
+
+def pandas_ta_reference(df):
+    """The pandas / pandas_ta computation the hourly cron used, on a chronological series."""
+    ta = pytest.importorskip("pandas_ta")
+    df = df.copy()
+    df["SMA_50"] = df["price"].rolling(window=50, min_periods=1).mean()
+    df["SMA_200"] = df["price"].rolling(window=200, min_periods=1).mean()
+    df["EMA_50"] = df["price"].ewm(span=50, adjust=False, min_periods=1).mean()
+    df["EMA_200"] = df["price"].ewm(span=200, adjust=False, min_periods=1).mean()
+    df["RSI"] = ta.rsi(df["price"], length=14)
+    df["Volume_Change"] = df["volume"].diff()
+    macd = ta.macd(df["price"])
+    df["MACD"], df["MACD_Signal"] = macd["MACD_12_26_9"], macd["MACDs_12_26_9"]
+    stoch = ta.stochrsi(df["price"])
+    df["Stoch_RSI_K"], df["Stoch_RSI_D"] = stoch.iloc[:, 0], stoch.iloc[:, 1]
+    bb = ta.bbands(df["price"])
+    df["BB_lower"], df["BB_middle"], df["BB_upper"] = bb.iloc[:, 0], bb.iloc[:, 1], bb.iloc[:, 2]
+    return df.dropna()[COLUMNS]
+
+
+def engine_frame(rows):
+    return pd.DataFrame(rows).set_index("timestamp")[COLUMNS]
+
+
+def replay(df):
+    return IncrementalIndicators.replay(zip(df.index, df["price"], df["volume"]))
+
+
+class TestIndicatorParity:
+    # Replaying a series yields the same rows and values as pandas_ta
+    @pytest.mark.parametrize("n", [34, 120, 500])
+    def test_full_replay_matches_pandas_ta(self, n):
+        df = make_candles(n)
+        expected = pandas_ta_reference(df)
+        _, rows = replay(df)
+        actual = engine_frame(rows)
+        assert list(actual.index) == list(expected.index)
+        np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-9)
+
+    # A flat start (undefined RSI) is dropped exactly like the batch dropna
+    def test_flat_prefix_matches_pandas_ta(self):
+        df = make_candles(200, flat_prefix=25)
+        expected = pandas_ta_reference(df)
+        _, rows = replay(df)
+        actual = engine_frame(rows)
+        assert list(actual.index) == list(expected.index)
+        np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-9)
+
+    # Saving state mid-series and resuming gives the same output as one pass
+    def test_incremental_resume_matches_pandas_ta(self):
+        df = make_candles(400, seed=11)
+        expected = pandas_ta_reference(df)
+
+        engine, first_rows = replay(df.iloc[:250])
+        engine = IncrementalIndicators.from_dict(json.loads(json.dumps(engine.to_dict())))
+        rest = [engine.update(ts, p, v) for ts, p, v in zip(df.index[250:], df["price"][250:], df["volume"][250:])]
+        actual = engine_frame(first_rows + [r for r in rest if r is not None])
+
+        np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+class TestIndicatorEngine:
+    # No rows until the MACD signal line is defined
+    def test_warmup_returns_nothing(self):
+        _, rows = replay(make_candles(33))
+        assert rows == []
+
+    # State written by another engine version is rejected
+    def test_version_mismatch_forces_rebuild(self):
+        engine, _ = replay(make_candles(50))
+        state = engine.to_dict()
+        state["version"] = -1
+        assert IncrementalIndicators.from_dict(state) is None
+
+    # Persisted state lets the next run process only the new candles
+    def test_compute_new_rows_is_incremental(self, db, sample_coin):
+        coin_id = Coin.query.filter_by(coin_symbol='BTC').first().id
+        df = make_candles(260)
+        rows = [{"coin_id": coin_id, "price": p, "high": p, "low": p, "volume": v, "timestamp": ts}
+                for ts, p, v in zip(df.index, df["price"], df["volume"])]
+
+        insert_historical_rows(rows[:240])
+        first = compute_new_indicator_rows(coin_id)
+        db.session.commit()
+        # Warm-up replays the latest 200 candles, the first 33 of which only prime the state
+        assert len(first) == 200 - 33
+        assert IndicatorEngineState.query.filter_by(coin_id=coin_id).first().last_timestamp == df.index[239]
+
+        insert_historical_rows(rows[240:])
+        second = compute_new_indicator_rows(coin_id)
+        db.session.commit()
+        assert [r["timestamp"] for r in second] == list(df.index[240:])
+
+        assert compute_new_indicator_rows(coin_id) == []
+        assert HistoricalData.query.count() == 260
+
+    # A candle inserted late, behind the saved state, triggers a replay that rewrites later rows
+    def test_late_candle_rebuilds(self, db, sample_coin):
+        coin_id = Coin.query.filter_by(coin_symbol='BTC').first().id
+        df = make_candles(260)
+        rows = [{"coin_id": coin_id, "price": p, "high": p, "low": p, "volume": v, "timestamp": ts}
+                for ts, p, v in zip(df.index, df["price"], df["volume"])]
+
+        # Hour 230 is missing when the cron first runs, then backfilled
+        insert_historical_rows(rows[:230] + rows[231:240])
+        insert_new_indicator_rows(coin_id, compute_new_indicator_rows(coin_id))
+        db.session.commit()
+        insert_historical_rows([rows[230]])
+        db.session.commit()
+
+        insert_new_indicator_rows(coin_id, compute_new_indicator_rows(coin_id))
+        db.session.commit()
+
+        _, expected = replay(df.iloc[30:240])
+        expected = engine_frame(expected).loc[df.index[230]:]
+        stored = pd.DataFrame([
+            {c: getattr(r, c) for c in COLUMNS + ["timestamp"]}
+            for r in TechnicalIndicators.query.filter(
+                TechnicalIndicators.coin_id == coin_id,
+                TechnicalIndicators.timestamp >= df.index[230]
+            ).order_by(TechnicalIndicators.timestamp).all()
+        ]).set_index("timestamp")[COLUMNS]
+        assert list(stored.index) == list(expected.index)
+        np.testing.assert_allclose(stored.to_numpy(), expected.to_numpy(), rtol=1e-9)
+
+        # The next run is incremental again
+        insert_historical_rows(rows[240:])
+        assert [r["timestamp"] for r in compute_new_indicator_rows(coin_id)] == list(df.index[240:])
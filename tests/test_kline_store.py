@@ -0,0 +1,106 @@
+import pytest
+from unittest.mock import patch
+from backend.app.utils import kline_store as kline_store_module
+from backend.app.utils.cache import Cache, MemoryBackend
+from backend.app.utils.kline_store import KlineStore
+
+HOUR_MS = 3600 * 1000
+START_MS = 1700000000000 - 1700000000000 % HOUR_MS
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+class FakeExchange:
+    """Hourly candles up to the clock's current (open) candle; close price tracks the clock."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+
+    def candle(self, open_time):
+        close = self.clock.now if open_time + HOUR_MS > self.clock.now * 1000 else open_time / 1000
+        return [open_time, "1", "2", "0.5", str(close), "10", open_time + HOUR_MS - 1, "15", 3, "5", "7", "0"]
+
+    def __call__(self, symbol, interval, limit, start_time=None):
+        self.calls.append({"limit": limit, "start_time": start_time})
+        current = START_MS + int((self.clock.now * 1000 - START_MS) // HOUR_MS) * HOUR_MS
+        if start_time is None:
+            opens = [current - i * HOUR_MS for i in range(limit)][::-1]
+        else:
+            opens = list(range(start_time, current + 1, HOUR_MS))[:limit]
+        return [self.candle(t) for t in opens if t >= START_MS - 5000 * HOUR_MS]
+
+
+@pytest.fixture
+def env():
+    clock = FakeClock(START_MS / 1000 + 100 * 3600 + 60)
+    exchange = FakeExchange(clock)
+    store = KlineStore(Cache(MemoryBackend()))
+    with patch.object(kline_store_module, "time", clock), \
+            patch.object(kline_store_module, "fetch_klines", exchange):
+        yield store, clock, exchange
+
+
+class TestKlineStore:
+    # Repeated reads within a candle hit the store instead of Binance
+    def test_second_read_is_served_from_store(self, env):
+        store, clock, exchange = env
+        first = store.get_klines("BTCUSDT", "1h", 500)
+        clock.now += 5
+        second = store.get_klines("BTCUSDT", "1h", 500)
+
+        assert len(exchange.calls) == 1
+        assert first == second
+        assert store.get_stats() == {"full_fetches": 1, "candles_fetched": 500, "hits": 1}
+
+    # After a candle closes only the new tail is downloaded
+    def test_candle_close_fetches_only_the_tail(self, env):
+        store, clock, exchange = env
+        before = store.get_klines("BTCUSDT", "1h", 500)
+        clock.now += 3600
+        after = store.get_klines("BTCUSDT", "1h", 500)
+
+        assert exchange.calls[1] == {"limit": 3, "start_time": before[-1][0]}
+        assert after[-1][0] == before[-1][0] + HOUR_MS
+        assert after[:-2] == before[1:-1]
+        # The candle that was open last time now holds its final values
+        assert after[-2] == exchange.candle(before[-1][0])
+        assert len(after) == 500
+
+    # The open candle is refreshed periodically between closes
+    def test_open_candle_refreshes_after_interval(self, env):
+        store, clock, exchange = env
+        store.get_klines("BTCUSDT", "1h", 500)
+        clock.now += kline_store_module.KLINE_TAIL_REFRESH_SECONDS
+        latest = store.get_klines("BTCUSDT", "1h", 500)
+
+        assert len(exchange.calls) == 2
+        assert float(latest[-1][4]) == clock.now
+
+    # A deeper request than stored refetches the full history once
+    def test_deeper_request_refetches(self, env):
+        store, clock, exchange = env
+        store.get_klines("BTCUSDT", "1h", 500)
+        assert len(store.get_klines("BTCUSDT", "1h", 1000)) == 1000
+        assert len(store.get_klines("BTCUSDT", "1h", 500)) == 500
+        assert [call["start_time"] for call in exchange.calls] == [None, None]
+
+    # After a long gap the tail request grows with the missed candles, capped at the stored depth
+    def test_tail_limit_covers_gap(self, env):
+        store, clock, exchange = env
+        before = store.get_klines("BTCUSDT", "1h", 500)
+        clock.now += 10 * 3600
+        after = store.get_klines("BTCUSDT", "1h", 500)
+        clock.now += 2000 * 3600
+        store.get_klines("BTCUSDT", "1h", 500)
+
+        assert exchange.calls[1]["limit"] == 12
+        assert after[-1][0] == before[-1][0] + 10 * HOUR_MS
+        assert after[:-11] == before[10:-1]
+        assert exchange.calls[2]["limit"] == 500
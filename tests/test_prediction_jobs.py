@@ -0,0 +1,138 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from backend.app.utils.prediction_jobs import PredictionJobQueue, JobQueueFull, prediction_jobs, DONE, FAILED
+
+
+class Gate:
+    """A job function that blocks until released and counts its calls."""
+
+    def __init__(self, result=None):
+        self.result = result
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return self.result
+
+
+class TestPredictionJobQueue:
+    # Identical keys submitted while a job is in flight attach to that job
+    def test_dedup_in_flight(self):
+        queue = PredictionJobQueue(workers=1)
+        gate = Gate({"coin": "BTC"})
+
+        job, attached = queue.submit(("BTC", "1d", "concise"), gate)
+        same, attached_again = queue.submit(("BTC", "1d", "concise"), gate)
+        gate.release.set()
+
+        assert queue.wait(job, 5)
+        assert same is job and not attached and attached_again
+        assert gate.calls == 1
+        assert job.to_dict() == {"job_id": job.id, "status": DONE, "result": {"coin": "BTC"}}
+        assert queue.get_stats()["attached"] == 1
+
+    # A finished key starts a new job on the next submit
+    def test_new_job_after_finish(self):
+        queue = PredictionJobQueue(workers=1)
+        first, _ = queue.submit("k", lambda: 1)
+        queue.wait(first, 5)
+        second, attached = queue.submit("k", lambda: 2)
+        queue.wait(second, 5)
+
+        assert not attached and second.id != first.id and second.result == 2
+        assert queue.get(first.id) is first
+
+    # Concurrency is bounded by the worker count; extra jobs queue up and are counted
+    def test_bounded_workers_and_queue(self):
+        queue = PredictionJobQueue(workers=1, max_queue=1)
+        gate = Gate()
+        running, _ = queue.submit("a", gate)
+        assert gate.started.wait(5)
+        queued, _ = queue.submit("b", lambda: "b")
+
+        stats = queue.get_stats()
+        assert stats["running"] == 1 and stats["queue_depth"] == 1
+        with pytest.raises(JobQueueFull):
+            queue.submit("c", lambda: "c")
+
+        time.sleep(0.05)
+        gate.release.set()
+        assert queue.wait(queued, 5)
+        stats = queue.get_stats()
+        assert stats["completed"] == 2 and stats["rejected"] == 1
+        assert stats["max_wait_seconds"] >= 0.05
+
+    # Exceptions mark the job failed instead of propagating
+    def test_failed_job(self):
+        queue = PredictionJobQueue(workers=1)
+
+        def boom():
+            raise RuntimeError("Groq API error")
+
+        job, _ = queue.submit("k", boom)
+        queue.wait(job, 5)
+        assert job.to_dict() == {"job_id": job.id, "status": FAILED, "error": "Groq API error"}
+        assert queue.get_stats()["failed"] == 1
+
+    # Finished jobs are forgotten after the retention period
+    def test_retention(self):
+        queue = PredictionJobQueue(workers=1, retain_seconds=0)
+        job, _ = queue.submit("k", lambda: 1)
+        queue.wait(job, 5)
+        job.finished_at -= 1
+        assert queue.get(job.id) is None
+
+
+class TestPredictJobRoutes:
+    # async=1 returns a job id that can be polled for the result
+    def test_async_then_poll(self, client, auth_headers):
+        gate = Gate({"coin": "SOL", "analysis": "ok", "cached": False})
+        with patch("backend.app.routes.predictions.analyze_with_llm", side_effect=lambda *a: gate()):
+            res = client.get("/predict?coin=SOL&timeframe=1h&async=1", headers=auth_headers)
+            assert res.status_code == 202
+            job_id = res.get_json()["job_id"]
+            assert res.headers["Location"].endswith(f"/predict/jobs/{job_id}")
+
+            # A concurrent identical request attaches to the same job
+            again = client.get("/predict?coin=sol&timeframe=1h&async=1", headers=auth_headers)
+            assert again.get_json()["job_id"] == job_id
+
+            gate.release.set()
+            polled = client.get(f"/predict/jobs/{job_id}?wait=5", headers=auth_headers)
+
+        assert polled.status_code == 200
+        assert polled.get_json() == {"job_id": job_id, "status": "done", "result": gate.result}
+        assert gate.calls == 1
+
+    # A synchronous request that outlives the wait answers 202 with a pollable job
+    def test_sync_timeout_returns_job(self, client, auth_headers):
+        with patch("backend.app.routes.predictions.analyze_with_llm", return_value={"coin": "BTC"}), \
+                patch.object(prediction_jobs, "wait", return_value=False):
+            res = client.get("/predict?coin=BTC&type=full", headers={**auth_headers, "Origin": "http://localhost:5173"})
+
+        assert res.status_code == 202
+        assert res.get_json()["status"] in ("queued", "running", "done")
+        assert "Location" in res.headers["Access-Control-Expose-Headers"]
+
+    # Unknown job ids return 404
+    def test_unknown_job(self, client, auth_headers):
+        res = client.get("/predict/jobs/nope", headers=auth_headers)
+        assert res.status_code == 404
+
+    # A full queue answers 503 with Retry-After
+    def test_queue_full(self, client, auth_headers):
+        with patch.object(prediction_jobs, "submit", side_effect=JobQueueFull("prediction queue is full")):
+            res = client.get("/predict?coin=BTC", headers=auth_headers)
+        assert res.status_code == 503
+        assert res.headers["Retry-After"] == "5"
+
+    # Queue metrics are exposed via /metrics
+    def test_metrics(self, client):
+        stats = client.get("/metrics").get_json()["prediction_jobs"]
+        assert {"queue_depth", "running", "avg_wait_seconds", "max_wait_seconds"} <= set(stats)
@@ -0,0 +1,200 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from unittest.mock import patch, MagicMock
+from backend.app.prediction import ai_analysis
+from backend.app.utils.cache import market_cache
+
+pytestmark = pytest.mark.usefixtures("clean_analysis_cache")
+
+
+class FakeStreamingLLMServer:
+    """
+    Local stand-in for Groq's OpenAI-compatible streaming chat endpoint.
+
+    Sends one SSE chunk per token with ``delay`` seconds between them, usage
+    in ``x_groq`` on the last chunk, then ``data: [DONE]``. Records whether
+    the client hung up before the stream finished.
+    """
+
+    def __init__(self, tokens, delay=0.0):
+        self.tokens = tokens
+        self.delay = delay
+        self.requests = []
+        self.aborted = threading.Event()
+        self.finished = threading.Event()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                server.requests.append(body)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                try:
+                    for i, token in enumerate(server.tokens):
+                        chunk = {
+                            "id": "chatcmpl-test", "object": "chat.completion.chunk", "created": 0,
+                            "model": body["model"],
+                            "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+                        }
+                        if i == len(server.tokens) - 1:
+                            chunk["x_groq"] = {"id": "req-test", "usage": {
+                                "prompt_tokens": 120, "completion_tokens": len(server.tokens),
+                                "total_tokens": 120 + len(server.tokens)}}
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                        self.wfile.flush()
+                        time.sleep(server.delay)
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    self.wfile.flush()
+                    server.finished.set()
+                except (BrokenPipeError, ConnectionResetError):
+                    server.aborted.set()
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def llm_server(monkeypatch):
+    servers = []
+
+    def start(tokens, delay=0.0):
+        server = FakeStreamingLLMServer(tokens, delay)
+        servers.append(server)
+        monkeypatch.setenv("GROQ_BASE_URL", server.url)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+class TestStreamAnalysis:
+    # Tokens are yielded one by one and the full analysis is cached with its usage
+    def test_tokens_then_done(self, llm_server, analysis_data):
+        server = llm_server(["BTC ", "looks ", "bullish"])
+
+        events = list(ai_analysis.stream_analysis_with_llm("btc", "1d", "concise"))
+
+        assert events == [
+            ("token", {"text": "BTC "}),
+            ("token", {"text": "looks "}),
+            ("token", {"text": "bullish"}),
+            ("done", {"coin": "BTC", "cached": False}),
+        ]
+        assert server.requests[0]["stream"] is True
+        stats = ai_analysis.get_analysis_cache_stats()
+        assert stats["streams"] == 1 and stats["llm_calls"] == 1
+        assert stats["prompt_tokens_spent"] == 120 and stats["completion_tokens_spent"] == 3
+
+        # The non-streaming endpoint now reuses the streamed analysis
+        result = ai_analysis.analyze_with_llm("BTC", "1d", "concise")
+        assert result == {"coin": "BTC", "analysis": "BTC looks bullish", "cached": True}
+
+    # A cached analysis is sent as a single token without contacting the LLM
+    def test_cache_hit(self, llm_server, analysis_data):
+        server = llm_server(["BTC ", "looks ", "bullish"])
+        list(ai_analysis.stream_analysis_with_llm("BTC", "1d", "concise"))
+
+        events = list(ai_analysis.stream_analysis_with_llm("BTC", "1d", "concise"))
+
+        assert events == [("token", {"text": "BTC looks bullish"}), ("done", {"coin": "BTC", "cached": True})]
+        assert len(server.requests) == 1
+
+    # Closing the generator mid-stream closes the upstream connection and caches nothing
+    def test_close_cancels_upstream(self, llm_server, analysis_data):
+        server = llm_server([f"t{i} " for i in range(200)], delay=0.02)
+
+        stream = ai_analysis.stream_analysis_with_llm("BTC", "1d", "concise")
+        assert next(stream) == ("token", {"text": "t0 "})
+        stream.close()
+
+        assert server.aborted.wait(5)
+        assert not server.finished.is_set()
+        stats = ai_analysis.get_analysis_cache_stats()
+        assert stats["streams_cancelled"] == 1 and stats["llm_calls"] == 0
+        data = ai_analysis.fetch_historical_data("BTC", "1d")
+        assert market_cache.peek(ai_analysis.analysis_cache_key(data, "concise")) is None
+
+    # An upstream failure is reported as an error event
+    def test_upstream_error(self, analysis_data):
+        with patch.object(ai_analysis, "Groq", side_effect=RuntimeError("unreachable")):
+            events = list(ai_analysis.stream_analysis_with_llm("BTC", "1d", "concise"))
+
+        assert events == [("error", {"error": "LLM call failed: unreachable"})]
+
+    # A stream that stops sending ends with an error; the reader thread alone closes it
+    def test_stalled_stream_times_out(self, analysis_data):
+        release = threading.Event()
+
+        def stalled():
+            release.wait(5)
+            yield from ()
+
+        stream = MagicMock()
+        stream.__iter__.return_value = stalled()
+        client = MagicMock()
+        client.chat.completions.create.return_value = stream
+        with patch.object(ai_analysis, "Groq", return_value=client), \
+                patch.object(ai_analysis, "STREAM_TIMEOUT_SECONDS", 0.1):
+            events = list(ai_analysis.stream_analysis_with_llm("BTC", "1d", "concise"))
+        release.set()
+
+        assert events == [("error", {"error": "LLM stream stalled for 0.1s"})]
+        assert client.chat.completions.create.call_args.kwargs["timeout"] == 0.1
+        deadline = time.monotonic() + 5
+        while not stream.close.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stream.close.assert_called_once()
+
+
+class TestPredictStreamRoute:
+    # The endpoint sends SSE token events followed by done
+    def test_sse_response(self, client, llm_server, analysis_data):
+        llm_server(["ETH ", "is ", "flat"])
+
+        resp = client.get("/predict/stream?coin=ETH&timeframe=1d")
+
+        assert resp.status_code == 200
+        assert resp.mimetype == "text/event-stream"
+        assert resp.headers["Cache-Control"] == "no-cache"
+        events = parse_events(resp.get_data(as_text=True))
+        assert [e for e, _ in events] == ["token", "token", "token", "done"]
+        assert "".join(p["text"] for e, p in events if e == "token") == "ETH is flat"
+
+    # Missing coin is rejected before streaming starts
+    def test_missing_coin(self, client):
+        resp = client.get("/predict/stream")
+        assert resp.status_code == 400
+
+    # A client disconnect stops the LLM stream
+    def test_disconnect_cancels(self, client, llm_server, analysis_data):
+        server = llm_server([f"t{i} " for i in range(200)], delay=0.02)
+
+        resp = client.get("/predict/stream?coin=BTC", buffered=False)
+        first = next(resp.response)
+        resp.close()
+
+        assert first.startswith(b"event: token")
+        assert server.aborted.wait(5)
+        assert ai_analysis.get_analysis_cache_stats()["streams_cancelled"] == 1
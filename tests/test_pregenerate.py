@@ -0,0 +1,62 @@
+import pytest
+from unittest.mock import patch
+from backend.app.prediction import ai_analysis, pregenerate
+from backend.app.utils.cache import market_cache
+
+pytestmark = pytest.mark.usefixtures("clean_analysis_cache")
+
+
+@pytest.fixture(autouse=True)
+def shared_cache():
+    # Pre-generation only runs on a cache the web workers share
+    with patch.object(market_cache, "is_shared", return_value=True):
+        yield
+
+
+class TestPregenerateReports:
+    # Every (coin, timeframe) pair is generated with bounded parallelism and its cost recorded
+    def test_generates_all_pairs(self, app, analysis_data, fake_groq):
+        fake_groq.delay = 0.05
+        summary = pregenerate.pregenerate_reports(app, ["BTC", "ETH", "SOL"], ["1h", "1d"], workers=2)
+
+        assert fake_groq.calls == 6 and fake_groq.max_active <= 2
+        assert summary["reports"] == summary["llm_calls"] == 6
+        assert summary["prompt_tokens"] == 5400 and summary["completion_tokens"] == 2400
+        assert summary["failed"] == []
+        assert pregenerate.get_pregenerate_runs() == [summary]
+
+    # /predict afterwards is served from the pre-generated report, kept for the run TTL
+    def test_predict_served_from_storage(self, app, analysis_data, fake_groq):
+        pregenerate.pregenerate_reports(app, ["BTC"], ["1d"], ttl=3900)
+        key = ai_analysis.analysis_cache_key(ai_analysis.fetch_historical_data("BTC", "1d"), "concise")
+        entry = market_cache.peek(key)
+        entry["created_at"] -= ai_analysis.ANALYSIS_CACHE_TTL_SECONDS + 1
+        market_cache.set(key, entry)
+
+        result = ai_analysis.analyze_with_llm("BTC", "1d", "concise")
+
+        assert result == {"coin": "BTC", "analysis": "BTC looks bullish", "cached": True}
+        assert fake_groq.calls == 1
+
+    # Each run regenerates even if a report is still cached
+    def test_refreshes_cached_reports(self, app, analysis_data, fake_groq):
+        ai_analysis.analyze_with_llm("BTC", "1d", "concise")
+        pregenerate.pregenerate_reports(app, ["BTC"], ["1d"])
+        assert fake_groq.calls == 2
+
+    # Failed pairs are listed and only the most recent runs are kept
+    def test_failures_and_run_history(self, app, analysis_data):
+        with patch.object(ai_analysis, "Groq", side_effect=RuntimeError("rate limited")):
+            for _ in range(pregenerate.PREGENERATE_RUNS_KEPT + 2):
+                summary = pregenerate.pregenerate_reports(app, ["BTC"], ["1d"])
+
+        assert summary["llm_calls"] == 0 and summary["failed"] == ["BTC:1d"]
+        assert len(pregenerate.get_pregenerate_runs()) == pregenerate.PREGENERATE_RUNS_KEPT
+
+    # With a process-local cache the run is skipped without calling the LLM
+    def test_skipped_on_memory_backend(self, app, analysis_data, fake_groq):
+        with patch.object(market_cache, "is_shared", return_value=False):
+            assert pregenerate.pregenerate_reports(app, ["BTC"], ["1d"]) is None
+
+        assert fake_groq.calls == 0
+        assert pregenerate.get_pregenerate_runs() == []
@@ -0,0 +1,86 @@
+import time
+import pytest
+from unittest.mock import MagicMock
+from backend.app.utils.cache import Cache, MemoryBackend, RefreshError
+from backend.app.utils.refresh_ahead import refresh_due
+
+
+class CountingUpstream:
+    """Returns successive values, or raises the queued errors first."""
+
+    def __init__(self, errors=()):
+        self.calls = 0
+        self.errors = list(errors)
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return f"v{self.calls}"
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def cache():
+    return Cache(MemoryBackend())
+
+
+class TestRefreshAhead:
+    # Entries are refreshed once they pass the configured fraction of their TTL
+    def test_refreshes_at_fraction_of_ttl(self, cache):
+        upstream = CountingUpstream()
+        cache.register("tickers", upstream, ttl=60)
+        cache.backend.set("tickers", "v0", time.time() - 30, 3600)
+
+        assert refresh_due(cache, fraction=0.8) == []
+        cache.backend.set("tickers", "v0", time.time() - 50, 3600)
+        assert refresh_due(cache, fraction=0.8) == ["tickers"]
+        assert wait_for(lambda: cache.backend.get("tickers")[0] == "v1")
+        assert upstream.calls == 1
+
+    # A 429 puts the source in backoff, honoring Retry-After, until it expires
+    def test_backs_off_after_rate_limit(self, cache):
+        upstream = CountingUpstream(errors=[RefreshError("rate limited", 429, retry_after=30)])
+        source = cache.register("tickers", upstream, ttl=60)
+
+        refresh_due(cache)
+        assert wait_for(lambda: source.failures == 1 and not cache.flights.in_flight("tickers"))
+        assert source.backoff_until - time.time() > 25
+        assert refresh_due(cache) == []
+        assert cache.get_stats()["tickers"]["backoff"]["failures"] == 1
+
+        source.backoff_until = 0
+        refresh_due(cache)
+        assert wait_for(lambda: cache.backend.get("tickers") is not None)
+        assert source.failures == 0
+        assert upstream.calls == 2
+
+    # With the scheduler running, reads never call upstream inline
+    def test_reads_never_block_on_upstream(self, cache):
+        upstream = MagicMock(side_effect=lambda: time.sleep(0.5) or "fresh")
+        cache.register("tickers", upstream, ttl=60)
+        cache.refresh_ahead = True
+
+        start = time.time()
+        assert cache.get("tickers") is None
+        cache.backend.set("tickers", "old", time.time() - 3600, 86400)
+        assert cache.get("tickers") == "old"
+        assert time.time() - start < 0.2
+
+    # Lazy reads during backoff serve the stored value without calling upstream
+    def test_backoff_skips_inline_refresh(self, cache):
+        upstream = CountingUpstream(errors=[RefreshError("server error", 503)])
+        cache.register("tickers", upstream, ttl=60)
+        cache.backend.set("tickers", "old", time.time() - 3600, 86400)
+
+        assert cache.get("tickers") == "old"
+        assert cache.get("tickers") == "old"
+        assert upstream.calls == 1
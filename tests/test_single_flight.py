@@ -0,0 +1,101 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from backend.app.prediction import market_data
+from backend.app.utils import kline_store
+from backend.app.utils.cache import Cache, MemoryBackend
+from backend.app.utils.single_flight import SingleFlight
+
+CALLERS = 100
+
+
+def run_concurrently(fn, callers=CALLERS):
+    """Start ``callers`` threads at the same instant and collect their results."""
+    barrier = threading.Barrier(callers)
+    results = [None] * callers
+
+    def worker(i):
+        barrier.wait()
+        results[i] = fn()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results
+
+
+class SlowUpstream:
+    """Counts calls and holds each one open long enough for callers to pile up."""
+
+    def __init__(self, value, delay=0.2):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.value
+
+
+class TestSingleFlight:
+    # 100 simultaneous cache misses make exactly one upstream call
+    def test_concurrent_misses_share_one_call(self):
+        cache = Cache(MemoryBackend())
+        upstream = SlowUpstream([{"symbol": "BTCUSDT"}])
+        results = run_concurrently(lambda: cache.get_or_refresh("tickers", upstream, ttl=60))
+
+        assert upstream.calls == 1
+        assert all(result == [{"symbol": "BTCUSDT"}] for result in results)
+        stats = cache.get_stats()["tickers"]
+        assert stats["refreshes"] == 1
+        assert stats["coalesced"] + stats["hits"] == CALLERS - 1
+
+    # With a stale entry nobody waits: all get the stale value, one refresh runs
+    def test_concurrent_stale_reads_return_immediately(self):
+        cache = Cache(MemoryBackend())
+        cache.backend.set("tickers", "old", time.time() - 90, 3600)
+        upstream = SlowUpstream("new", delay=0.5)
+
+        start = time.time()
+        results = run_concurrently(lambda: cache.get_or_refresh("tickers", upstream, ttl=60, stale_ttl=60))
+        assert time.time() - start < 0.5
+        assert results == ["old"] * CALLERS
+
+        deadline = time.time() + 2
+        while cache.backend.get("tickers")[0] != "new" and time.time() < deadline:
+            time.sleep(0.01)
+        assert upstream.calls == 1
+
+    # Every waiter sees the leader's error
+    def test_errors_propagate_to_waiters(self):
+        flights = SingleFlight()
+
+        def fail():
+            time.sleep(0.1)
+            raise ValueError("upstream down")
+
+        def call():
+            try:
+                flights.do("k", fail)
+            except ValueError as e:
+                return str(e)
+
+        assert run_concurrently(call, callers=10) == ["upstream down"] * 10
+        assert not flights.in_flight("k")
+
+    # Concurrent chart requests for the same klines download them once
+    def test_market_data_klines_coalesced(self):
+        kline = [1700000000000, "1", "2", "0.5", "1.5", "10", 1700003599999, "15", 3, "5", "7", "0"]
+        upstream = SlowUpstream([kline])
+        kline_store.kline_store.invalidate("BTCUSDT", "1h")
+        with patch.object(kline_store, "fetch_klines", upstream):
+            frames = run_concurrently(lambda: market_data.fetch_market_data("BTC", "1h", 500), callers=20)
+
+        assert upstream.calls == 1
+        assert all(frame["Close"].iloc[0] == 1.5 for frame in frames)
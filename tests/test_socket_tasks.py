@@ -0,0 +1,88 @@
+import pytest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from sqlalchemy import event
+from backend.app.models import Coin, CoinSnapshot
+from backend.app.utils import socket_tasks
+from backend.app.utils.socket_tasks import prepare_coin_data, invalidate_snapshot_cache
+
+TICKERS = [
+    {"symbol": "BTCUSDT", "lastPrice": "65000", "highPrice": "66000", "lowPrice": "64000", "volume": "1200"},
+    {"symbol": "ETHUSDT", "lastPrice": "3000", "highPrice": "3100", "lowPrice": "2900", "volume": "9000"},
+]
+
+
+@contextmanager
+def count_queries(db):
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+
+
+@pytest.fixture
+def coins(db):
+    invalidate_snapshot_cache()
+    socket_tasks._snapshot_cache["key"] = None
+    btc = Coin(coin_name='Bitcoin', coin_symbol='BTC')
+    eth = Coin(coin_name='Ethereum', coin_symbol='ETH')
+    db.session.add_all([btc, eth])
+    db.session.commit()
+    now = datetime(2024, 1, 2)
+    db.session.add_all([
+        CoinSnapshot(coin_id=btc.id, market_cap=1.0e12, global_volume=3.0e10, timestamp=now - timedelta(days=1)),
+        CoinSnapshot(coin_id=btc.id, market_cap=1.3e12, global_volume=4.0e10, timestamp=now),
+    ])
+    db.session.commit()
+    with patch.object(socket_tasks, "get_live_tickers", return_value=TICKERS), \
+            patch.object(socket_tasks, "get_cached_coingecko_data", return_value=[]):
+        yield db
+    invalidate_snapshot_cache()
+
+
+class TestPrepareCoinData:
+    # Latest snapshot per coin comes from one joined query
+    def test_uses_latest_snapshot(self, coins):
+        with count_queries(coins) as statements:
+            data = {c["symbol"]: c for c in prepare_coin_data()}
+        assert len(statements) == 2  # cache key check + coins/latest-snapshot join
+        assert data["BTC"]["market_cap"] == 1.3e12
+        assert data["BTC"]["global_volume"] == 4.0e10
+        assert data["BTC"]["current_price"] == 65000.0
+        assert data["ETH"]["id"] is not None
+        assert data["ETH"]["market_cap"] is None
+
+    # Repeated broadcasts reuse the cached rows without touching the DB
+    def test_cached_between_rechecks(self, coins):
+        prepare_coin_data()
+        with count_queries(coins) as statements:
+            prepare_coin_data()
+        assert statements == []
+
+    # A newer snapshot is picked up once the recheck interval has passed
+    def test_new_snapshot_invalidates_cache(self, coins):
+        prepare_coin_data()
+        btc_id = Coin.query.filter_by(coin_symbol='BTC').first().id
+        coins.session.add(CoinSnapshot(coin_id=btc_id, market_cap=2.0e12, global_volume=5.0e10,
+                                       timestamp=datetime(2024, 1, 3)))
+        coins.session.commit()
+
+        socket_tasks._snapshot_cache["checked_at"] -= socket_tasks.SNAPSHOT_RECHECK_SECONDS
+        data = {c["symbol"]: c for c in prepare_coin_data()}
+        assert data["BTC"]["market_cap"] == 2.0e12
+
+    # An unchanged snapshot timestamp costs a single lightweight query
+    def test_unchanged_recheck_is_one_query(self, coins):
+        prepare_coin_data()
+        invalidate_snapshot_cache()
+        with count_queries(coins) as statements:
+            prepare_coin_data()
+        assert len(statements) == 1
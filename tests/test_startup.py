@@ -0,0 +1,93 @@
+import threading
+import time
+from unittest.mock import patch
+from sqlalchemy.exc import OperationalError
+from backend.app.utils.startup import StartupDataset, StartupRefresh
+
+
+def wait_all(threads):
+    for thread in threads:
+        thread.join(timeout=5)
+
+
+def fresh():
+    return False, None
+
+
+def stale():
+    return True, None
+
+
+class TestStartupRefresh:
+    # Independent datasets refresh at the same time, not one after another
+    def test_independent_datasets_run_concurrently(self, app):
+        barrier = threading.Barrier(3, timeout=2)
+        refresh = StartupRefresh([
+            StartupDataset(name, stale, barrier.wait) for name in ("a", "b", "c")
+        ])
+        wait_all(refresh.start(app))
+        states = {name: s["state"] for name, s in refresh.status()["datasets"].items()}
+        assert states == {"a": "refreshed", "b": "refreshed", "c": "refreshed"}
+
+    # A dataset waits for the ones listed in ``after``
+    def test_dependencies_run_first(self, app):
+        order = []
+        refresh = StartupRefresh([
+            StartupDataset("second", stale, lambda: order.append("second"), after=("first",)),
+            StartupDataset("first", stale, lambda: (time.sleep(0.05), order.append("first"))),
+        ])
+        wait_all(refresh.start(app))
+        assert order == ["first", "second"]
+
+    # Fresh, failed and not-yet-migrated datasets are all reported and count as finished
+    def test_status_reports_each_outcome(self, app):
+        def missing_table():
+            raise OperationalError("SELECT", {}, Exception("no such table"))
+
+        def boom():
+            raise RuntimeError("upstream down")
+
+        refresh = StartupRefresh([
+            StartupDataset("fresh", fresh, lambda: None),
+            StartupDataset("failed", stale, boom),
+            StartupDataset("no_table", missing_table, lambda: None),
+        ])
+        wait_all(refresh.start(app))
+        status = refresh.status()
+        datasets = status["datasets"]
+        assert status["ready"] is True
+        assert datasets["fresh"]["state"] == "fresh"
+        assert datasets["failed"]["state"] == "failed"
+        assert datasets["failed"]["error"] == "upstream down"
+        assert datasets["no_table"]["state"] == "skipped"
+        assert all("duration_seconds" in d for d in datasets.values())
+
+
+class TestReadinessRoute:
+    # 503 while warmup is running, 200 with per-dataset detail once finished
+    def test_ready_endpoint(self, app, client):
+        release = threading.Event()
+        refresh = StartupRefresh([StartupDataset("slow", stale, lambda: release.wait(2))])
+
+        with patch('backend.app.routes.health_routes.startup_refresh', refresh):
+            threads = refresh.start(app)
+            res = client.get('/ready')
+            assert res.status_code == 503
+            assert res.get_json()["datasets"]["slow"]["state"] in ("checking", "refreshing")
+
+            release.set()
+            wait_all(threads)
+            res = client.get('/ready')
+            assert res.status_code == 200
+            assert res.get_json()["datasets"]["slow"]["state"] == "refreshed"
+
+    # Entry points that never start the warmup (flask run, WSGI) report ready
+    def test_not_started_is_ready(self, client):
+        refresh = StartupRefresh([StartupDataset("slow", stale, lambda: None)])
+
+        with patch('backend.app.routes.health_routes.startup_refresh', refresh):
+            res = client.get('/ready')
+
+        assert res.status_code == 200
+        assert res.get_json()["started"] is False
+        assert res.get_json()["datasets"]["slow"]["state"] == "pending"